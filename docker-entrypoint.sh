@@ -22,5 +22,10 @@ shopt -s nullglob
 # Migrate database
 python3 manage.py migrate
 
-# Launch gunicorn server
-gunicorn
+# Launch gunicorn server. Set 'GCAMPUS_SERVER_INTERFACE=asgi' to use
+# uvicorn workers (see 'gunicorn.asgi.conf.py').
+if [ "${GCAMPUS_SERVER_INTERFACE:-wsgi}" = "asgi" ]; then
+    gunicorn --config gunicorn.asgi.conf.py
+else
+    gunicorn
+fi
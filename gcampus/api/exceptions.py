@@ -0,0 +1,45 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+__all__ = ["OverpassUnavailable", "OverpassTimeout", "from_overpass_error"]
+
+from django.utils.translation import gettext_lazy
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from gcampus.api.overpass import OverpassAPIError, OverpassTimeoutError
+
+
+class OverpassUnavailable(APIException):
+    status_code = status.HTTP_502_BAD_GATEWAY
+    default_detail = gettext_lazy("The OpenStreetMap lookup failed.")
+    default_code = "overpass_unavailable"
+
+
+class OverpassTimeout(OverpassUnavailable):
+    status_code = status.HTTP_504_GATEWAY_TIMEOUT
+    default_detail = gettext_lazy("The OpenStreetMap lookup timed out.")
+    default_code = "overpass_timeout"
+
+
+def from_overpass_error(exc: OverpassAPIError) -> OverpassUnavailable:
+    """Get the API exception returned to clients for an error of the
+    Overpass API.
+
+    :param exc: Error raised by :func:`gcampus.api.overpass.query`.
+    """
+    if isinstance(exc, OverpassTimeoutError):
+        return OverpassTimeout()
+    return OverpassUnavailable()
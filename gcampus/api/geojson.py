@@ -0,0 +1,158 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Serialize GeoJSON feature collections in the database
+
+Serializing many features with
+:class:`rest_framework_gis.serializers.GeoFeatureModelSerializer`
+converts every geometry to a GEOS object and runs the serializer fields
+for every row. Instead, PostGIS builds every feature as JSON text (see
+:func:`get_feature`) and the feature collection is streamed to the
+client (see :func:`iter_feature_collection`).
+"""
+
+__all__ = [
+    "get_feature",
+    "get_choice_display",
+    "iter_feature_collection",
+    "aiter_feature_collection",
+]
+
+from typing import Any, AsyncIterator, Dict, Iterator, Iterable, Tuple, Union
+
+from django.db.models import Case, Expression, F, QuerySet, TextField, Value, When
+from django.db.models.functions import Cast
+
+from gcampus.core.models.functions import AsGeoJSONObject, JSONBuildObject
+
+DATABASE_CHUNK_SIZE = 2000
+FEATURE_COLLECTION_START = '{"type":"FeatureCollection","features":['
+FEATURE_COLLECTION_END = "]}"
+
+#: Properties of a feature. Strings are interpreted as field names.
+Properties = Dict[str, Union[str, Expression]]
+
+
+def _as_expression(value: Union[str, Expression]) -> Expression:
+    if isinstance(value, str):
+        return F(value)
+    return value
+
+
+def get_feature(geometry: str, properties: Properties, id_field: str = "id"):
+    """Get an expression building a GeoJSON feature
+
+    The feature has the same structure as the output of
+    :class:`rest_framework_gis.serializers.GeoFeatureModelSerializer`.
+
+    :param geometry: Name of the geometry field.
+    :param properties: Properties of the feature.
+    :param id_field: Name of the field used as the id of the feature.
+    """
+    return JSONBuildObject(
+        id=F(id_field),
+        type=Cast(Value("Feature"), TextField()),
+        geometry=AsGeoJSONObject(geometry),
+        properties=JSONBuildObject(
+            **{key: _as_expression(value) for key, value in properties.items()}
+        ),
+    )
+
+
+def get_choice_display(field: str, choices: Iterable[Tuple[Any, Any]]) -> Case:
+    """Get an expression returning the label of a choice in the current
+    language, similar to ``get_FOO_display``
+
+    :param field: Name of the field.
+    :param choices: Choices of the field, e.g. ``FlowType.choices``.
+    """
+    whens = []
+    for value, label in choices:
+        if value is None:
+            lookup = {f"{field}__isnull": True}
+        else:
+            lookup = {field: value}
+        whens.append(When(**lookup, then=Value(str(label))))
+    return Case(*whens, default=F(field), output_field=TextField())
+
+
+def iter_feature_collection(
+    queryset: QuerySet,
+    geometry: str,
+    properties: Properties,
+    chunk_size: int = DATABASE_CHUNK_SIZE,
+) -> Iterator[str]:
+    """Iterate over the JSON text of a GeoJSON feature collection
+
+    The features are fetched and yielded in chunks of ``chunk_size``.
+
+    :param queryset: Queryset of all features.
+    :param geometry: Name of the geometry field.
+    :param properties: Properties of the features.
+    :param chunk_size: Number of features fetched from the database
+        and yielded at once.
+    """
+    features = _get_features(queryset, geometry, properties).iterator(
+        chunk_size=chunk_size
+    )
+    yield FEATURE_COLLECTION_START
+    chunk = []
+    separator = ""
+    for feature in features:
+        chunk.append(feature)
+        if len(chunk) >= chunk_size:
+            yield separator + ",".join(chunk)
+            separator = ","
+            chunk = []
+    if chunk:
+        yield separator + ",".join(chunk)
+    yield FEATURE_COLLECTION_END
+
+
+async def aiter_feature_collection(
+    queryset: QuerySet,
+    geometry: str,
+    properties: Properties,
+    chunk_size: int = DATABASE_CHUNK_SIZE,
+) -> AsyncIterator[str]:
+    """Asynchronous variant of :func:`iter_feature_collection`
+
+    Used when running with ASGI. Django would otherwise consume the
+    synchronous iterator at once and hold the whole feature collection
+    in memory.
+    """
+    features = _get_features(queryset, geometry, properties).aiterator(
+        chunk_size=chunk_size
+    )
+    yield FEATURE_COLLECTION_START
+    chunk = []
+    separator = ""
+    async for feature in features:
+        chunk.append(feature)
+        if len(chunk) >= chunk_size:
+            yield separator + ",".join(chunk)
+            separator = ","
+            chunk = []
+    if chunk:
+        yield separator + ",".join(chunk)
+    yield FEATURE_COLLECTION_END
+
+
+def _get_features(
+    queryset: QuerySet, geometry: str, properties: Properties
+) -> QuerySet:
+    return queryset.annotate(
+        geojson_feature=Cast(get_feature(geometry, properties), TextField())
+    ).values_list("geojson_feature", flat=True)
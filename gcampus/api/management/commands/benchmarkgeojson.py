@@ -0,0 +1,135 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+__all__ = ["Command"]
+
+import random
+import statistics
+import time
+from typing import Callable, List, Tuple
+
+from django.contrib.gis.geos import Point
+from django.db import transaction
+from django.utils import timezone
+from django_rich.management import RichCommand
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rich.table import Table
+
+from gcampus.api.geojson import iter_feature_collection
+from gcampus.api.serializers import MeasurementListSerializer
+from gcampus.api.views import MeasurementAPIViewSet
+from gcampus.core.models import Measurement, Water
+
+
+class Command(RichCommand):
+    help = (
+        "Compare serializing the measurement list with the DRF serializer and "
+        "in the database. Temporary measurements are created and removed "
+        "afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--count",
+            type=int,
+            default=50000,
+            help="Number of temporary measurements (default: 50000)",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="Number of runs per serializer (default: 3)",
+        )
+
+    def handle(self, count, repeat, **kwargs):
+        with transaction.atomic():
+            self.create_measurements(count)
+            # Use the queryset of the unpaginated list (i.e. the map)
+            view = MeasurementAPIViewSet(
+                action="list", request=Request(APIRequestFactory().get("/"))
+            )
+            queryset = view.get_queryset()
+            table = Table("Serializer", "Features", "Size (MB)", "Median (ms)")
+            for name, serialize in (
+                ("DRF", lambda: self.serialize_drf(queryset)),
+                ("Database", lambda: self.serialize_database(queryset)),
+            ):
+                size, timings = self.benchmark(serialize, max(repeat, 1))
+                table.add_row(
+                    name,
+                    str(queryset.count()),
+                    f"{size / 1e6:.1f}",
+                    f"{statistics.median(timings):.1f}",
+                )
+            # Remove all temporary measurements
+            transaction.set_rollback(True)
+        self.console.print(table)
+
+    @staticmethod
+    def create_measurements(count: int):
+        water = Water.objects.create(
+            name="Benchmark", geometry=Point(8.684231, 49.411955)
+        )
+        now = timezone.now()
+        Measurement.objects.bulk_create(
+            (
+                Measurement(
+                    location=Point(
+                        random.uniform(5.0, 15.0), random.uniform(47.0, 55.0)
+                    ),
+                    water=water,
+                    time=now,
+                )
+                for _ in range(count)
+            ),
+            batch_size=5000,
+        )
+
+    @staticmethod
+    def serialize_drf(queryset) -> bytes:
+        serializer = MeasurementListSerializer(queryset, many=True)
+        return JSONRenderer().render(serializer.data)
+
+    @staticmethod
+    def serialize_database(queryset) -> bytes:
+        view = MeasurementAPIViewSet()
+        return b"".join(
+            chunk.encode("utf-8")
+            for chunk in iter_feature_collection(
+                queryset,
+                view.get_geojson_geometry_field(),
+                view.get_geojson_properties(),
+            )
+        )
+
+    @staticmethod
+    def benchmark(
+        serialize: Callable[[], bytes], repeat: int
+    ) -> Tuple[int, List[float]]:
+        """Serialize all measurements
+
+        :returns: Size of the response in bytes and the list of
+            latencies in milliseconds.
+        """
+        size = 0
+        timings: List[float] = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            size = len(serialize())
+            timings.append((time.perf_counter() - start) * 1000)
+        return size, timings
@@ -0,0 +1,250 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""OpenStreetMap extract reader
+
+Reads water elements from local OpenStreetMap extracts instead of
+querying the Overpass API. Supported formats are:
+
+* ``.osm.pbf``: The binary format used by e.g. Geofabrik. Requires the
+  optional ``osmium`` package (pyosmium).
+* ``.json``: Overpass JSON output including geometries (i.e. queried
+  with ``out geom;``).
+
+Elements are filtered using the same tags as the water lookup (see
+:meth:`gcampus.api.views.OverpassLookupAPIViewSet.get_overpass_query`)
+and their geometries are assembled just like Overpass responses.
+"""
+
+__all__ = ["read_elements", "is_water", "OSMFileError"]
+
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from django.contrib.gis.geos import Point
+
+from gcampus.api.overpass import Element, Node, Way, _object_hook
+
+logger = logging.getLogger("gcampus.api.osmfile")
+
+_EXCLUDED_WATER = {"river", "stream", "canal", "ditch", "drain"}
+_NATURAL = {"wetland", "coastline", "bay"}
+_WATERWAY = {"river", "stream", "tidal_channel", "canal", "drain", "ditch"}
+#: Ways with these roles in a water relation are already part of the
+#: relation's geometry and are not imported separately.
+_RELATION_ROLES = {"main_stream", "outer", "inner"}
+
+#: Number of characters read from JSON files at once
+_JSON_CHUNK_SIZE = 64 * 1024
+_JSON_ELEMENTS = re.compile(r'"elements"\s*:\s*\[')
+_JSON_WHITESPACE = re.compile(r"[\s,]*")
+
+
+def is_water(element_type: str, tags: dict) -> bool:
+    """Check whether an element matches the tag filters of the water
+    lookup.
+
+    :param element_type: One of ``node``, ``way`` or ``relation``.
+    :param tags: Tags of the element.
+    """
+    if element_type == "node":
+        return tags.get("natural") == "spring"
+    natural = tags.get("natural")
+    if natural == "water" and tags.get("water") not in _EXCLUDED_WATER:
+        return True
+    return natural in _NATURAL or tags.get("waterway") in _WATERWAY
+
+
+def read_elements(path: Union[str, Path]) -> Iterator[Element]:
+    """Read all water elements from a local OpenStreetMap extract.
+
+    The elements are read lazily, i.e. the extract is never loaded into
+    memory as a whole. Both formats are read twice: The first pass
+    collects the relations, the second one yields the elements.
+
+    :param path: Path to a ``.osm.pbf`` or ``.json`` file.
+    :returns: Iterator of elements with assembled geometries.
+    :raises OSMFileError: If the file format is not supported or the
+        ``osmium`` package is not installed.
+    """
+    path = Path(path)
+    if path.name.endswith(".pbf"):
+        try:
+            import osmium  # noqa: F401
+        except ImportError as e:
+            raise OSMFileError(
+                "Reading '.osm.pbf' files requires the 'osmium' package"
+            ) from e
+        return _read_pbf(path)
+    elif path.name.endswith(".json"):
+        return _read_json(path)
+    raise OSMFileError(f"Unsupported file format '{path.name}'")
+
+
+def _iter_json_array(
+    path: Path, object_hook: Optional[Callable[[dict], object]] = None
+) -> Iterator[object]:
+    """Iterate over the ``elements`` array of an Overpass JSON file
+    without loading the whole file.
+
+    :param path: Path to the JSON file.
+    :param object_hook: Passed to :class:`json.JSONDecoder`.
+    """
+    decoder = json.JSONDecoder(object_hook=object_hook)
+    with path.open("r", encoding="utf-8") as file:
+        buffer = ""
+        match = None
+        while match is None:
+            chunk = file.read(_JSON_CHUNK_SIZE)
+            if not chunk:
+                raise OSMFileError(f"No elements found in '{path.name}'")
+            buffer += chunk
+            match = _JSON_ELEMENTS.search(buffer)
+        buffer = buffer[match.end() :]
+        chunk_size = _JSON_CHUNK_SIZE
+        while True:
+            buffer = buffer[_JSON_WHITESPACE.match(buffer).end() :]
+            if buffer.startswith("]"):
+                return
+            try:
+                obj, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError as e:
+                # The element is not complete yet. Large elements (e.g.
+                # relations) are read with increasing chunk sizes.
+                chunk = file.read(chunk_size)
+                if not chunk:
+                    raise OSMFileError(f"Invalid JSON in '{path.name}'") from e
+                buffer += chunk
+                chunk_size *= 2
+                continue
+            chunk_size = _JSON_CHUNK_SIZE
+            buffer = buffer[end:]
+            yield obj
+
+
+def _read_json(path: Path) -> Iterator[Element]:
+    # Overpass outputs relations last. Their member ways have to be
+    # known before the ways are yielded.
+    excluded_ways: Set[int] = set()
+    for obj in _iter_json_array(path):
+        if (
+            isinstance(obj, dict)
+            and obj.get("type") == "relation"
+            and is_water("relation", obj.get("tags", {}))
+        ):
+            excluded_ways.update(
+                member["ref"]
+                for member in obj.get("members", [])
+                if member.get("type") == "way" and member.get("role") in _RELATION_ROLES
+            )
+
+    def object_hook(obj: dict):
+        if obj.get("type") == "relation" and not is_water(
+            "relation", obj.get("tags", {})
+        ):
+            # Skip assembling the geometries of other relations
+            return obj
+        try:
+            return _object_hook(obj)
+        except KeyError:
+            # Elements without geometries (i.e. not queried with
+            # 'out geom;') are skipped.
+            logger.warning("Skip element %s without geometry", obj.get("id"))
+            return obj
+
+    for element in _iter_json_array(path, object_hook=object_hook):
+        if (
+            isinstance(element, Element)
+            and is_water(element.get_element_type(), element.tags)
+            and not (isinstance(element, Way) and element.osm_id in excluded_ways)
+        ):
+            yield element
+
+
+def _read_pbf(path: Path) -> Iterator[Element]:
+    import osmium
+
+    Coordinates = List[Dict[str, float]]
+
+    # The first pass collects all relations and their members. The
+    # second pass assembles the ways (with node locations) required for
+    # the relations' geometries.
+    relations: List[dict] = []
+    member_ways: Set[int] = set()
+    excluded_ways: Set[int] = set()
+    for r in osmium.FileProcessor(str(path), osmium.osm.RELATION):
+        tags = {tag.k: tag.v for tag in r.tags}
+        if not is_water("relation", tags):
+            continue
+        members: List[Tuple[int, str]] = [
+            (member.ref, member.role) for member in r.members if member.type == "w"
+        ]
+        relations.append({"id": r.id, "tags": tags, "members": members})
+        for ref, role in members:
+            member_ways.add(ref)
+            if role in _RELATION_ROLES:
+                excluded_ways.add(ref)
+
+    # Only the geometries of relation members are kept in memory
+    way_geometries: Dict[int, Coordinates] = {}
+    processor = osmium.FileProcessor(
+        str(path), osmium.osm.NODE | osmium.osm.WAY
+    ).with_locations()
+    for obj in processor:
+        if obj.is_node():
+            tags = {tag.k: tag.v for tag in obj.tags}
+            if is_water("node", tags) and obj.location.valid():
+                point = Point(obj.location.lon, obj.location.lat)
+                yield Node(obj.id, tags, point)
+            continue
+        is_member = obj.id in member_ways
+        tags = {tag.k: tag.v for tag in obj.tags}
+        is_water_way = obj.id not in excluded_ways and is_water("way", tags)
+        if not (is_member or is_water_way):
+            continue
+        geometry: Coordinates = [
+            {"lon": node.location.lon, "lat": node.location.lat}
+            for node in obj.nodes
+            if node.location.valid()
+        ]
+        if len(geometry) < 2:
+            continue
+        if is_member:
+            way_geometries[obj.id] = geometry
+        if is_water_way:
+            way = {"type": "way", "id": obj.id, "tags": tags, "geometry": geometry}
+            yield _object_hook(way)
+
+    for relation in relations:
+        members = [
+            {
+                "type": "way",
+                "ref": ref,
+                "role": role,
+                "geometry": way_geometries[ref],
+            }
+            for ref, role in relation["members"]
+            if ref in way_geometries
+        ]
+        element = _object_hook({"type": "relation", **relation, "members": members})
+        if isinstance(element, Element):
+            yield element
+
+
+class OSMFileError(Exception):
+    pass
@@ -27,6 +27,9 @@ __all__ = [
     "Way",
     "Relation",
     "query",
+    "aquery",
+    "OverpassAPIError",
+    "OverpassTimeoutError",
     "OverpassParseError",
 ]
 __author__ = "Jonas Drotleff <j.drotleff@desk-lab.de>"
@@ -50,6 +53,8 @@ from django.contrib.gis.geos import (
     MultiLineString,
 )
 
+from gcampus.core.instrumentation import external_request
+
 timeout_regex = re.compile(r"\[timeout:\d+\]")
 logger = logging.getLogger("gcampus.api.overpass")
 
@@ -272,34 +277,23 @@ def query(
     :rtype: List[Element]
     :raises requests.exceptions.JSONDecodeError: If response is not JSON
     """
-    if endpoint is None:
-        endpoint = getattr(
-            settings, "OVERPASS_SERVER", "https://overpass-api.de/api/interpreter"
-        )
-    user_agent = getattr(
-        settings, "REQUEST_USER_AGENT", f"GewaesserCampus ({settings.GCAMPUS_HOMEPAGE})"
+    endpoint, headers, request_timeout = _prepare_request(
+        overpass_query, endpoint, request_timeout
     )
-    if request_timeout is None:
-        request_timeout = getattr(settings, "OVERPASS_TIMEOUT", 20)
-    if timeout_regex.search(overpass_query) is None:
-        logger.warning("Overpass query does not contain a timeout.")
-    else:
-        # Add 1 second to the timeout to avoid a request timeout just
-        # before the overpass server returns a timeout.
-        request_timeout += 1
     if client is None:
         _client = httpx.Client()
     else:
         _client = client
     try:
-        response: httpx.Response = _client.post(
-            endpoint,
-            content=overpass_query,
-            headers={"User-Agent": user_agent},
-            timeout=request_timeout,
-        )
+        with external_request():
+            response: httpx.Response = _client.post(
+                endpoint,
+                content=overpass_query,
+                headers=headers,
+                timeout=request_timeout,
+            )
     except httpx.TimeoutException as e:
-        raise OverpassAPIError(getattr(e, "message", "Timeout"))
+        raise OverpassTimeoutError(getattr(e, "message", "Timeout"))
     finally:
         if client is None:
             # Close '_client' manually. Otherwise, the client has to be
@@ -311,9 +305,90 @@ def query(
         raise OverpassAPIError(response.text)
 
 
+async def aquery(
+    overpass_query: str,
+    *,
+    endpoint: Optional[str] = None,
+    request_timeout: Optional[int] = None,
+    client: Optional[httpx.AsyncClient] = None,
+    **parse_kwargs,
+) -> List[Element]:
+    """Query Overpass API asynchronously
+
+    Asynchronous counterpart of :func:`.query`. The request is sent
+    using :class:`httpx.AsyncClient`, such that the event loop is free
+    to serve other requests while waiting for Overpass to respond.
+
+    :param overpass_query: Query string for Overpass. Should always
+        include the ``[out:json]`` tag.
+    :param endpoint: URL endpoint. If ``None``, the endpoint configured
+        in the Django settings is used.
+    :param request_timeout: Timeout in seconds for the query.
+    :param client: Optional asynchronous HTTPX client for sending
+        requests.
+    :param parse_kwargs: Additional keyword arguments passed to the
+        ``_parse`` function.
+    :returns: List of all elements
+    :rtype: List[Element]
+    """
+    endpoint, headers, request_timeout = _prepare_request(
+        overpass_query, endpoint, request_timeout
+    )
+    if client is None:
+        _client = httpx.AsyncClient()
+    else:
+        _client = client
+    try:
+        with external_request():
+            response: httpx.Response = await _client.post(
+                endpoint,
+                content=overpass_query,
+                headers=headers,
+                timeout=request_timeout,
+            )
+    except httpx.TimeoutException as e:
+        raise OverpassTimeoutError(getattr(e, "message", "Timeout"))
+    finally:
+        if client is None:
+            await _client.aclose()
+    if response.is_success:
+        return _parse(response, **parse_kwargs)
+    else:
+        raise OverpassAPIError(response.text)
+
+
+def _prepare_request(
+    overpass_query: str, endpoint: Optional[str], request_timeout: Optional[int]
+) -> Tuple[str, dict, int]:
+    """Resolve the endpoint, headers and timeout used for a query.
+
+    :returns: Tuple of ``(endpoint, headers, request_timeout)``.
+    """
+    if endpoint is None:
+        endpoint = getattr(
+            settings, "OVERPASS_SERVER", "https://overpass-api.de/api/interpreter"
+        )
+    user_agent = getattr(
+        settings, "REQUEST_USER_AGENT", f"GewaesserCampus ({settings.GCAMPUS_HOMEPAGE})"
+    )
+    if request_timeout is None:
+        request_timeout = getattr(settings, "OVERPASS_TIMEOUT", 20)
+    if timeout_regex.search(overpass_query) is None:
+        logger.warning("Overpass query does not contain a timeout.")
+    else:
+        # Add 1 second to the timeout to avoid a request timeout just
+        # before the overpass server returns a timeout.
+        request_timeout += 1
+    return endpoint, {"User-Agent": user_agent}, request_timeout
+
+
 class OverpassAPIError(Exception):
     pass
 
 
+class OverpassTimeoutError(OverpassAPIError):
+    pass
+
+
 class OverpassParseError(Exception):
     pass
@@ -0,0 +1,58 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+__all__ = ["GeoJsonCursorPagination"]
+
+from collections import OrderedDict
+
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+
+class GeoJsonCursorPagination(CursorPagination):
+    """Cursor pagination for GeoJSON feature collections
+
+    Results are ordered by their last update, such that clients can
+    continue from the last cursor to fetch all changes (see
+    ``updated_at``). Pagination is optional and only used if the
+    ``cursor`` or ``page_size`` URL parameter is provided. Otherwise,
+    all results are returned (e.g. for the map).
+    """
+
+    ordering = ("updated_at", "id")
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if (
+            self.cursor_query_param not in request.query_params
+            and self.page_size_query_param not in request.query_params
+        ):
+            return None
+        return super(GeoJsonCursorPagination, self).paginate_queryset(
+            queryset, request, view=view
+        )
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("type", "FeatureCollection"),
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("features", data["features"]),
+                ]
+            )
+        )
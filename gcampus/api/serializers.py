@@ -13,20 +13,99 @@
 #  You should have received a copy of the GNU Affero General Public License
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+from typing import Optional, Dict
+
+from django.conf import settings
 from django.urls import reverse
 from rest_framework import serializers
+from rest_framework_gis.fields import GeometryField
 from rest_framework_gis.serializers import GeoFeatureModelSerializer
 
-from gcampus.core.models import Measurement, Parameter, ParameterType, Water
+from gcampus.core.models import (
+    Measurement,
+    Parameter,
+    ParameterType,
+    Water,
+    GeometryResolution,
+)
+from gcampus.core.models.functions import BOUNDING_BOX_COORDINATES
+
+#: Tree of selected fields, e.g. ``{"id": {}, "parameters": {"value": {}}}``.
+#: An empty dict selects all fields of a nested serializer.
+SparseFields = Dict[str, "SparseFields"]
+
+
+def parse_sparse_fields(value: str) -> SparseFields:
+    """Parse a comma-separated list of (dotted) field names
+
+    For example, ``id,location,parameters.value`` selects the fields
+    ``id`` and ``location`` as well as the field ``value`` of the
+    nested ``parameters``.
+
+    :param value: Comma-separated list of field names.
+    """
+    fields: SparseFields = {}
+    for name in value.split(","):
+        if not name.strip():
+            continue
+        tree = fields
+        for part in name.strip().split("."):
+            tree = tree.setdefault(part, {})
+    return fields
+
+
+class SparseFieldsMixin:
+    """Mixin for serializers that only include a selection of fields
+
+    The selection (see :func:`parse_sparse_fields`) is provided as
+    ``fields`` in the context of the root serializer and passed on to
+    nested serializers using this mixin. The id and geometry of GeoJSON
+    features are always included.
+    """
+
+    #: Selected fields, set by the parent serializer. ``None`` selects
+    #: all fields.
+    sparse_fields: Optional[SparseFields] = None
 
+    def get_fields(self):
+        fields = super(SparseFieldsMixin, self).get_fields()
+        selected: Optional[SparseFields] = self.sparse_fields
+        if selected is None and self._is_root():
+            selected = self.context.get("fields", None)
+        if not selected:
+            return fields
+        unknown = set(selected) - set(fields)
+        if unknown:
+            raise serializers.ValidationError(
+                {"fields": [f"Unknown field '{name}'." for name in sorted(unknown)]}
+            )
+        required = {
+            getattr(self.Meta, "id_field", None),
+            getattr(self.Meta, "geo_field", None),
+        }
+        for name in list(fields):
+            if name not in selected and name not in required:
+                del fields[name]
+        for name, nested_fields in selected.items():
+            serializer = getattr(fields[name], "child", fields[name])
+            if nested_fields and isinstance(serializer, SparseFieldsMixin):
+                serializer.sparse_fields = nested_fields
+        return fields
 
-class ParameterTypeSerializer(serializers.ModelSerializer):
+    def _is_root(self) -> bool:
+        parent = getattr(self, "parent", None)
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        return parent is None
+
+
+class ParameterTypeSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = ParameterType
         fields = ("name", "short_name", "unit", "color", "category")
 
 
-class ParameterSerializer(serializers.ModelSerializer):
+class ParameterSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     parameter_type = ParameterTypeSerializer(many=False, read_only=True)
     measurement = serializers.PrimaryKeyRelatedField(many=False, read_only=True)
 
@@ -35,7 +114,7 @@ class ParameterSerializer(serializers.ModelSerializer):
         fields = ("id", "value", "measurement", "parameter_type")
 
 
-class SimplifiedWaterSerializer(serializers.ModelSerializer):
+class SimplifiedWaterSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Water
         fields = (
@@ -57,7 +136,7 @@ class SimplifiedWaterSerializer(serializers.ModelSerializer):
     )
 
 
-class MeasurementSerializer(GeoFeatureModelSerializer):
+class MeasurementSerializer(SparseFieldsMixin, GeoFeatureModelSerializer):
     parameters = ParameterSerializer(many=True, read_only=True)
     water = SimplifiedWaterSerializer()
     url = serializers.SerializerMethodField(read_only=True)
@@ -94,6 +173,29 @@ class MeasurementListSerializer(GeoFeatureModelSerializer):
     water_flow_type = serializers.CharField(read_only=True, source="water.flow_type")
 
 
+class MeasurementChangeSerializer(GeoFeatureModelSerializer):
+    """Compact measurement serializer used for the ``changes`` action
+
+    Related objects are only referenced by their primary key. Removed
+    parameters are detected by comparing the list of parameters.
+    """
+
+    parameters = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+
+    class Meta:
+        model = Measurement
+        geo_field = "location"
+        fields = ("id", "name", "time", "comment", "water", "parameters")
+
+
+class ParameterChangeSerializer(serializers.ModelSerializer):
+    """Compact parameter serializer used for the ``changes`` action"""
+
+    class Meta:
+        model = Parameter
+        fields = ("id", "value", "comment", "measurement", "parameter_type")
+
+
 class WaterSerializer(GeoFeatureModelSerializer):
     """Water GeoJSON serializer
 
@@ -132,7 +234,25 @@ class WaterSerializer(GeoFeatureModelSerializer):
         source="get_water_type_display", read_only=True
     )
 
+    def get_fields(self):
+        # The resolution of the geometry may be set using the context
+        # (see 'GeometryResolutionMixin'). Simplified geometries are
+        # read-only as they are computed by the database.
+        fields = super(WaterSerializer, self).get_fields()
+        resolution = self.context.get("geometry_resolution", None)
+        if resolution not in (None, GeometryResolution.FULL):
+            fields["geometry"] = GeometryField(
+                source=GeometryResolution(resolution).field_name, read_only=True
+            )
+        return fields
+
     def get_bbox(self, obj: Water):
+        if hasattr(obj, "bbox_xmin"):
+            # Computed by the database (see 'GeometryResolutionMixin')
+            return {
+                coordinate: getattr(obj, f"bbox_{coordinate}")
+                for coordinate in BOUNDING_BOX_COORDINATES
+            }
         xmin, ymin, xmax, ymax = obj.geometry.extent
         return dict(xmin=xmin, ymin=ymin, xmax=xmax, ymax=ymax)
 
@@ -165,3 +285,60 @@ class WaterListSerializer(serializers.ModelSerializer):
     display_water_type = serializers.CharField(
         source="get_water_type_display", read_only=True
     )
+
+
+class NearbyQuerySerializer(serializers.Serializer):
+    """Validates the URL parameters of the ``nearby`` actions (see
+    :class:`gcampus.api.views.mixins.NearbyMixin`).
+    """
+
+    lng = serializers.FloatField(min_value=-180, max_value=180)
+    lat = serializers.FloatField(min_value=-90, max_value=90)
+    k = serializers.IntegerField(
+        min_value=1,
+        max_value=getattr(settings, "NEARBY_MAX_RESULTS", 50),
+        default=10,
+    )
+
+
+class ChangesQuerySerializer(serializers.Serializer):
+    """Validates the URL parameters of the ``changes`` actions (see
+    :class:`gcampus.api.views.mixins.ChangesMixin`).
+
+    Objects updated at or after ``since`` are returned. If ``after`` is
+    provided, objects updated exactly at ``since`` are only returned if
+    their primary key is greater than ``after``.
+    """
+
+    since = serializers.DateTimeField()
+    after = serializers.IntegerField(min_value=0, required=False)
+    page_size = serializers.IntegerField(
+        min_value=1,
+        max_value=getattr(settings, "CHANGES_MAX_PAGE_SIZE", 1000),
+        default=getattr(settings, "REST_FRAMEWORK", {}).get("PAGE_SIZE", 100),
+    )
+
+
+class GeometryResolutionQuerySerializer(serializers.Serializer):
+    """Validates the URL parameters used to select the resolution of
+    water geometries (see
+    :class:`gcampus.api.views.mixins.GeometryResolutionMixin`). The
+    resolution is either set explicitly using ``resolution`` or derived
+    from the ``zoom`` level of the map. Defaults to the resolution
+    passed as ``default_resolution`` in the context or the full
+    resolution.
+    """
+
+    resolution = serializers.ChoiceField(
+        choices=GeometryResolution.choices, required=False
+    )
+    zoom = serializers.IntegerField(min_value=0, max_value=24, required=False)
+
+    def validate(self, attrs: dict) -> dict:
+        if "resolution" in attrs:
+            resolution = GeometryResolution(attrs["resolution"])
+        elif "zoom" in attrs:
+            resolution = GeometryResolution.from_zoom(attrs["zoom"])
+        else:
+            resolution = self.context.get("default_resolution", GeometryResolution.FULL)
+        return {"resolution": resolution}
@@ -0,0 +1,50 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django.urls import reverse
+
+from gcampus.api import overpass
+from gcampus.auth.throttling import RedisRateThrottle
+
+
+class AsyncOverpassLookupTest(SimpleTestCase):
+    @mock.patch.object(RedisRateThrottle, "wait", return_value=4.2)
+    @mock.patch.object(RedisRateThrottle, "allow_request", return_value=False)
+    async def test_throttled(self, allow_request_mock, wait_mock):
+        # The async client runs all middleware asynchronously
+        response = await self.async_client.get(
+            reverse("v1:overpasslookup-async"), {"geo": "0,0,1,1"}
+        )
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "5")
+        allow_request_mock.assert_called_once()
+
+    @mock.patch.object(RedisRateThrottle, "allow_request", return_value=True)
+    async def test_overpass_error(self, allow_request_mock):
+        for error, status_code in (
+            (overpass.OverpassAPIError("rate_limited"), 502),
+            (overpass.OverpassTimeoutError("Timeout"), 504),
+        ):
+            with self.subTest(error=error), mock.patch.object(
+                overpass, "aquery", side_effect=error
+            ):
+                response = await self.async_client.get(
+                    reverse("v1:overpasslookup-async"), {"geo": "0,0,1,1"}
+                )
+                self.assertEqual(response.status_code, status_code)
+                self.assertIn("detail", response.json())
@@ -0,0 +1,119 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from datetime import timedelta
+
+from django.contrib.admin import site
+from django.contrib.gis.geos import Point
+from django.urls import reverse
+from django.utils import timezone
+
+from gcampus.core.admin import MeasurementAdmin, ParameterAdmin, hide
+from gcampus.core.models import Measurement, Parameter, ParameterType
+from gcampus.core.tests.mixins import (
+    TokenTestMixin,
+    WaterTestMixin,
+    ThrottleTestMixin,
+)
+from gcampus.tasks.tests.utils import BaseMockTaskTest
+
+
+class ChangesAPITest(
+    ThrottleTestMixin, TokenTestMixin, WaterTestMixin, BaseMockTaskTest
+):
+    def setUp(self):
+        super().setUp()
+        self.since = timezone.now() - timedelta(minutes=1)
+        self.url = reverse("v1:measurement-changes")
+        self.parameter_type = ParameterType.objects.create(name="Nitrate")
+        self.measurements = [
+            Measurement.objects.create(
+                token=self.tokens[0],
+                location=Point(8.684231, 49.411955),
+                water=self.water,
+                time=timezone.now(),
+            )
+            for _ in range(3)
+        ]
+
+    def _get_changes(self, url, **params) -> dict:
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_pagination(self):
+        data = self._get_changes(self.url, since=self.since.isoformat(), page_size=2)
+        self.assertTrue(data["has_more"])
+        ids = [result["id"] for result in data["results"]]
+        data = self._get_changes(data["next"])
+        self.assertFalse(data["has_more"])
+        ids += [result["id"] for result in data["results"]]
+        self.assertEqual(ids, [measurement.pk for measurement in self.measurements])
+        # Nothing changed since the last page
+        self.assertEqual(self._get_changes(data["next"])["results"], [])
+
+    def test_tombstone(self):
+        data = self._get_changes(self.url, since=self.since.isoformat())
+        measurement = self.measurements[0]
+        measurement.hidden = True
+        measurement.save()
+        data = self._get_changes(data["next"])
+        self.assertEqual(len(data["results"]), 1)
+        self.assertEqual(data["results"][0]["id"], measurement.pk)
+        self.assertTrue(data["results"][0]["deleted"])
+        self.assertIsNone(data["results"][0]["data"])
+
+    def test_admin_hide(self):
+        measurement = self.measurements[0]
+        parameter = Parameter.objects.create(
+            measurement=measurement, parameter_type=self.parameter_type, value=1.0
+        )
+        data = self._get_changes(self.url, since=self.since.isoformat())
+        parameters = self._get_changes(
+            reverse("v1:parameter-changes"), since=self.since.isoformat()
+        )
+        hide(
+            ParameterAdmin(Parameter, site),
+            None,
+            Parameter.all_objects.filter(pk=parameter.pk),
+        )
+        hide(
+            MeasurementAdmin(Measurement, site),
+            None,
+            Measurement.all_objects.filter(pk=measurement.pk),
+        )
+        data = self._get_changes(data["next"])
+        self.assertEqual(len(data["results"]), 1)
+        self.assertEqual(data["results"][0]["id"], measurement.pk)
+        self.assertTrue(data["results"][0]["deleted"])
+        parameters = self._get_changes(parameters["next"])
+        self.assertEqual(len(parameters["results"]), 1)
+        self.assertEqual(parameters["results"][0]["id"], parameter.pk)
+        self.assertTrue(parameters["results"][0]["deleted"])
+
+    def test_parameters(self):
+        data = self._get_changes(self.url, since=self.since.isoformat())
+        measurement = self.measurements[0]
+        parameter = Parameter.objects.create(
+            measurement=measurement, parameter_type=self.parameter_type, value=1.0
+        )
+        data = self._get_changes(data["next"])
+        self.assertEqual(len(data["results"]), 1)
+        result = data["results"][0]["data"]
+        self.assertEqual(result["properties"]["parameters"], [parameter.pk])
+        parameters = self._get_changes(
+            reverse("v1:parameter-changes"), since=self.since.isoformat()
+        )
+        self.assertEqual(parameters["results"][0]["id"], parameter.pk)
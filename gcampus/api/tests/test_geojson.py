@@ -0,0 +1,106 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import json
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+
+from django.contrib.gis.geos import Point
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from gcampus.api.geojson import aiter_feature_collection, iter_feature_collection
+from gcampus.api.serializers import MeasurementListSerializer, WaterSerializer
+from gcampus.api.views import MeasurementAPIViewSet, WaterLookupAPIViewSet
+from gcampus.core.models import Measurement, Water
+from gcampus.core.tests.mixins import (
+    TokenTestMixin,
+    WaterTestMixin,
+    ThrottleTestMixin,
+)
+from gcampus.tasks.tests.utils import BaseMockTaskTest
+
+
+class GeoJSONStreamTest(
+    ThrottleTestMixin, TokenTestMixin, WaterTestMixin, BaseMockTaskTest
+):
+    def setUp(self):
+        super().setUp()
+        for i in range(3):
+            Measurement.objects.create(
+                token=self.tokens[0],
+                location=Point(8.684231 + i, 49.411955),
+                water=self.water,
+                time=timezone.now(),
+            )
+
+    @staticmethod
+    def _render(data) -> dict:
+        return json.loads(JSONRenderer().render(data))
+
+    def test_measurement_list(self):
+        response = self.client.get(reverse("v1:measurement-list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        queryset = MeasurementAPIViewSet.queryset.all()
+        self.assertEqual(
+            json.loads(b"".join(response.streaming_content)),
+            self._render(MeasurementListSerializer(queryset, many=True).data),
+        )
+
+    def test_water_features(self):
+        view = WaterLookupAPIViewSet()
+        queryset = Water.objects.order_by("name")
+        features = "".join(
+            iter_feature_collection(
+                queryset, "geometry", view.get_geojson_properties(), chunk_size=1
+            )
+        )
+        self.assertEqual(
+            json.loads(features),
+            self._render(WaterSerializer(queryset, many=True).data),
+        )
+
+    async def test_async_features(self):
+        properties = WaterLookupAPIViewSet().get_geojson_properties()
+        queryset = Water.objects.order_by("name")
+        features = [
+            chunk
+            async for chunk in aiter_feature_collection(
+                queryset, "geometry", properties, chunk_size=1
+            )
+        ]
+        self.assertEqual(
+            features,
+            await sync_to_async(list)(
+                iter_feature_collection(queryset, "geometry", properties, chunk_size=1)
+            ),
+        )
+
+    @override_settings(INSTRUMENTATION_EXPORT_METRICS=True)
+    @mock.patch("gcampus.core.middleware.export_metrics")
+    def test_streaming_metrics(self, export_mock):
+        response = self.client.get(reverse("v1:measurement-list"))
+        self.assertTrue(response.streaming)
+        # Metrics are exported once the content has been sent
+        export_mock.assert_not_called()
+        b"".join(response.streaming_content)
+        export_mock.assert_called_once()
+        _, metrics, _ = export_mock.call_args.args
+        # The features are fetched while streaming
+        self.assertGreater(metrics.query_count, 0)
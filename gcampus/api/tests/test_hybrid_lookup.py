@@ -0,0 +1,92 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from datetime import timedelta
+from unittest import mock
+
+from django.test import override_settings
+from django.urls import reverse
+
+from gcampus.api import overpass
+from gcampus.api.overpass import _object_hook
+from gcampus.core.models import OverpassCoverage
+from gcampus.core.tests.mixins import ThrottleTestMixin
+from gcampus.tasks.tests.utils import BaseMockTaskTest
+
+#: Lake inside the cells (16, 99) and (16, 100)
+LAKE = _object_hook(
+    {
+        "type": "way",
+        "id": 1,
+        "tags": {"natural": "water", "name": "Lake"},
+        "geometry": [
+            {"lon": 8.3, "lat": 49.95},
+            {"lon": 8.4, "lat": 49.95},
+            {"lon": 8.4, "lat": 50.05},
+            {"lon": 8.3, "lat": 49.95},
+        ],
+    }
+)
+
+
+@override_settings(
+    OVERPASS_COVERAGE_CELL_SIZE=0.5, OVERPASS_COVERAGE_MAX_AGE=timedelta(days=1)
+)
+@mock.patch.object(overpass, "query", return_value=[LAKE])
+class HybridLookupTest(ThrottleTestMixin, BaseMockTaskTest):
+    url = reverse("v1:hybridlookup-list")
+
+    def lookup(self, bbox: str):
+        return self.client.get(self.url, {"geo": bbox})
+
+    def test_stale_cells(self, query_mock):
+        # Cells (16, 99) to (17, 100)
+        cells = OverpassCoverage.get_cells((8.2, 49.9, 8.6, 50.1))
+        response = self.lookup("8.2,49.9,8.6,50.1")
+        self.assertEqual(response.status_code, 200)
+        query_mock.assert_called_once()
+        self.assertEqual(OverpassCoverage.get_stale_cells(cells), [])
+        names = [
+            feature["properties"]["name"] for feature in response.json()["features"]
+        ]
+        self.assertEqual(names, ["Lake"])
+
+    def test_fresh_cells(self, query_mock):
+        OverpassCoverage.mark_synced(OverpassCoverage.get_cells((8.2, 49.9, 8.6, 50.1)))
+        response = self.lookup("8.2,49.9,8.6,50.1")
+        self.assertEqual(response.status_code, 200)
+        query_mock.assert_not_called()
+
+    def test_scattered_cells(self, query_mock):
+        cells = OverpassCoverage.get_cells((8.2, 49.6, 9.2, 50.6))
+        self.assertEqual(len(cells), 9)
+        # Only two opposite corners are stale
+        OverpassCoverage.mark_synced(cells[1:-1])
+        response = self.lookup("8.2,49.6,9.2,50.6")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(query_mock.call_count, 2)
+        self.assertEqual(OverpassCoverage.get_stale_cells(cells), [])
+
+    def test_overpass_error(self, query_mock):
+        for error, status_code in (
+            (overpass.OverpassAPIError("Too many requests"), 502),
+            (overpass.OverpassTimeoutError("Timeout"), 504),
+        ):
+            with self.subTest(error=error):
+                query_mock.side_effect = error
+                response = self.lookup("8.2,49.9,8.6,50.1")
+                self.assertEqual(response.status_code, status_code)
+        # Cells are not marked as synced if the query failed
+        self.assertEqual(OverpassCoverage.objects.count(), 0)
@@ -0,0 +1,84 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from django.contrib.gis.geos import Point
+from django.urls import reverse
+from django.utils import timezone
+
+from gcampus.core.models import Measurement, Parameter, ParameterType
+from gcampus.core.tests.mixins import (
+    TokenTestMixin,
+    WaterTestMixin,
+    ThrottleTestMixin,
+)
+from gcampus.tasks.tests.utils import BaseMockTaskTest
+
+
+class MeasurementAPITest(
+    ThrottleTestMixin, TokenTestMixin, WaterTestMixin, BaseMockTaskTest
+):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("v1:measurement-list")
+        parameter_type = ParameterType.objects.create(
+            name="Nitrate", unit="mg/l", identifier="no3"
+        )
+        for i in range(3):
+            measurement = Measurement.objects.create(
+                token=self.tokens[0],
+                name=f"Measurement {i}",
+                location=Point(8.684231, 49.411955),
+                water=self.water,
+                time=timezone.now(),
+            )
+            Parameter.objects.create(
+                measurement=measurement, parameter_type=parameter_type, value=i
+            )
+
+    def test_unpaginated(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["features"]), 3)
+
+    def test_cursor_pagination(self):
+        response = self.client.get(self.url, {"page_size": 2})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data["features"]), 2)
+        self.assertIsNotNone(data["next"])
+        data = self.client.get(data["next"]).json()
+        self.assertEqual(len(data["features"]), 1)
+        self.assertIsNone(data["next"])
+
+    def test_sparse_fields(self):
+        response = self.client.get(self.url, {"fields": "id,location,parameters.value"})
+        self.assertEqual(response.status_code, 200)
+        feature = response.json()["features"][0]
+        self.assertIn("geometry", feature)
+        self.assertEqual(list(feature["properties"]), ["parameters"])
+        self.assertEqual(list(feature["properties"]["parameters"][0]), ["value"])
+
+    def test_unknown_field(self):
+        response = self.client.get(self.url, {"fields": "id,unknown"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_conditional_request(self):
+        response = self.client.get(self.url)
+        etag = response["ETag"]
+        response = self.client.get(self.url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        Measurement.objects.first().save()
+        response = self.client.get(self.url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,110 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from django.conf import settings
+from django.contrib.gis.geos import LineString, Point
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+
+from gcampus.api.views import WaterAPIViewSet
+from gcampus.core.models import GeometryResolution, Measurement, Water
+from gcampus.core.tests.mixins import (
+    TokenTestMixin,
+    WaterTestMixin,
+    ThrottleTestMixin,
+)
+from gcampus.tasks.tests.utils import BaseMockTaskTest
+
+
+class NearbyAPITest(
+    ThrottleTestMixin, TokenTestMixin, WaterTestMixin, BaseMockTaskTest
+):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse("v1:measurement-nearby")
+        # Measurements are created in a different order than their
+        # distance to the point (8, 49).
+        self.measurements = {}
+        for offset in (0.3, 0.1, 0.2):
+            self.measurements[offset] = Measurement.objects.create(
+                token=self.tokens[0],
+                location=Point(8 + offset, 49),
+                water=self.water,
+                time=timezone.now(),
+            )
+
+    def get_ids(self, url: str, params: dict) -> list:
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return [feature["id"] for feature in response.json()["features"]]
+
+    def test_ordering(self):
+        self.assertEqual(
+            self.get_ids(self.url, {"lng": 8, "lat": 49}),
+            [self.measurements[offset].pk for offset in (0.1, 0.2, 0.3)],
+        )
+        self.assertEqual(
+            self.get_ids(self.url, {"lng": 8.35, "lat": 49}),
+            [self.measurements[offset].pk for offset in (0.3, 0.2, 0.1)],
+        )
+
+    def test_water_ordering(self):
+        # Distances are measured to the closest point of the geometry
+        river = Water.objects.create(
+            name="River", geometry=LineString((7, 49.01), (8.5, 49.01))
+        )
+        self.assertEqual(
+            self.get_ids(reverse("v1:water-nearby"), {"lng": 8, "lat": 49}),
+            [river.pk, self.water.pk],
+        )
+
+    def test_limit(self):
+        ids = self.get_ids(self.url, {"lng": 8, "lat": 49, "k": 2})
+        self.assertEqual(ids, [self.measurements[offset].pk for offset in (0.1, 0.2)])
+        response = self.client.get(
+            self.url, {"lng": 8, "lat": 49, "k": settings.NEARBY_MAX_RESULTS + 1}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("k", response.json())
+        response = self.client.get(self.url, {"lng": 8, "lat": 49, "k": 0})
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalid_point(self):
+        for params, field in (
+            ({"lat": 49}, "lng"),
+            ({"lng": 8}, "lat"),
+            ({"lng": "east", "lat": 49}, "lng"),
+            ({"lng": 181, "lat": 49}, "lng"),
+            ({"lng": 8, "lat": -91}, "lat"),
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(list(response.json()), [field])
+
+    def test_water_resolution(self):
+        url = reverse("v1:water-nearby")
+        for params, resolution in (
+            ({}, GeometryResolution.MEDIUM),
+            ({"resolution": "full"}, GeometryResolution.FULL),
+            ({"zoom": 8}, GeometryResolution.LOW),
+        ):
+            with self.subTest(params=params):
+                view = WaterAPIViewSet(action="nearby", args=(), kwargs={})
+                view.request = view.initialize_request(
+                    APIRequestFactory().get(url, {"lng": 8, "lat": 49, **params})
+                )
+                self.assertEqual(view.get_geometry_resolution(), resolution)
@@ -0,0 +1,134 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import json
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from gcampus.api import osmfile
+from gcampus.api.overpass import Node, Relation, Way
+
+_LAKE = [
+    {"lat": 49.0, "lon": 8.0},
+    {"lat": 49.0, "lon": 8.1},
+    {"lat": 49.1, "lon": 8.1},
+    {"lat": 49.0, "lon": 8.0},
+]
+_RIVER = [{"lat": 49.2, "lon": 8.0}, {"lat": 49.3, "lon": 8.2}]
+
+#: Overpass output (queried with 'out geom;') in the order used by
+#: Overpass, i.e. nodes, ways and relations.
+EXTRACT = {
+    "version": 0.6,
+    "generator": "Overpass API",
+    "osm3s": {"copyright": "The data included in this document is from OSM."},
+    "elements": [
+        {"type": "node", "id": 1, "lat": 49.0, "lon": 8.0},
+        {
+            "type": "node",
+            "id": 2,
+            "lat": 49.5,
+            "lon": 8.5,
+            "tags": {"natural": "spring", "name": "Spring"},
+        },
+        {
+            "type": "way",
+            "id": 10,
+            "tags": {"natural": "water", "name": "Lake"},
+            "geometry": _LAKE,
+        },
+        {
+            "type": "way",
+            "id": 11,
+            "tags": {"natural": "water", "water": "river"},
+            "geometry": _LAKE,
+        },
+        {
+            "type": "way",
+            "id": 12,
+            "tags": {"waterway": "river", "name": "River"},
+            "geometry": _RIVER,
+        },
+        {"type": "way", "id": 13, "tags": {"highway": "path"}, "geometry": _RIVER},
+        {
+            "type": "relation",
+            "id": 20,
+            "tags": {"type": "waterway", "waterway": "river", "name": "River"},
+            "members": [
+                {"type": "way", "ref": 12, "role": "main_stream", "geometry": _RIVER}
+            ],
+        },
+        {
+            "type": "relation",
+            "id": 21,
+            "tags": {"type": "route", "route": "hiking"},
+            "members": [{"type": "way", "ref": 13, "role": "", "geometry": _RIVER}],
+        },
+    ],
+}
+
+
+def write_extract(directory: str, data: dict = EXTRACT) -> Path:
+    path = Path(directory) / "extract.json"
+    with path.open("w", encoding="utf-8") as file:
+        json.dump(data, file, indent=2)
+    return path
+
+
+class OSMFileTest(SimpleTestCase):
+    def test_is_water(self):
+        self.assertTrue(osmfile.is_water("node", {"natural": "spring"}))
+        self.assertFalse(osmfile.is_water("node", {"natural": "water"}))
+        self.assertTrue(osmfile.is_water("way", {"natural": "water"}))
+        self.assertTrue(osmfile.is_water("way", {"natural": "wetland"}))
+        self.assertTrue(osmfile.is_water("relation", {"waterway": "stream"}))
+        self.assertFalse(
+            osmfile.is_water("way", {"natural": "water", "water": "river"})
+        )
+        self.assertFalse(osmfile.is_water("way", {"waterway": "dam"}))
+        self.assertFalse(osmfile.is_water("way", {}))
+
+    def test_read_json(self):
+        with tempfile.TemporaryDirectory() as directory:
+            elements = list(osmfile.read_elements(write_extract(directory)))
+        # The river way is part of the river relation
+        self.assertEqual([element.osm_id for element in elements], [2, 10, 20])
+        self.assertIsInstance(elements[0], Node)
+        self.assertIsInstance(elements[1], Way)
+        self.assertIsInstance(elements[2], Relation)
+        self.assertEqual(elements[2].get_name(), "River")
+
+    def test_read_json_chunks(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = write_extract(directory)
+            expected = [element.osm_id for element in osmfile.read_elements(path)]
+            # Elements are split across multiple chunks
+            with mock.patch.object(osmfile, "_JSON_CHUNK_SIZE", 16):
+                elements = list(osmfile.read_elements(path))
+        self.assertEqual([element.osm_id for element in elements], expected)
+
+    def test_read_invalid_json(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "extract.json"
+            path.write_text('{"elements": [{"type": "node", "id": 2', "utf-8")
+            with self.assertRaises(osmfile.OSMFileError):
+                list(osmfile.read_elements(path))
+
+    def test_unsupported_format(self):
+        with self.assertRaises(osmfile.OSMFileError):
+            osmfile.read_elements("extract.osm")
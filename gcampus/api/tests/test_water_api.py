@@ -0,0 +1,114 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from django.contrib.gis.geos import LineString
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework.test import APIRequestFactory
+
+from gcampus.api.views import WaterAPIViewSet
+from gcampus.core.models import GeometryResolution, Water
+from gcampus.core.tests.mixins import ThrottleTestMixin
+from gcampus.tasks.tests.utils import BaseMockTaskTest
+
+
+class GeometryResolutionTest(SimpleTestCase):
+    def test_from_zoom(self):
+        for zoom, resolution in (
+            (0, GeometryResolution.LOW),
+            (10, GeometryResolution.LOW),
+            (11, GeometryResolution.MEDIUM),
+            (14, GeometryResolution.MEDIUM),
+            (15, GeometryResolution.FULL),
+            (22, GeometryResolution.FULL),
+        ):
+            with self.subTest(zoom=zoom):
+                self.assertEqual(GeometryResolution.from_zoom(zoom), resolution)
+
+
+class WaterAPITest(ThrottleTestMixin, BaseMockTaskTest):
+    def setUp(self):
+        super().setUp()
+        # Zigzag line with a deviation of about 50 meters that is
+        # removed by the low resolution only
+        self.water = Water.objects.create(
+            name="Zigzag River",
+            geometry=LineString(
+                [(8 + i * 0.01, 49 + (i % 2) * 0.0005) for i in range(10)]
+            ),
+        )
+        self.url = reverse("v1:water-detail", kwargs={"pk": self.water.pk})
+
+    def get_feature(self, params: dict) -> dict:
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_resolution(self):
+        for params, count in (
+            ({}, 10),
+            ({"resolution": "full"}, 10),
+            ({"resolution": "medium"}, 10),
+            ({"resolution": "low"}, 2),
+            ({"zoom": 16}, 10),
+            ({"zoom": 12}, 10),
+            ({"zoom": 5}, 2),
+            # The resolution takes precedence over the zoom level
+            ({"resolution": "low", "zoom": 16}, 2),
+        ):
+            with self.subTest(params=params):
+                feature = self.get_feature(params)
+                self.assertEqual(len(feature["geometry"]["coordinates"]), count)
+
+    def test_invalid_resolution(self):
+        for params in ({"resolution": "ultra"}, {"zoom": -1}, {"zoom": 25}):
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                self.assertEqual(response.status_code, 400)
+
+    def test_bbox(self):
+        xmin, ymin, xmax, ymax = self.water.geometry.extent
+        expected = dict(xmin=xmin, ymin=ymin, xmax=xmax, ymax=ymax)
+        for params in ({}, {"resolution": "low"}):
+            with self.subTest(params=params):
+                bbox = self.get_feature(params)["properties"]["bbox"]
+                self.assertEqual(bbox.keys(), expected.keys())
+                for key, value in expected.items():
+                    self.assertAlmostEqual(bbox[key], value)
+
+    def test_deferred_geometries(self):
+        for params, loaded in (
+            ({"resolution": "low"}, "geometry_low"),
+            ({"zoom": 12}, "geometry_medium"),
+            ({}, "geometry"),
+        ):
+            with self.subTest(params=params):
+                view = WaterAPIViewSet(action="retrieve", args=(), kwargs={})
+                view.request = view.initialize_request(
+                    APIRequestFactory().get(self.url, params)
+                )
+                water = view.get_queryset().get(pk=self.water.pk)
+                self.assertEqual(
+                    water.get_deferred_fields(),
+                    set(Water.geometry_fields) - {loaded},
+                )
+
+    def test_list_deferred_geometries(self):
+        response = self.client.get(reverse("v1:water-list"))
+        self.assertEqual(response.status_code, 200)
+        view = WaterAPIViewSet(action="list", args=(), kwargs={})
+        view.request = view.initialize_request(APIRequestFactory().get(self.url))
+        water = view.get_queryset().get(pk=self.water.pk)
+        self.assertEqual(water.get_deferred_fields(), set(Water.geometry_fields))
@@ -24,6 +24,8 @@ from gcampus.api.views import (
     WaterAPIViewSet,
     WaterLookupAPIViewSet,
     OverpassLookupAPIViewSet,
+    HybridLookupAPIViewSet,
+    overpass_lookup,
 )
 
 router_v1 = routers.DefaultRouter()
@@ -35,7 +37,11 @@ router_v1.register(r"waterlookup", WaterLookupAPIViewSet, basename="waterlookup"
 router_v1.register(
     r"overpasslookup", OverpassLookupAPIViewSet, basename="overpasslookup"
 )
+router_v1.register(r"hybridlookup", HybridLookupAPIViewSet, basename="hybridlookup")
 
-urlpatterns = [path("", include(router_v1.urls))]
+urlpatterns = [
+    path("async/overpasslookup/", overpass_lookup, name="overpasslookup-async"),
+    path("", include(router_v1.urls)),
+]
 
 app_name = GCampusAPIAppConfig.label
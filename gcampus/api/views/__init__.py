@@ -19,9 +19,12 @@ __all__ = [
     "ParameterAPIViewSet",
     "WaterLookupAPIViewSet",
     "OverpassLookupAPIViewSet",
+    "HybridLookupAPIViewSet",
     "WaterAPIViewSet",
+    "overpass_lookup",
 ]
 
+from gcampus.api.views.asynchronous import overpass_lookup
 from gcampus.api.views.models import (
     MeasurementAPIViewSet,
     ParameterTypeAPIViewSet,
@@ -30,5 +33,6 @@ from gcampus.api.views.models import (
 from gcampus.api.views.water import (
     WaterLookupAPIViewSet,
     OverpassLookupAPIViewSet,
+    HybridLookupAPIViewSet,
     WaterAPIViewSet,
 )
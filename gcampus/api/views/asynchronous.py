@@ -0,0 +1,120 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Asynchronous API views
+
+These views are plain (async) Django views instead of Django REST
+framework views, as the latter does not support ``async def`` handlers.
+They are intended for endpoints that mostly wait for external I/O, like
+the Overpass API. When served by an ASGI worker (see
+``gunicorn.asgi.conf.py``), many slow lookups can run concurrently in a
+single process without blocking a worker each.
+"""
+
+__all__ = ["overpass_lookup"]
+
+import logging
+import math
+from typing import List, Optional
+
+from asgiref.sync import sync_to_async
+from django.http import HttpRequest, JsonResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import Throttled
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from gcampus.api import overpass
+from gcampus.api.exceptions import from_overpass_error
+from gcampus.api.filtersets import WaterLookupFilterSet
+from gcampus.api.overpass import Element
+from gcampus.api.serializers import (
+    WaterSerializer,
+    GeometryResolutionQuerySerializer,
+)
+from gcampus.api.utils import GeoLookupValue
+from gcampus.api.views.water import OverpassLookupAPIViewSet
+from gcampus.core.models import Water, GeometryResolution
+
+logger = logging.getLogger("gcampus.api.views.asynchronous")
+
+
+@require_GET
+async def overpass_lookup(request: HttpRequest) -> JsonResponse:
+    """Asynchronous variant of
+    :meth:`gcampus.api.views.OverpassLookupAPIViewSet.list`.
+
+    Requests are throttled with the default throttle classes of the API
+    (``DEFAULT_THROTTLE_CLASSES``).
+
+    The Overpass API is queried with :func:`gcampus.api.overpass.aquery`.
+    Accepts the same URL parameters and returns the same GeoJSON as the
+    synchronous view. Errors of the Overpass API are returned as
+    ``502`` or ``504`` responses (see
+    :func:`gcampus.api.exceptions.from_overpass_error`).
+    """
+    throttle: Optional[BaseThrottle] = await _check_throttles(request)
+    if throttle is not None:
+        return _throttled_response(throttle.wait())
+    filterset = WaterLookupFilterSet(request.GET, queryset=Water.objects.none())
+    if not filterset.is_valid():
+        return JsonResponse(filterset.errors.get_json_data(), status=400)
+    params = GeometryResolutionQuerySerializer(data=request.GET)
+    if not params.is_valid():
+        return JsonResponse(params.errors, status=400)
+    geo_lookup_value: GeoLookupValue = filterset.form.cleaned_data["geo"]
+    overpass_query: str = OverpassLookupAPIViewSet.get_overpass_query(
+        geo_lookup_value.get_bbox_coordinates()
+    )
+    try:
+        result: List[Element] = await overpass.aquery(overpass_query)
+    except overpass.OverpassAPIError as e:
+        logger.warning("Overpass lookup failed: %s", e)
+        exception = from_overpass_error(e)
+        return JsonResponse({"detail": exception.detail}, status=exception.status_code)
+    return JsonResponse(
+        await _save_and_serialize(result, params.validated_data["resolution"])
+    )
+
+
+@sync_to_async
+def _check_throttles(request: HttpRequest) -> Optional[BaseThrottle]:
+    # Django REST framework does not throttle plain Django views. Apply
+    # the same throttles as for all API views. Loading the user and
+    # checking the rate limit in Redis are blocking.
+    for throttle_class in api_settings.DEFAULT_THROTTLE_CLASSES:
+        throttle: BaseThrottle = throttle_class()
+        if not throttle.allow_request(request, None):
+            return throttle
+    return None
+
+
+def _throttled_response(wait: Optional[float]) -> JsonResponse:
+    exception = Throttled(wait)
+    response = JsonResponse({"detail": exception.detail}, status=exception.status_code)
+    if wait is not None:
+        response["Retry-After"] = str(math.ceil(wait))
+    return response
+
+
+@sync_to_async
+def _save_and_serialize(
+    elements: List[Element], resolution: GeometryResolution
+) -> dict:
+    # Saving is done in a single transaction which is not supported by
+    # the async ORM. The serializer also queries related measurements.
+    waters: List[Water] = OverpassLookupAPIViewSet.save_elements(elements)
+    context = {"geometry_resolution": resolution}
+    return WaterSerializer(waters, many=True, context=context).data
@@ -13,8 +13,38 @@
 #  You should have received a copy of the GNU Affero General Public License
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.gis.geos import Point
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Q, QuerySet
+from django.http import HttpRequest, StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.decorators import action
+from rest_framework.request import Request
+from rest_framework.response import Response
 from rest_framework.serializers import BaseSerializer
 
+from gcampus.api.geojson import (
+    Properties,
+    aiter_feature_collection,
+    iter_feature_collection,
+)
+from gcampus.api.serializers import (
+    ChangesQuerySerializer,
+    NearbyQuerySerializer,
+    GeometryResolutionQuerySerializer,
+)
+from gcampus.core.http_cache import cache_public_response
+from gcampus.core.models import Water, GeometryResolution
+from gcampus.core.models.functions import (
+    BOUNDING_BOX_COORDINATES,
+    BoundingBoxCoordinate,
+    KNNDistance,
+)
+
 
 class MethodSerializerMixin:
     """Mixin that returns a different serializer class depending on the
@@ -35,3 +65,222 @@ class MethodSerializerMixin:
         Defaults to using :attr:`.serializer_class`.
         """
         return getattr(self, f"serializer_class_{self.action}", self.serializer_class)
+
+
+class NearbyMixin:
+    """Mixin for viewsets that adds a ``nearby`` action returning the
+    ``k`` nearest objects to the point specified by the ``lng`` and
+    ``lat`` URL parameters.
+
+    Objects are ordered using the PostGIS ``<->`` operator (see
+    :class:`gcampus.core.models.functions.KNNDistance`) on the geometry
+    field :attr:`.nearby_field`. The query is thereby answered using
+    the spatial index of that field.
+    """
+
+    #: Name of the geometry field used to measure the distance.
+    nearby_field: str
+
+    @action(detail=False, methods=["get"])
+    def nearby(self, request: Request, *args, **kwargs) -> Response:
+        params = NearbyQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        point = Point(
+            params.validated_data["lng"], params.validated_data["lat"], srid=4326
+        )
+        queryset = (
+            self.filter_queryset(self.get_queryset())
+            .annotate(knn_distance=KNNDistance(self.nearby_field, point))
+            .order_by("knn_distance")[: params.validated_data["k"]]
+        )
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
+
+
+class ChangesMixin:
+    """Mixin for viewsets that adds a ``changes`` action returning all
+    objects created, updated or hidden since a watermark
+
+    Objects are ordered by ``(updated_at, id)`` and paginated using this
+    key (see :class:`gcampus.api.serializers.ChangesQuerySerializer`).
+    The response contains the URL of the ``next`` page, which is also
+    used to poll for future changes. Hidden objects are returned as
+    tombstones without any data.
+
+    Objects updated within the last ``CHANGES_FEED_DELAY`` are not yet
+    returned. Otherwise, objects of transactions committed after a
+    response could be updated before the watermark and would be missed.
+    """
+
+    #: Queryset of all objects including hidden ones.
+    changes_queryset: QuerySet
+    #: Name of the boolean field marking hidden objects.
+    changes_hidden_field: Optional[str] = None
+
+    @action(detail=False, methods=["get"])
+    def changes(self, request: Request, *args, **kwargs) -> Response:
+        params = ChangesQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        since = params.validated_data["since"]
+        after: Optional[int] = params.validated_data.get("after", None)
+        page_size: int = params.validated_data["page_size"]
+
+        queryset = self.changes_queryset.all()
+        if after is None:
+            queryset = queryset.filter(updated_at__gte=since)
+        else:
+            queryset = queryset.filter(
+                Q(updated_at__gt=since) | Q(updated_at=since, pk__gt=after)
+            )
+        delay = getattr(settings, "CHANGES_FEED_DELAY", None)
+        if delay:
+            queryset = queryset.filter(updated_at__lte=timezone.now() - delay)
+        objects = list(queryset.order_by("updated_at", "pk")[: page_size + 1])
+        has_more = len(objects) > page_size
+        objects = objects[:page_size]
+
+        serializer = self.get_serializer()
+        results = []
+        for obj in objects:
+            deleted = bool(
+                self.changes_hidden_field and getattr(obj, self.changes_hidden_field)
+            )
+            results.append(
+                {
+                    "id": obj.pk,
+                    "updated_at": obj.updated_at,
+                    "deleted": deleted,
+                    "data": None if deleted else serializer.to_representation(obj),
+                }
+            )
+
+        if objects:
+            since, after = objects[-1].updated_at, objects[-1].pk
+        query = {"since": since.isoformat(), "page_size": page_size}
+        if after is not None:
+            query["after"] = after
+        next_url = request.build_absolute_uri(f"{request.path}?{urlencode(query)}")
+        return Response({"next": next_url, "has_more": has_more, "results": results})
+
+
+class GeoJSONStreamMixin:
+    """Mixin for viewsets serializing lists of GeoJSON features in the
+    database
+
+    If :attr:`.geojson_stream` is set, views may return
+    :meth:`.get_geojson_response` instead of using the serializer. The
+    features are built by PostGIS and streamed to the client (see
+    :mod:`gcampus.api.geojson`). The properties returned by
+    :meth:`.get_geojson_properties` have to match the serializer.
+    """
+
+    request: Request
+    #: Serialize lists in the database. Only used for JSON responses,
+    #: e.g. not for the browsable API.
+    geojson_stream: bool = False
+    #: Name of the geometry field.
+    geojson_geometry_field: str
+    #: Properties of the features (see
+    #: :func:`gcampus.api.geojson.get_feature`).
+    geojson_properties: Properties
+
+    def get_geojson_geometry_field(self) -> str:
+        return self.geojson_geometry_field
+
+    def get_geojson_properties(self) -> Properties:
+        return self.geojson_properties
+
+    def use_geojson_stream(self) -> bool:
+        renderer = getattr(self.request, "accepted_renderer", None)
+        return self.geojson_stream and getattr(renderer, "format", None) == "json"
+
+    def get_geojson_response(self, queryset: QuerySet) -> StreamingHttpResponse:
+        args = (
+            queryset,
+            self.get_geojson_geometry_field(),
+            self.get_geojson_properties(),
+        )
+        if isinstance(getattr(self.request, "_request", None), ASGIRequest):
+            # ASGI handlers only stream asynchronous iterators
+            content = aiter_feature_collection(*args)
+        else:
+            content = iter_feature_collection(*args)
+        return StreamingHttpResponse(content, content_type="application/json")
+
+
+class PublicCacheMixin:
+    """Mixin for viewsets caching responses of anonymous users
+
+    Responses of the actions in :attr:`.public_cache_actions` are cached
+    until the data changes (see :mod:`gcampus.core.http_cache`).
+    """
+
+    action_map: dict
+    #: Actions with cached responses. Responses that depend on the
+    #: current time (e.g. ``changes``) must not be cached.
+    public_cache_actions: Tuple[str, ...] = ("list", "retrieve")
+
+    def dispatch(self, request: HttpRequest, *args, **kwargs):
+        dispatch = super(PublicCacheMixin, self).dispatch
+        action_name = self.action_map.get(request.method.lower())
+        if action_name not in self.public_cache_actions:
+            return dispatch(request, *args, **kwargs)
+        return cache_public_response(request, dispatch, *args, **kwargs)
+
+
+class GeometryResolutionMixin:
+    """Mixin for views serializing water geometries. The resolution of
+    the geometry is chosen using the ``resolution`` or ``zoom`` URL
+    parameters (see
+    :class:`gcampus.api.serializers.GeometryResolutionQuerySerializer`)
+    and passed to the serializer as ``geometry_resolution``.
+
+    Simplified geometries are precomputed by the database (see
+    :class:`gcampus.core.models.water.GeometryResolution`), which
+    reduces the response size for large rivers considerably.
+    """
+
+    request: Request
+    action: Optional[str]
+    #: Actions serializing geometries. All geometries are deferred for
+    #: other actions (e.g. lists). Defaults to all actions.
+    geometry_resolution_actions: Optional[Tuple[str, ...]] = None
+    #: Resolutions used by actions if neither ``resolution`` nor
+    #: ``zoom`` is passed. Defaults to the full resolution.
+    default_geometry_resolutions: Dict[str, GeometryResolution] = {}
+
+    def get_default_geometry_resolution(self) -> GeometryResolution:
+        return self.default_geometry_resolutions.get(
+            self.action, GeometryResolution.FULL
+        )
+
+    def get_geometry_resolution(self) -> GeometryResolution:
+        params = GeometryResolutionQuerySerializer(
+            data=self.request.query_params,
+            context={"default_resolution": self.get_default_geometry_resolution()},
+        )
+        params.is_valid(raise_exception=True)
+        return params.validated_data["resolution"]
+
+    def get_queryset(self):
+        # Only load the geometry that is actually serialized. The
+        # bounding box is computed by the database instead of loading
+        # the full geometry (see 'WaterSerializer.get_bbox').
+        queryset = super(GeometryResolutionMixin, self).get_queryset()
+        actions = self.geometry_resolution_actions
+        if actions is not None and self.action not in actions:
+            return queryset.defer(*Water.geometry_fields)
+        field_name = self.get_geometry_resolution().field_name
+        return queryset.defer(
+            *(f for f in Water.geometry_fields if f != field_name)
+        ).annotate(
+            **{
+                f"bbox_{coordinate}": BoundingBoxCoordinate("geometry", coordinate)
+                for coordinate in BOUNDING_BOX_COORDINATES
+            }
+        )
+
+    def get_serializer_context(self) -> dict:
+        context = super(GeometryResolutionMixin, self).get_serializer_context()
+        context["geometry_resolution"] = self.get_geometry_resolution()
+        return context
@@ -13,45 +13,208 @@
 #  You should have received a copy of the GNU Affero General Public License
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+from hashlib import md5
+from typing import Optional
+
+from django.db.models import Max, Count, Prefetch, QuerySet
+from django.db.models.functions import Greatest
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
 from rest_framework import viewsets
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
 
 from gcampus.api.filtersets import MeasurementAPIFilterSet
+from gcampus.api.pagination import GeoJsonCursorPagination
 from gcampus.api.serializers import (
     MeasurementSerializer,
     ParameterTypeSerializer,
     ParameterSerializer,
     MeasurementListSerializer,
+    MeasurementChangeSerializer,
+    ParameterChangeSerializer,
+    SparseFields,
+    parse_sparse_fields,
+)
+from gcampus.api.views.mixins import (
+    MethodSerializerMixin,
+    NearbyMixin,
+    ChangesMixin,
+    GeoJSONStreamMixin,
+    PublicCacheMixin,
 )
-from gcampus.api.views.mixins import MethodSerializerMixin
 from gcampus.core.models import Measurement, ParameterType, Parameter
 
 
-class MeasurementAPIViewSet(MethodSerializerMixin, viewsets.ReadOnlyModelViewSet):
-    queryset = (
-        Measurement.objects.order_by("time")
-        .select_related("water")
-        .only("location", "water_id", "water__flow_type", "id")
-    )
+class MeasurementAPIViewSet(
+    PublicCacheMixin,
+    GeoJSONStreamMixin,
+    ChangesMixin,
+    NearbyMixin,
+    MethodSerializerMixin,
+    viewsets.ReadOnlyModelViewSet,
+):
+    queryset = Measurement.objects.order_by("time")
     serializer_class = MeasurementSerializer
 
     # Use a minimal serializer for lists. This serializer only includes
     # the bare minimum used for displaying the measurements on a map.
     serializer_class_list = MeasurementListSerializer
-    # Pagination is disabled such that the api works better with
-    # the map view.
-    pagination_class = None
+    serializer_class_nearby = MeasurementListSerializer
+    nearby_field = "location"
+    # Pagination is optional such that the api works better with the
+    # map view. Clients syncing all measurements should provide the
+    # 'cursor' or 'page_size' URL parameter.
+    pagination_class = GeoJsonCursorPagination
     # Measurement filter set used to filter for specific waters.
     filterset_class = MeasurementAPIFilterSet
+    # Hidden measurements are returned as tombstones by 'changes'
+    changes_queryset = Measurement.all_objects.prefetch_related(
+        Prefetch("parameters", queryset=Parameter.objects.only("id", "measurement_id"))
+    )
+    changes_hidden_field = "hidden"
+    serializer_class_changes = MeasurementChangeSerializer
+    # Unpaginated lists for the map are serialized by the database. The
+    # properties match 'MeasurementListSerializer'.
+    geojson_stream = True
+    geojson_geometry_field = "location"
+    geojson_properties = {
+        "water_flow_type": "water__flow_type",
+        "water_id": "water_id",
+    }
+
+    def get_sparse_fields(self) -> Optional[SparseFields]:
+        """Fields selected using the ``fields`` URL parameter, e.g.
+        ``?fields=id,location,parameters.value``. Returns ``None`` if
+        all fields should be included.
+        """
+        if not hasattr(self, "_sparse_fields"):
+            value = self.request.query_params.get("fields", "")
+            self._sparse_fields = parse_sparse_fields(value) or None
+        return self._sparse_fields
+
+    def get_serializer_class(self):
+        if self.action != "changes" and self.get_sparse_fields() is not None:
+            # The minimal serializers can not be used with a selection
+            # of fields.
+            return self.serializer_class
+        return super(MeasurementAPIViewSet, self).get_serializer_class()
+
+    def get_serializer_context(self) -> dict:
+        context = super(MeasurementAPIViewSet, self).get_serializer_context()
+        context["fields"] = self.get_sparse_fields()
+        return context
+
+    def get_queryset(self) -> QuerySet:
+        queryset = super(MeasurementAPIViewSet, self).get_queryset()
+        if self.get_serializer_class() is MeasurementListSerializer:
+            return queryset.select_related("water").only(
+                "location", "water_id", "water__flow_type", "id", "updated_at"
+            )
+        return get_measurement_queryset(queryset, self.get_sparse_fields())
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        # Clients may cache the list. The list only changes if a
+        # measurement or parameter is updated, added or removed.
+        version = queryset.aggregate(
+            last_modified=Max(Greatest("updated_at", "parameters__updated_at")),
+            measurement_count=Count("id", distinct=True),
+            parameter_count=Count("parameters", distinct=True),
+        )
+        last_modified = version["last_modified"]
+        etag = quote_etag(
+            md5(
+                f"{last_modified}:{version['measurement_count']}:"
+                f"{version['parameter_count']}".encode("utf-8")
+            ).hexdigest()
+        )
+        last_modified = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            page = self.paginate_queryset(queryset)
+            if page is not None:
+                serializer = self.get_serializer(page, many=True)
+                response = self.get_paginated_response(serializer.data)
+            elif (
+                self.use_geojson_stream()
+                and self.get_serializer_class() is MeasurementListSerializer
+            ):
+                response = self.get_geojson_response(queryset)
+            else:
+                serializer = self.get_serializer(queryset, many=True)
+                response = Response(serializer.data)
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+        return response
+
+
+def _is_selected(fields: Optional[SparseFields], name: str) -> bool:
+    return not fields or name in fields
+
+
+def get_measurement_queryset(
+    queryset: QuerySet, fields: Optional[SparseFields]
+) -> QuerySet:
+    """Only load and prefetch what is required to serialize the selected
+    fields with :class:`gcampus.api.serializers.MeasurementSerializer`
+
+    :param queryset: Measurement queryset.
+    :param fields: Selected fields (see
+        :func:`gcampus.api.serializers.parse_sparse_fields`). ``None``
+        selects all fields.
+    """
+    # The primary key is also used for the 'title' and 'url' fields
+    only = ["id", "location", "updated_at"]
+    only.extend(f for f in ("name", "time", "comment") if _is_selected(fields, f))
+    if _is_selected(fields, "water"):
+        # All fields of the water are small and required for the display
+        # name and choices.
+        queryset = queryset.select_related("water")
+        only.extend(
+            f"water__{f}" for f in ("id", "name", "osm_id", "flow_type", "water_type")
+        )
+    if _is_selected(fields, "parameters"):
+        parameter_fields = fields.get("parameters") if fields else None
+        parameters = Parameter.all_objects.all()
+        parameter_only = ["id", "measurement_id"]
+        if _is_selected(parameter_fields, "value"):
+            parameter_only.append("value")
+        if _is_selected(parameter_fields, "parameter_type"):
+            parameter_type_fields = (
+                parameter_fields.get("parameter_type") if parameter_fields else None
+            )
+            parameters = parameters.select_related("parameter_type")
+            parameter_only.append("parameter_type__id")
+            parameter_only.extend(
+                f"parameter_type__{f}"
+                for f in ParameterTypeSerializer.Meta.fields
+                if _is_selected(parameter_type_fields, f)
+            )
+        queryset = queryset.prefetch_related(
+            Prefetch("parameters", queryset=parameters.only(*parameter_only))
+        )
+    return queryset.only(*only)
 
 
-class ParameterTypeAPIViewSet(viewsets.ReadOnlyModelViewSet):
+class ParameterTypeAPIViewSet(PublicCacheMixin, viewsets.ReadOnlyModelViewSet):
     queryset = ParameterType.objects.order_by("name")
     serializer_class = ParameterTypeSerializer
     pagination_class = PageNumberPagination
 
 
-class ParameterAPIViewSet(viewsets.ReadOnlyModelViewSet):
+class ParameterAPIViewSet(
+    PublicCacheMixin,
+    ChangesMixin,
+    MethodSerializerMixin,
+    viewsets.ReadOnlyModelViewSet,
+):
     queryset = Parameter.objects.order_by("updated_at").select_related("parameter_type")
     serializer_class = ParameterSerializer
     pagination_class = PageNumberPagination
+    changes_queryset = Parameter.all_objects.all()
+    changes_hidden_field = "hidden"
+    serializer_class_changes = ParameterChangeSerializer
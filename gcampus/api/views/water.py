@@ -16,14 +16,26 @@
 __all__ = [
     "WaterLookupAPIViewSet",
     "OverpassLookupAPIViewSet",
+    "HybridLookupAPIViewSet",
     "WaterAPIViewSet",
 ]
 
+import logging
 from typing import List, Optional, Tuple
 
 from django.conf import settings
 from django.db import transaction
-from django.db.models import QuerySet
+from django.contrib.postgres.expressions import ArraySubquery
+from django.db.models import (
+    Case,
+    F,
+    OuterRef,
+    QuerySet,
+    TextField,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, NullIf
 from django_filters.rest_framework import DjangoFilterBackend
 from django_filters.utils import translate_validation
 from rest_framework import viewsets, generics
@@ -32,25 +44,98 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 
 from gcampus.api import overpass
+from gcampus.api.exceptions import from_overpass_error
 from gcampus.api.filtersets import WaterLookupFilterSet
+from gcampus.api.geojson import Properties, get_choice_display
 from gcampus.api.overpass import Element
 from gcampus.api.serializers import WaterSerializer, WaterListSerializer
 from gcampus.api.utils import GeoLookupValue
-from gcampus.api.views.mixins import MethodSerializerMixin
-from gcampus.core.models import Water
+from gcampus.api.views.mixins import (
+    ChangesMixin,
+    GeoJSONStreamMixin,
+    MethodSerializerMixin,
+    NearbyMixin,
+    GeometryResolutionMixin,
+    PublicCacheMixin,
+)
+from gcampus.core.models import Water, OverpassCoverage, Measurement, GeometryResolution
+from gcampus.core.models.coverage import Cell
+from gcampus.core.models.functions import (
+    BOUNDING_BOX_COORDINATES,
+    BoundingBoxCoordinate,
+    JSONBuildObject,
+)
+from gcampus.core.models.water import FlowType, WaterType
+from gcampus.tasks.lock import redis_lock
 
+logger = logging.getLogger("gcampus.api.views.water")
 
-class WaterLookupAPIViewSet(viewsets.ViewSetMixin, generics.ListAPIView):
+
+class WaterLookupAPIViewSet(
+    PublicCacheMixin,
+    GeoJSONStreamMixin,
+    GeometryResolutionMixin,
+    viewsets.ViewSetMixin,
+    generics.ListAPIView,
+):
     queryset = Water.objects.order_by("name")
     serializer_class = WaterSerializer
     pagination_class = None
     filterset_class = WaterLookupFilterSet
+    geojson_stream = True
 
     def list(self, request, *args, **kwargs):
+        if self.use_geojson_stream():
+            return self.get_geojson_response(self.filter_queryset(self.get_queryset()))
         return super(WaterLookupAPIViewSet, self).list(request, *args, **kwargs)
 
+    def get_geojson_geometry_field(self) -> str:
+        return self.get_geometry_resolution().field_name
+
+    def get_geojson_properties(self) -> Properties:
+        """Properties matching
+        :class:`gcampus.api.serializers.WaterSerializer`. Labels are
+        translated to the current language.
+        """
+        return {
+            "name": "name",
+            "display_name": Coalesce(
+                NullIf(F("name"), Value("")),
+                Case(
+                    *(
+                        When(
+                            water_type=value,
+                            then=Value(str(Water.get_water_name(None, value))),
+                        )
+                        for value in WaterType.values
+                    ),
+                    default=Value(str(Water.get_water_name(None, None))),
+                ),
+                output_field=TextField(),
+            ),
+            "bbox": JSONBuildObject(
+                **{
+                    coordinate: BoundingBoxCoordinate("geometry", coordinate)
+                    for coordinate in BOUNDING_BOX_COORDINATES
+                }
+            ),
+            "osm_id": "osm_id",
+            "tags": "tags",
+            "flow_type": "flow_type",
+            "display_flow_type": get_choice_display("flow_type", FlowType.choices),
+            "water_type": "water_type",
+            "display_water_type": get_choice_display("water_type", WaterType.choices),
+            "measurements": ArraySubquery(
+                Measurement.objects.filter(water_id=OuterRef("pk"))
+                .order_by("pk")
+                .values("pk")
+            ),
+        }
+
 
-class OverpassLookupAPIViewSet(viewsets.ViewSetMixin, generics.ListAPIView):
+class OverpassLookupAPIViewSet(
+    GeometryResolutionMixin, viewsets.ViewSetMixin, generics.ListAPIView
+):
     # Only return the OSM IDs
     queryset = Water.objects.only("osm_id")
     serializer_class = WaterSerializer
@@ -75,9 +160,29 @@ class OverpassLookupAPIViewSet(viewsets.ViewSetMixin, generics.ListAPIView):
         )
         # Query the Overpass API
         result: List[Element] = overpass.query(overpass_query)
+        waters: List[Water] = self.save_elements(result)
+        serializer = self.get_serializer(waters, many=True)
+        return Response(serializer.data)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, overpass.OverpassAPIError):
+            logger.warning("Overpass lookup failed: %s", exc)
+            exc = from_overpass_error(exc)
+        return super(OverpassLookupAPIViewSet, self).handle_exception(exc)
+
+    @staticmethod
+    def save_elements(elements: List[Element]) -> List[Water]:
+        """Create or update a :class:`gcampus.core.models.Water` for
+        each element returned by Overpass. All changes are made in a
+        single transaction.
+
+        :param elements: Elements returned by
+            :func:`gcampus.api.overpass.query`.
+        :returns: List of saved waters in the same order.
+        """
         waters: List[Water] = []
         with transaction.atomic():
-            for element in result:
+            for element in elements:
                 try:
                     water = Water.objects.get(osm_id=element.osm_id)
                     water.update_from_element(element)
@@ -87,8 +192,7 @@ class OverpassLookupAPIViewSet(viewsets.ViewSetMixin, generics.ListAPIView):
                     water: Water = Water.from_element(element)
                     water.save()
                     waters.append(water)
-        serializer = self.get_serializer(waters, many=True)
-        return Response(serializer.data)
+        return waters
 
     def _get_geo_lookup_value(self, request) -> Optional[GeoLookupValue]:
         """Returns an instance of
@@ -175,19 +279,95 @@ class OverpassLookupAPIViewSet(viewsets.ViewSetMixin, generics.ListAPIView):
         """
 
 
-class WaterAPIViewSet(MethodSerializerMixin, viewsets.ModelViewSet):
+class HybridLookupAPIViewSet(OverpassLookupAPIViewSet):
+    """Water lookup combining the database and the Overpass API.
+
+    The bounding box is split into the grid cells of
+    :class:`gcampus.core.models.OverpassCoverage`. Only if some of these
+    cells have not been synchronized recently, the Overpass API is
+    queried for those cells. The response always contains all waters
+    from the database intersecting the bounding box, including the
+    ones just retrieved from Overpass.
+    """
+
+    queryset = Water.objects.order_by("name")
+
+    def list(self, request: Request, **kwargs):
+        geo_lookup_value: GeoLookupValue = self._get_geo_lookup_value(request)
+        cells = OverpassCoverage.get_cells(geo_lookup_value.get_bbox_coordinates())
+        stale_cells = OverpassCoverage.get_stale_cells(cells)
+        # Scattered stale cells are queried separately. Otherwise, the
+        # query would cover the whole area in between.
+        for group in OverpassCoverage.group_cells(stale_cells):
+            self.sync_cells(group)
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(serializer.data)
+
+    def sync_cells(self, cells: List[Cell]):
+        """Query the Overpass API for the bounding box of the provided
+        cells and save all waters.
+
+        Concurrent requests for the same cells wait for each other. The
+        cells are checked again once the lock has been acquired, as
+        they might have just been synchronized by another request.
+
+        :param cells: Cells forming a rectangle (see
+            :meth:`gcampus.core.models.OverpassCoverage.group_cells`).
+        """
+        (xmin, ymin), (xmax, ymax) = min(cells), max(cells)
+        lock_name = f"overpass_coverage_{xmin}_{ymin}_{xmax}_{ymax}"
+        timeout = getattr(settings, "OVERPASS_TIMEOUT", 20)
+        with redis_lock(lock_name, timeout=timeout * 2):
+            stale_cells = OverpassCoverage.get_stale_cells(cells)
+            if not stale_cells:
+                return
+            overpass_query: str = self.get_overpass_query(
+                OverpassCoverage.get_cells_bbox(stale_cells)
+            )
+            result: List[Element] = overpass.query(overpass_query)
+            # The cells are recorded as synchronized only after the
+            # waters have been saved.
+            with transaction.atomic():
+                self.save_elements(result)
+                OverpassCoverage.mark_synced(stale_cells)
+
+
+class WaterAPIViewSet(
+    PublicCacheMixin,
+    GeometryResolutionMixin,
+    ChangesMixin,
+    NearbyMixin,
+    MethodSerializerMixin,
+    viewsets.ModelViewSet,
+):
     queryset = Water.objects.order_by("name")
     serializer_class = WaterSerializer
     serializer_class_list = WaterListSerializer
     pagination_class = PageNumberPagination
+    nearby_field = "geometry"
+    changes_queryset = Water.objects.defer(*Water.geometry_fields)
+    serializer_class_changes = WaterListSerializer
+    # Do not load the geometry fields for lists. Note that the
+    # serializer for lists does not include the geometry field for
+    # better performance.
+    geometry_resolution_actions = (
+        "retrieve",
+        "create",
+        "update",
+        "partial_update",
+        "nearby",
+    )
+    # Nearby waters are shown as an overview. Use the same resolution
+    # as for map views unless requested otherwise.
+    default_geometry_resolutions = {"nearby": GeometryResolution.MEDIUM}
 
     def get_queryset(self):
         qs: QuerySet = super(WaterAPIViewSet, self).get_queryset()
-        if self.action == "list":
-            # Do not load the geometry field for lists. Note that the
-            # serializer for lists does not include the geometry field
-            # for better performance.
-            qs.defer("geometry")
+        if self.action == "nearby":
+            # The serializer includes the primary keys of all related
+            # measurements.
+            qs = qs.prefetch_related("measurements")
         return qs
 
     def destroy(self, request, *args, **kwargs):
@@ -23,6 +23,7 @@ from django.conf import settings
 from django.core.cache import cache
 from django.utils.translation import get_language
 
+from gcampus.core.instrumentation import external_request
 from gcampus.core.models.util import EMPTY
 
 
@@ -65,11 +66,12 @@ def get_wikipedia_urls(
     else:
         _client = client
     try:
-        response: httpx.Response = _client.get(
-            f"https://www.wikidata.org/wiki/Special:EntityData/{wikidata_id!s}.json",
-            headers={"User-Agent": user_agent},
-            timeout=timeout,
-        )
+        with external_request():
+            response: httpx.Response = _client.get(
+                f"https://www.wikidata.org/wiki/Special:EntityData/{wikidata_id!s}.json",
+                headers={"User-Agent": user_agent},
+                timeout=timeout,
+            )
     except httpx.TimeoutException:
         return {}
     finally:
@@ -18,6 +18,7 @@ from django.contrib.gis import admin
 from django.db.models import QuerySet
 from django.utils.translation import gettext_lazy as _
 
+from gcampus.auth.cache import invalidate_tokens
 from gcampus.auth.models import AccessKey, CourseToken, User, Course
 from gcampus.auth.models.email import BlockedEmail
 from gcampus.core.admin import MeasurementInline
@@ -26,10 +27,13 @@ from gcampus.core.models.util import ADMIN_READ_ONLY_FIELDS
 
 def deactivate_token(modeladmin: admin.ModelAdmin, request, queryset: QuerySet):  # noqa
     queryset.update(deactivated=True)
+    # 'update' does not send any signals
+    invalidate_tokens(queryset.model, queryset.values_list("pk", flat=True))
 
 
 def reactivate_token(modeladmin: admin.ModelAdmin, request, queryset: QuerySet):  # noqa
     queryset.update(deactivated=False)
+    invalidate_tokens(queryset.model, queryset.values_list("pk", flat=True))
 
 
 deactivate_token.short_description = _("Deactivate selected tokens")
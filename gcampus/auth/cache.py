@@ -0,0 +1,109 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Token cache
+
+Resolving ``request.token`` requires the token, its course and its
+permissions. As these rarely change, the resolved token instance is
+cached (see ``TOKEN_CACHE_TIMEOUT``) and repeated requests do not
+require any database queries.
+
+Cached tokens are invalidated by the receivers in
+:mod:`gcampus.auth.receivers` whenever a token, its course or its
+permissions change. Changes made with :meth:`QuerySet.update` do not
+send signals and have to call :func:`invalidate_tokens` explicitly.
+"""
+
+__all__ = [
+    "get_cached_token",
+    "set_cached_token",
+    "invalidate_tokens",
+    "invalidate_course_tokens",
+]
+
+from functools import partial
+from typing import Iterable, Optional, Type
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from gcampus.auth.models.course import Course
+from gcampus.auth.models.token import BaseToken, AccessKey, CourseToken, TokenType
+
+#: Version of the cached data. Increase whenever the structure of the
+#: cached token changes to avoid reading incompatible entries.
+TOKEN_CACHE_VERSION = 1
+
+
+def _get_cache_key(token_type: TokenType, pk) -> str:
+    return f"gcampusauth:token:{token_type.value}:{pk}"
+
+
+def get_cached_token(token_type: TokenType, pk) -> Optional[BaseToken]:
+    """Retrieve a resolved token from the cache.
+
+    :param token_type: Type of the token.
+    :param pk: Primary key of the token.
+    :returns: The token instance (including its course and permissions)
+        or ``None`` if the token is not cached.
+    """
+    return cache.get(_get_cache_key(token_type, pk), version=TOKEN_CACHE_VERSION)
+
+
+def set_cached_token(instance: BaseToken):
+    """Store a resolved token in the cache. The course must already be
+    loaded (e.g. using ``select_related``). The permissions are loaded
+    before the instance is cached.
+
+    :param instance: Token instance.
+    """
+    instance.get_all_permissions()  # Caches the permissions on the instance
+    cache.set(
+        _get_cache_key(instance.type, instance.pk),
+        instance,
+        timeout=getattr(settings, "TOKEN_CACHE_TIMEOUT", 60 * 60),
+        version=TOKEN_CACHE_VERSION,
+    )
+
+
+def invalidate_tokens(model: Type[BaseToken], pks: Iterable):
+    """Remove tokens from the cache once the current transaction has
+    been committed. Otherwise, a concurrent request could cache the
+    token again before the changes are visible to other connections.
+    The primary keys are evaluated immediately.
+
+    :param model: Either :class:`gcampus.auth.models.AccessKey` or
+        :class:`gcampus.auth.models.CourseToken`.
+    :param pks: Primary keys of the tokens.
+    """
+    keys = [_get_cache_key(model.type, pk) for pk in pks]
+    if keys:
+        transaction.on_commit(
+            partial(cache.delete_many, keys, version=TOKEN_CACHE_VERSION)
+        )
+
+
+def invalidate_course_tokens(course: Course):
+    """Remove the course token and all access keys of a course from the
+    cache.
+
+    :param course: The course.
+    """
+    invalidate_tokens(AccessKey, course.access_keys.values_list("pk", flat=True))
+    invalidate_tokens(
+        CourseToken,
+        CourseToken.objects.filter(course=course).values_list("pk", flat=True),
+    )
@@ -19,21 +19,21 @@ from typing import Union, List, Optional
 from django.contrib.sessions.exceptions import SuspiciousSession
 from django.http import HttpRequest
 from rest_framework.exceptions import Throttled
-from rest_framework.throttling import AnonRateThrottle
 
 from gcampus.auth import session
 from gcampus.auth.exceptions import UnauthenticatedError, TokenPermissionError
 from gcampus.auth.models.token import TokenType, BaseToken
+from gcampus.auth.throttling import RedisAnonRateThrottle
 
 
-class ScopedAnonRateThrottle(AnonRateThrottle):
+class ScopedAnonRateThrottle(RedisAnonRateThrottle):
     """The default throttle classes do not support switching the scope
     after initialisation as the rate is determined using the scope when
     calling ``__init__``.
 
     This class extends the
-    :class:`rest_framework.throttling.AnonRateThrottle` and allows the
-    passing of a custom scupe when initializing the class.
+    :class:`gcampus.auth.throttling.RedisAnonRateThrottle` and allows
+    the passing of a custom scupe when initializing the class.
 
     :param scope: Optional string to set the scope. If ``None`` is
         passed, the default scope of the parent class is used.
@@ -47,11 +47,14 @@ class ScopedAnonRateThrottle(AnonRateThrottle):
 
 def throttle(scope: str = "frontend_anon"):
     """Throttle the decorated view with an optional custom scope."""
-    _throttle = ScopedAnonRateThrottle(scope)
 
     def decorator(f):
         @wraps(f)
         def wrapper(request: HttpRequest, *args, **kwargs):
+            # Throttles store the state of the current request. Create a
+            # new instance per request to avoid sharing it across
+            # threads. The rate limit itself is stored in Redis.
+            _throttle = ScopedAnonRateThrottle(scope)
             if not _throttle.allow_request(request, f):
                 raise Throttled(_throttle.wait())
             return f(request, *args, **kwargs)
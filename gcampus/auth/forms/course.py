@@ -128,8 +128,7 @@ class GenerateAccessKeysForm(forms.ModelForm):
                 "Calling 'save' with 'commit=False' is not supported."
             )
         with transaction.atomic():
-            for _ in range(self.cleaned_data["count"]):
-                AccessKey.objects.create_token(self.instance)
+            AccessKey.objects.create_tokens(self.instance, self.cleaned_data["count"])
             super(GenerateAccessKeysForm, self).save(commit=commit)
         return self.instance
 
@@ -208,10 +207,10 @@ class RegisterForm(forms.ModelForm):
             obj: Course = super(RegisterForm, self).save(commit=commit)
             # Create the main course token
             CourseToken.objects.create_token(obj)
-            for _ in range(self.cleaned_data["number_of_access_keys"]):
-                # Create the desired number of access keys. The
-                # 'token' field is generated automatically.
-                AccessKey.objects.create_token(obj)
+            # Create the desired number of access keys at once
+            AccessKey.objects.create_tokens(
+                obj, self.cleaned_data["number_of_access_keys"]
+            )
 
         # Send the registration email
         self.send_email(obj.teacher_email, token_generator)
@@ -17,9 +17,9 @@ __all__ = ["TokenAuthMiddleware"]
 
 from typing import Optional
 
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 from django.core.exceptions import ImproperlyConfigured
 from django.http import HttpRequest
-from django.utils.deprecation import MiddlewareMixin
 from django.utils.functional import SimpleLazyObject
 
 from gcampus.auth import session
@@ -35,12 +35,33 @@ def get_token_instance(request: HttpRequest) -> Optional[BaseToken]:
     return request._cached_token  # noqa
 
 
-class TokenAuthMiddleware(MiddlewareMixin):
+class TokenAuthMiddleware:
     """The token authentication middleware handles the ``request.token``
     attribute and fetches the token instance (of type
     :class:`gcampus.auth.models.BaseToken`) from the database.
+
+    The token is loaded lazily. Thus, the middleware does not block and
+    supports both sync and async requests.
     """
 
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self.process_request(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request: HttpRequest):
+        self.process_request(request)
+        return await self.get_response(request)
+
     def process_request(self, request: HttpRequest):
         if not hasattr(request, "session"):
             raise ImproperlyConfigured(
@@ -18,11 +18,12 @@ import logging
 import re
 import textwrap
 from abc import abstractmethod
-from typing import Union, Tuple, List
+from typing import Union, Tuple, List, Set
 
 from django.conf import settings
 from django.contrib.auth.models import Permission, PermissionManager
 from django.contrib.gis.db import models
+from django.db.models import Q, QuerySet
 from django.utils.crypto import get_random_string
 from django.utils.translation import gettext_lazy as _
 
@@ -62,6 +63,48 @@ class BaseTokenManager(models.Manager):
         instance.apply_default_permissions()
         return instance
 
+    def create_tokens(self, course: Course, count: int) -> list:
+        """Create multiple tokens for the same course at once. Unlike
+        calling :meth:`.create_token` repeatedly, the number of queries
+        does not depend on ``count``: The uniqueness of all tokens is
+        checked, the tokens are inserted and the default permissions
+        are applied using a single query each.
+
+        Note that no ``post_save`` signals are sent.
+
+        :param course: Course of the tokens.
+        :param count: Number of tokens to create.
+        :returns: List of created tokens.
+        """
+        if not course:
+            raise ValueError("Token must have a valid course.")
+        if count < 1:
+            return []
+        instances = self.bulk_create(
+            [
+                self.model(course=course, token=token)
+                for token in self.model.generate_tokens(count)
+            ]
+        )
+        permission_ids = list(
+            self.model.get_default_permissions().values_list("pk", flat=True)
+        )
+        field = self.model.permissions.field
+        through = self.model.permissions.through
+        through.objects.using(self._db).bulk_create(
+            [
+                through(
+                    **{
+                        f"{field.m2m_field_name()}_id": instance.pk,
+                        f"{field.m2m_reverse_field_name()}_id": permission_id,
+                    }
+                )
+                for instance in instances
+                for permission_id in permission_ids
+            ]
+        )
+        return instances
+
 
 class BaseToken(DateModelMixin):
     """The base token provides a common interface and attributes that
@@ -131,17 +174,23 @@ class BaseToken(DateModelMixin):
         masked_token: str = ("*" * (length - 3)) + self.token[-3:]
         return "-".join(textwrap.wrap(masked_token, 4))
 
+    @classmethod
+    def get_default_permissions(cls) -> QuerySet:
+        """Return all default permissions as specified in
+        :attr:`.DEFAULT_PERMISSIONS`.
+        """
+        if not hasattr(cls, "DEFAULT_PERMISSIONS") or not cls.DEFAULT_PERMISSIONS:
+            raise NotImplementedError()
+        query = Q()
+        for app_label, perm in cls.DEFAULT_PERMISSIONS:
+            query |= Q(content_type__app_label=app_label, codename=perm)
+        return Permission.objects.filter(query)
+
     def apply_default_permissions(self):
         """Apply all default permissions as specified in
         :attr:`.DEFAULT_PERMISSIONS`.
         """
-        if not hasattr(self, "DEFAULT_PERMISSIONS") or not self.DEFAULT_PERMISSIONS:
-            raise NotImplementedError()
-        perms = [
-            Permission.objects.get(content_type__app_label=app_label, codename=perm)
-            for app_label, perm in self.DEFAULT_PERMISSIONS
-        ]
-        self.permissions.set(perms)
+        self.permissions.set(self.get_default_permissions())
 
     def get_all_permissions(self) -> List[str]:
         """Return a list of all permissions in the style of
@@ -208,15 +257,37 @@ class BaseToken(DateModelMixin):
 
     @classmethod
     def generate_token(cls):
+        return cls.generate_tokens(1)[0]
+
+    @classmethod
+    def generate_tokens(cls, count: int) -> List[str]:
+        """Generate random and unique values for the :attr:`.token`
+        field. All candidates are checked with a single query. Only if
+        some of them are already taken, new candidates are generated.
+
+        :param count: Number of tokens.
+        :returns: List of unique tokens.
+        """
+        tokens: Set[str] = set()
         _counter = 0
-        while True:
+        while len(tokens) < count:
             _counter += 1
-            logger.info(f"Generating random {cls.__name__} (attempt number {_counter})")
-            token = get_random_string(
-                length=cls.TOKEN_LENGTH, allowed_chars=ALLOWED_TOKEN_CHARS
+            logger.debug(
+                f"Generating {count - len(tokens)} random {cls.__name__} "
+                f"(attempt number {_counter})"
+            )
+            candidates: Set[str] = set()
+            while len(candidates) < count - len(tokens):
+                token = get_random_string(
+                    length=cls.TOKEN_LENGTH, allowed_chars=ALLOWED_TOKEN_CHARS
+                )
+                if token not in tokens:
+                    candidates.add(token)
+            taken = cls.objects.filter(token__in=candidates).values_list(
+                "token", flat=True
             )
-            if not cls.objects.filter(token=token).exists():
-                return token
+            tokens |= candidates - set(taken)
+        return list(tokens)
 
 
 class CourseToken(BaseToken):
@@ -16,13 +16,16 @@
 import logging
 from typing import Optional, Union, Type
 
-from django.db.models.signals import post_save, post_delete
+from django.contrib.auth.models import Permission
+from django.db.models.signals import post_save, post_delete, m2m_changed, pre_delete
 from django.dispatch import receiver
 from django.utils import timezone
 from django.utils.translation import get_language
 
-from gcampus.auth.models import Course, AccessKey, BaseToken
+from gcampus.auth.cache import invalidate_tokens, invalidate_course_tokens
+from gcampus.auth.models import Course, AccessKey, BaseToken, CourseToken
 from gcampus.auth.signals import token_user_logged_in
+from gcampus.core.signals import suppressible
 from gcampus.documents.tasks import render_cached_document_view
 
 logger = logging.getLogger("gcampus.auth.recievers")
@@ -68,6 +71,7 @@ def update_last_token_login(sender, instance: BaseToken, **kwargs):  # noqa
 
 @receiver(post_save, sender=AccessKey)
 @receiver(post_delete, sender=AccessKey)
+@suppressible
 def update_access_key_documents(
     sender: Type[AccessKey],
     instance: AccessKey,
@@ -107,3 +111,67 @@ def update_access_key_documents(
             get_language(),
         ),
     )
+
+
+@receiver(post_save, sender=AccessKey)
+@receiver(post_delete, sender=AccessKey)
+@receiver(post_save, sender=CourseToken)
+@receiver(post_delete, sender=CourseToken)
+@suppressible
+def invalidate_cached_token(
+    sender: Type[BaseToken], instance: BaseToken, **kwargs  # noqa
+):
+    """Remove a changed or deleted token from the token cache (see
+    :mod:`gcampus.auth.cache`).
+    """
+    invalidate_tokens(sender, [instance.pk])
+
+
+@receiver(post_save, sender=Course)
+def invalidate_cached_course_tokens(sender, instance: Course, **kwargs):  # noqa
+    """The cached tokens include their course, e.g. to check whether the
+    course's email address has been verified. Remove all tokens of a
+    changed course from the token cache.
+    """
+    invalidate_course_tokens(instance)
+
+
+@receiver(m2m_changed, sender=AccessKey.permissions.through)
+@receiver(m2m_changed, sender=CourseToken.permissions.through)
+def invalidate_cached_token_permissions(
+    sender,  # noqa
+    instance,
+    action: str,
+    reverse: bool,
+    model,
+    pk_set: Optional[set],
+    **kwargs,  # noqa
+):
+    """Remove tokens from the token cache if their permissions change.
+
+    The signal can be sent for a token (forward) or a permission
+    (reverse). In the latter case, ``model`` is the token model.
+    """
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            invalidate_tokens(type(instance), [instance.pk])
+    elif action in ("post_add", "post_remove"):
+        invalidate_tokens(model, pk_set)
+    elif action == "pre_clear":
+        # The primary keys are not provided when clearing. Use the
+        # tokens still associated with the permission instead.
+        related_name = "access_key_set" if model is AccessKey else "course_token_set"
+        invalidate_tokens(
+            model, getattr(instance, related_name).values_list("pk", flat=True)
+        )
+
+
+@receiver(pre_delete, sender=Permission)
+def invalidate_cached_permission_tokens(sender, instance: Permission, **kwargs):  # noqa
+    """Deleting a permission does not send ``m2m_changed``. Remove all
+    tokens with this permission from the token cache.
+    """
+    invalidate_tokens(AccessKey, instance.access_key_set.values_list("pk", flat=True))
+    invalidate_tokens(
+        CourseToken, instance.course_token_set.values_list("pk", flat=True)
+    )
@@ -20,6 +20,7 @@ from django.contrib import messages
 from django.contrib.sessions.exceptions import SuspiciousSession
 from django.http import HttpRequest
 
+from gcampus.auth.cache import get_cached_token, set_cached_token
 from gcampus.auth.exceptions import ACCESS_KEY_DEACTIVATED_ERROR
 from gcampus.auth.models.token import TokenType, BaseToken, AccessKey, CourseToken
 from gcampus.auth.signals import token_user_logged_in
@@ -118,26 +119,30 @@ def get_token_instance(request: HttpRequest) -> Optional[BaseToken]:
         raise SuspiciousSession(
             "Invalid session: Token user is authenticated but token type is invalid."
         )
-    instance: BaseToken
-    if token_type is TokenType.access_key:
-        try:
-            instance = AccessKey.objects.select_related("course").get(pk=token_pk)
-        except AccessKey.DoesNotExist:
-            logout(request)
-            raise SuspiciousSession(
-                f"It seems like the access key with 'pk={token_pk}' has been deleted."
-            )
-    elif token_type is TokenType.course_token:
-        try:
-            instance = CourseToken.objects.select_related("course").get(pk=token_pk)
-        except CourseToken.DoesNotExist:
-            logout(request)
-            raise SuspiciousSession(
-                f"It seems like the course token with 'pk={token_pk}' has been deleted."
-            )
-    else:
-        # There is no other token type.
-        raise NotImplementedError()
+    # Repeated requests are answered from the cache (see
+    # 'gcampus.auth.cache') without querying the database.
+    instance: Optional[BaseToken] = get_cached_token(token_type, token_pk)
+    if instance is None:
+        if token_type is TokenType.access_key:
+            try:
+                instance = AccessKey.objects.select_related("course").get(pk=token_pk)
+            except AccessKey.DoesNotExist:
+                logout(request)
+                raise SuspiciousSession(
+                    f"It seems like the access key with 'pk={token_pk}' has been deleted."
+                )
+        elif token_type is TokenType.course_token:
+            try:
+                instance = CourseToken.objects.select_related("course").get(pk=token_pk)
+            except CourseToken.DoesNotExist:
+                logout(request)
+                raise SuspiciousSession(
+                    f"It seems like the course token with 'pk={token_pk}' has been deleted."
+                )
+        else:
+            # There is no other token type.
+            raise NotImplementedError()
+        set_cached_token(instance)
 
     if not instance.is_active:
         messages.error(request, ACCESS_KEY_DEACTIVATED_ERROR)
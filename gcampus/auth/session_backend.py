@@ -0,0 +1,59 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Token session backend
+
+Session engine (see ``SESSION_ENGINE``) storing sessions in the cache
+(i.e. Redis) instead of the database. Sessions only hold the small
+token state (see :mod:`gcampus.auth.session`), losing them e.g. due to
+a cache flush only logs out the token users.
+
+Unlike ``SESSION_SAVE_EVERY_REQUEST``, which writes every session on
+every request, the expiry of a session is only refreshed once the last
+refresh is older than ``SESSION_REFRESH_THRESHOLD`` seconds. Read-only
+requests thereby do not cause any writes.
+"""
+
+__all__ = ["SessionStore"]
+
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends.cache import SessionStore as CacheSessionStore
+
+#: Session key storing the timestamp of the last refresh.
+REFRESHED_AT = "_gcampusauth_refreshed_at"
+
+
+class SessionStore(CacheSessionStore):
+    cache_key_prefix = "gcampus.auth.session_backend"
+
+    def load(self) -> dict:
+        session_data = super(SessionStore, self).load()
+        if session_data:
+            threshold = getattr(settings, "SESSION_REFRESH_THRESHOLD", 60 * 60 * 24)
+            refreshed_at = session_data.get(REFRESHED_AT, 0)
+            now = int(time.time())
+            if now - refreshed_at > threshold:
+                # Mark the session as modified. The session middleware
+                # will save the session and thereby reset its expiry.
+                session_data[REFRESHED_AT] = now
+                self.modified = True
+        return session_data
+
+    def save(self, must_create: bool = False):
+        session_data = self._get_session(no_load=must_create)
+        session_data.setdefault(REFRESHED_AT, int(time.time()))
+        return super(SessionStore, self).save(must_create=must_create)
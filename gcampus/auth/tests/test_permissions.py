@@ -18,7 +18,7 @@ from unittest.mock import patch
 from django.contrib.auth.models import Permission
 from django.urls import reverse
 
-from gcampus.auth.models import Course
+from gcampus.auth.models import AccessKey, Course
 from gcampus.core.tests.mixins import LoginTestMixin, TokenTestMixin
 from gcampus.tasks.tests.utils import BaseMockTaskTest
 
@@ -58,8 +58,9 @@ class PermissionTest(LoginTestMixin, TokenTestMixin, BaseMockTaskTest):
         perm = Permission.objects.get(
             content_type__app_label="gcampusauth", codename="change_course"
         )
-        self.course_token.permissions.remove(perm)
-        self.course_token.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.course_token.permissions.remove(perm)
+            self.course_token.save()
         with patch.object(Course, "save") as mock:
             new_new_name = "Changed (but not saved) name"
             res = self.client.post(
@@ -73,3 +74,20 @@ class PermissionTest(LoginTestMixin, TokenTestMixin, BaseMockTaskTest):
             )
             self.assertEqual(res.status_code, 403)
             mock.assert_not_called()
+
+
+class BulkTokenTest(TokenTestMixin, BaseMockTaskTest):
+    def test_create_tokens(self):
+        # Check uniqueness, insert tokens, fetch and apply permissions.
+        # The number of queries is independent of the number of tokens.
+        with self.assertNumQueries(4):
+            access_keys = AccessKey.objects.create_tokens(self.course, 30)
+        self.assertEqual(len(access_keys), 30)
+        self.assertEqual(len({access_key.token for access_key in access_keys}), 30)
+        for access_key in AccessKey.objects.filter(
+            pk__in=[access_key.pk for access_key in access_keys]
+        ):
+            self.assertEqual(
+                access_key.get_all_permissions(),
+                self.tokens[0].get_all_permissions(),
+            )
@@ -0,0 +1,44 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from gcampus.auth.session_backend import SessionStore, REFRESHED_AT
+
+
+@override_settings(SESSION_REFRESH_THRESHOLD=60)
+class SessionBackendTest(TestCase):
+    def create_session(self) -> str:
+        session = SessionStore()
+        session["key"] = "value"
+        session.save()
+        return session.session_key
+
+    def test_no_refresh(self):
+        session = SessionStore(self.create_session())
+        self.assertEqual(session["key"], "value")
+        self.assertFalse(session.modified)
+
+    def test_refresh(self):
+        session_key = self.create_session()
+        session = SessionStore(session_key)
+        refreshed_at = session[REFRESHED_AT]
+        with mock.patch("time.time", return_value=refreshed_at + 120):
+            session = SessionStore(session_key)
+            self.assertEqual(session["key"], "value")
+            self.assertTrue(session.modified)
+            self.assertEqual(session[REFRESHED_AT], refreshed_at + 120)
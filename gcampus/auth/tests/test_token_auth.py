@@ -211,15 +211,18 @@ class CourseTokenAuthTest(BaseTokenKeyTest):
         self.assertTrue(self.client.session[AUTHENTICATION_BOOLEAN])
         response = self.client.get(reverse("gcampusauth:course-update"))
         self.assertEqual(response.status_code, 200)
-        self.course_token.deactivated = True
-        self.course_token.save()
+        # The token cache is invalidated once the change is committed
+        with self.captureOnCommitCallbacks(execute=True):
+            self.course_token.deactivated = True
+            self.course_token.save()
         response = self.client.get(reverse("gcampusauth:course-update"))
         self.assertEqual(response.status_code, 403)
         self.assertFalse(self.client.session[AUTHENTICATION_BOOLEAN])
         # After reactivating the token, the user should still be logged
         # out and unable to access the site.
-        self.course_token.deactivated = False
-        self.course_token.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.course_token.deactivated = False
+            self.course_token.save()
         response = self.client.get(reverse("gcampusauth:course-update"))
         self.assertEqual(response.status_code, 403)
         self.assertFalse(self.client.session[AUTHENTICATION_BOOLEAN])
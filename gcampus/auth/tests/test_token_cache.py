@@ -0,0 +1,66 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from django.contrib.auth.models import Permission
+
+from gcampus.auth.cache import get_cached_token, set_cached_token
+from gcampus.auth.models import AccessKey
+from gcampus.auth.models.token import TokenType
+from gcampus.core.tests.mixins import TokenTestMixin
+from gcampus.tasks.tests.utils import BaseMockTaskTest
+
+
+class TokenCacheTest(TokenTestMixin, BaseMockTaskTest):
+    def cache_access_key(self) -> AccessKey:
+        access_key = AccessKey.objects.select_related("course").get(
+            pk=self.tokens[0].pk
+        )
+        set_cached_token(access_key)
+        return access_key
+
+    def test_cached_token(self):
+        access_key = self.cache_access_key()
+        with self.assertNumQueries(0):
+            cached = get_cached_token(TokenType.access_key, access_key.pk)
+            self.assertEqual(cached, access_key)
+            self.assertTrue(cached.is_active)
+            self.assertTrue(cached.has_perm("gcampuscore.add_measurement"))
+
+    def test_invalidate_on_save(self):
+        access_key = self.cache_access_key()
+        with self.captureOnCommitCallbacks(execute=True):
+            access_key.deactivated = True
+            access_key.save()
+            # The cache is only invalidated once the change is committed
+            self.assertIsNotNone(get_cached_token(TokenType.access_key, access_key.pk))
+        self.assertIsNone(get_cached_token(TokenType.access_key, access_key.pk))
+
+    def test_invalidate_on_course_save(self):
+        access_key = self.cache_access_key()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.course.email_verified = False
+            self.course.save()
+        self.assertIsNone(get_cached_token(TokenType.access_key, access_key.pk))
+
+    def test_invalidate_on_permission_change(self):
+        access_key = self.cache_access_key()
+        with self.captureOnCommitCallbacks(execute=True):
+            access_key.permissions.clear()
+        self.assertIsNone(get_cached_token(TokenType.access_key, access_key.pk))
+        access_key = self.cache_access_key()
+        permission = Permission.objects.get(codename="add_measurement")
+        with self.captureOnCommitCallbacks(execute=True):
+            permission.access_key_set.remove(access_key)
+        self.assertIsNone(get_cached_token(TokenType.access_key, access_key.pk))
@@ -0,0 +1,99 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Redis throttling
+
+Throttle classes for Django REST framework (and the
+:func:`gcampus.auth.decorators.throttle` decorator) that keep their
+state in Redis instead of the Django cache.
+
+The default throttle classes store a list of timestamps per client in
+the cache and rewrite it on every request, which is neither atomic nor
+cheap under bursts. The classes below implement the generic cell rate
+algorithm (GCRA) in a Lua script instead: Each client only requires a
+single Redis key holding a timestamp and every check is one atomic
+round trip, shared by all workers.
+"""
+
+__all__ = ["RedisRateThrottle", "RedisAnonRateThrottle"]
+
+from functools import lru_cache
+from typing import Optional
+
+from redis.commands.core import Script
+from rest_framework.throttling import SimpleRateThrottle, AnonRateThrottle
+
+from gcampus.tasks.redis import get_redis_instance
+
+# KEYS[1]: Throttle key
+# ARGV[1]: Emission interval in milliseconds (duration / number of requests)
+# ARGV[2]: Number of requests allowed in a burst
+# Returns 0 if the request is allowed or the time to wait in milliseconds.
+_GCRA_SCRIPT = """
+local time = redis.call("TIME")
+local now = tonumber(time[1]) * 1000 + tonumber(time[2]) / 1000
+local interval = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local tat = tonumber(redis.call("GET", KEYS[1])) or now
+tat = math.max(tat, now)
+local allow_at = tat + interval - interval * burst
+if now < allow_at then
+    return math.ceil(allow_at - now)
+end
+local new_tat = tat + interval
+redis.call("SET", KEYS[1], tostring(new_tat), "PX", math.ceil(new_tat - now))
+return 0
+"""
+
+
+@lru_cache(maxsize=None)
+def _get_gcra_script() -> Script:
+    return get_redis_instance().register_script(_GCRA_SCRIPT)
+
+
+class RedisRateThrottle(SimpleRateThrottle):
+    """Base class for throttles using Redis. Like
+    :class:`rest_framework.throttling.SimpleRateThrottle`, subclasses
+    have to implement ``get_cache_key`` and set a ``scope`` or ``rate``.
+
+    A rate of e.g. ``10/min`` allows a burst of 10 requests, after which
+    one request is allowed every six seconds.
+    """
+
+    cache_format = "gcampus:throttle:%(scope)s:%(ident)s"
+
+    _wait: Optional[float] = None
+
+    def allow_request(self, request, view) -> bool:
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        interval = self.duration * 1000 / self.num_requests
+        wait = _get_gcra_script()(keys=[self.key], args=[interval, self.num_requests])
+        if wait == 0:
+            return True
+        self._wait = wait / 1000
+        return False
+
+    def wait(self) -> Optional[float]:
+        return self._wait
+
+
+class RedisAnonRateThrottle(RedisRateThrottle, AnonRateThrottle):
+    """Throttle anonymous users by IP address. Note that token users
+    are anonymous users as well.
+    """
@@ -17,10 +17,12 @@ import httpx
 from django.contrib.gis import admin
 from django.db import transaction
 from django.db.models import QuerySet
+from django.utils import timezone
 from django.utils.html import escape, format_html
 from django.utils.translation import gettext_lazy as _
 from leaflet.admin import LeafletGeoAdmin
 
+from gcampus.core.http_cache import bump_data_version
 from gcampus.core.models import (
     Measurement,
     ParameterType,
@@ -33,10 +35,16 @@ from gcampus.core.models import (
 )
 from gcampus.core.models.index.base import WaterQualityIndex
 from gcampus.core.models.util import ADMIN_READ_ONLY_FIELDS
+from gcampus.core.util import invalidate_time_histogram
 
 
 def hide(modeladmin: admin.ModelAdmin, request, queryset: QuerySet):  # noqa
-    queryset.update(hidden=True)
+    # Hidden items are returned as tombstones by the 'changes' API.
+    # Thus, 'updated_at' has to be set explicitly.
+    queryset.update(hidden=True, updated_at=timezone.now())
+    # 'update' does not send any signals
+    invalidate_time_histogram()
+    transaction.on_commit(bump_data_version)
 
 
 def osm_update(modeladmin: admin.ModelAdmin, request, queryset: QuerySet):  # noqa
@@ -49,7 +57,9 @@ def osm_update(modeladmin: admin.ModelAdmin, request, queryset: QuerySet):  # no
 
 
 def show(modeladmin: admin.ModelAdmin, request, queryset: QuerySet):  # noqa
-    queryset.update(hidden=False)
+    queryset.update(hidden=False, updated_at=timezone.now())
+    invalidate_time_histogram()
+    transaction.on_commit(bump_data_version)
 
 
 hide.short_description = _("Hide selected items for all users")
@@ -0,0 +1,45 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+__all__ = ["InstrumentedRedisCache"]
+
+from django.core.cache.backends.redis import RedisCache
+
+from gcampus.core.instrumentation import record_cache
+
+_MISSING = object()
+
+
+class InstrumentedRedisCache(RedisCache):
+    """Redis cache that records hits and misses of the current request
+
+    See :mod:`gcampus.core.instrumentation`.
+    """
+
+    def get(self, key, default=None, version=None):
+        value = super(InstrumentedRedisCache, self).get(
+            key, default=_MISSING, version=version
+        )
+        if value is _MISSING:
+            record_cache(misses=1)
+            return default
+        record_cache(hits=1)
+        return value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        values = super(InstrumentedRedisCache, self).get_many(keys, version=version)
+        record_cache(hits=len(values), misses=len(keys) - len(values))
+        return values
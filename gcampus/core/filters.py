@@ -16,7 +16,6 @@
 from typing import List, Optional, Set
 
 from django.conf import settings
-from django.contrib.postgres.search import SearchQuery
 from django.core.validators import EMPTY_VALUES
 from django.db.models import QuerySet, Q
 from django.forms import CheckboxSelectMultiple, BaseForm, Select
@@ -42,6 +41,7 @@ from gcampus.core.fields.datetime import HistogramDateTimeField
 from gcampus.core.fields.personal import ToggleField
 from gcampus.core.models import ParameterType
 from gcampus.core.models.util import EMPTY
+from gcampus.core.search import get_search_query, search
 from gcampus.core.models.water import FlowType, WaterType
 
 WATER_TYPES = [
@@ -79,27 +79,42 @@ class ParameterTypeFilter(ModelMultipleChoiceFilter):
         parameter_type_ids = [parameter_type.id for parameter_type in value]
         if parameter_type_ids in EMPTY or None in parameter_type_ids:
             return qs
-        if self.distinct:
-            qs = qs.distinct()
-        query_name = "parameters__parameter_type__pk__in"
-        for parameter_type_id in parameter_type_ids:
-            qs = self.get_method(qs)(**{query_name: [parameter_type_id]})
-        return qs
+        # The precomputed array of parameter types (see
+        # 'Measurement.parameter_type_ids') has to contain all selected
+        # parameter types. No join with the parameters is required.
+        return self.get_method(qs)(parameter_type_ids__contains=parameter_type_ids)
 
 
 class SearchFilter(CharFilter):
     TSVECTOR_CONF = getattr(settings, "TSVECTOR_CONF")
 
-    def __init__(self, *args, related_fields: Optional[List[str]] = None, **kwargs):
+    def __init__(
+        self,
+        *args,
+        related_fields: Optional[List[str]] = None,
+        trigram_field: Optional[str] = None,
+        **kwargs,
+    ):
         super(SearchFilter, self).__init__(*args, **kwargs)
         self.related_fields: List[str] = related_fields or []
+        self.trigram_field: Optional[str] = trigram_field
 
     def filter(self, qs, value):
         if value in EMPTY_VALUES:
             return qs
+        if not self.related_fields:
+            # Results are ranked by relevance. Related fields can not be
+            # ranked and would require a distinct query.
+            return search(
+                qs,
+                value,
+                field_name=self.field_name,
+                trigram_field=self.trigram_field,
+                config=self.TSVECTOR_CONF,
+            )
         if self.distinct:
             qs = qs.distinct()
-        search_query = SearchQuery(value, config=self.TSVECTOR_CONF)
+        search_query = get_search_query(value, config=self.TSVECTOR_CONF)
         query = Q(**{self.field_name: search_query})
         for related_field in self.related_fields:
             query |= Q(**{f"{related_field}__{self.field_name}": search_query})
@@ -126,6 +141,7 @@ class WaterFilterSet(FilterSet):
     )
     name = SearchFilter(
         field_name="search_vector",
+        trigram_field="name",
         label=_("Search"),
         help_text=_("Fulltext search for waters."),
     )
@@ -196,7 +212,6 @@ class MeasurementFilterSet(FilterSet):
     name = SearchFilter(
         field_name="search_vector",
         label=_("Search"),
-        related_fields=["water"],
         help_text=_("Fulltext search for measurements."),
     )
     time_range = DateRange(
@@ -0,0 +1,296 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Cache for public responses
+
+Pages and API responses served to anonymous users only depend on the
+requested URL, the language and the data stored in the database. They
+are cached with a global data version as part of the cache key. Every
+change to a measurement, parameter or water increments this version
+(see :func:`bump_data_version`), thus invalidating all cached responses
+at once.
+"""
+
+__all__ = [
+    "DATA_VERSION_CACHE_KEY",
+    "get_data_version",
+    "bump_data_version",
+    "get_public_cache_key",
+    "cache_public_response",
+    "public_cache",
+]
+
+import hashlib
+import re
+import time
+from functools import wraps
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+from django.http import (
+    HttpRequest,
+    HttpResponse,
+    HttpResponseBase,
+    StreamingHttpResponse,
+)
+from django.middleware.csrf import get_token
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from django.utils.translation import get_language
+
+from gcampus.auth import session
+from gcampus.core.apps import GCampusCoreAppConfig
+
+DATA_VERSION_CACHE_KEY = f"{GCampusCoreAppConfig.label}:data:version"
+PUBLIC_CACHE_KEY = f"{GCampusCoreAppConfig.label}:public"
+
+# The CSRF token is different for every client and must not be shared
+# using the cache. Tokens are replaced by this placeholder before a
+# response is cached and a new token is inserted for every cache hit.
+_CSRF_PLACEHOLDER = b"__gcampus_csrf_token__"
+_CSRF_INPUT_RE = re.compile(rb'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+
+# Tuple of content, headers and ETag
+CachedResponse = Tuple[bytes, dict, str]
+
+
+def get_data_version() -> int:
+    """Get the current data version
+
+    The version is initialized with the current time. If the key has
+    been evicted from the cache, the new version is still larger than
+    all previous versions and no outdated responses are returned.
+    """
+    return cache.get_or_set(DATA_VERSION_CACHE_KEY, time.time_ns(), None)
+
+
+def bump_data_version() -> int:
+    """Increment the data version and thus invalidate all cached
+    public responses.
+
+    :returns: The new data version.
+    """
+    cache.add(DATA_VERSION_CACHE_KEY, time.time_ns(), None)
+    try:
+        return cache.incr(DATA_VERSION_CACHE_KEY)
+    except ValueError:
+        # The key has been evicted in the meantime
+        version = time.time_ns()
+        cache.set(DATA_VERSION_CACHE_KEY, version, None)
+        return version
+
+
+def get_public_cache_key(request: HttpRequest, version: Optional[int] = None) -> str:
+    """Get the cache key of a public response
+
+    The key consists of the path, the query string with sorted
+    parameters, the ``Accept`` header (used by the API to select a
+    renderer), the language, the time zone (see
+    :class:`gcampus.core.middleware.TimezoneMiddleware`) and the data
+    version.
+
+    :param request: The current request.
+    :param version: Data version, defaults to the current version.
+    """
+    if version is None:
+        version = get_data_version()
+    query = urlencode(sorted(request.GET.lists()), doseq=True)
+    parts = (
+        request.path,
+        query,
+        request.META.get("HTTP_ACCEPT", ""),
+        get_language() or "",
+        timezone.get_current_timezone_name(),
+    )
+    digest = hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+    return f"{PUBLIC_CACHE_KEY}:{version}:{digest}"
+
+
+def cache_public_response(
+    request: HttpRequest, view_func: Callable[..., HttpResponseBase], *args, **kwargs
+) -> HttpResponseBase:
+    """Return the response of ``view_func`` from cache if possible
+
+    Only ``GET`` and ``HEAD`` requests of anonymous users are cached.
+    Requests with pending messages (see :mod:`django.contrib.messages`)
+    are never cached, as the messages would be shared with other users.
+    Streaming responses are cached once they have been sent completely
+    if they do not exceed ``PUBLIC_CACHE_MAX_SIZE``.
+
+    Responses contain an ``ETag`` header. Conditional requests are
+    answered with ``304 Not Modified`` without rendering the response.
+
+    :param request: The current request.
+    :param view_func: View returning the response.
+    :param args: Positional arguments passed to ``view_func``.
+    :param kwargs: Keyword arguments passed to ``view_func``.
+    """
+    timeout: Optional[int] = getattr(settings, "PUBLIC_CACHE_TIMEOUT", None)
+    if not timeout or not _is_public_request(request):
+        return view_func(request, *args, **kwargs)
+
+    cache_key = get_public_cache_key(request)
+    cached: Optional[CachedResponse] = cache.get(cache_key)
+    if cached is not None:
+        content, headers, etag = cached
+        response = HttpResponse(content, headers=headers)
+        response["ETag"] = etag
+        response = get_conditional_response(request, etag=etag, response=response)
+        if response.status_code == 200 and _CSRF_PLACEHOLDER in content:
+            # 'get_token' also makes sure that the CSRF cookie is set
+            response.content = content.replace(
+                _CSRF_PLACEHOLDER, get_token(request).encode("ascii")
+            )
+        return response
+
+    response = view_func(request, *args, **kwargs)
+    if response.status_code != 200 or response.cookies:
+        return response
+    # Headers added by middleware later on are not cached
+    headers = _get_headers(response)
+    if isinstance(response, StreamingHttpResponse):
+        if response.is_async:
+            cache_streaming_content = _acache_streaming_content
+        else:
+            cache_streaming_content = _cache_streaming_content
+        response.streaming_content = cache_streaming_content(
+            response.streaming_content,
+            _StreamingCache(cache_key, headers, response.get("ETag"), timeout),
+        )
+        return response
+
+    def _cache_response(_response: HttpResponse):
+        content = _CSRF_INPUT_RE.sub(
+            rb"\g<1>" + _CSRF_PLACEHOLDER + rb"\g<2>", _response.content
+        )
+        etag = _response.get("ETag") or quote_etag(hashlib.md5(content).hexdigest())
+        _response["ETag"] = etag
+        # Renderers (e.g. of the API) set the content type when
+        # rendering the response.
+        cached_headers = {**headers, **_get_headers(_response)}
+        cache.set(cache_key, (content, cached_headers, etag), timeout)
+
+    if hasattr(response, "render") and not response.is_rendered:
+        response.add_post_render_callback(_cache_response)
+    else:
+        _cache_response(response)
+    return response
+
+
+def public_cache(view_func: Callable[..., HttpResponseBase]):
+    """Decorator caching responses of public views
+
+    See :func:`cache_public_response`. Use
+    :func:`django.utils.decorators.method_decorator` to decorate the
+    ``dispatch`` method of class-based views.
+    """
+
+    @wraps(view_func)
+    def wrapper(request: HttpRequest, *args, **kwargs):
+        return cache_public_response(request, view_func, *args, **kwargs)
+
+    return wrapper
+
+
+def _is_public_request(request: HttpRequest) -> bool:
+    if request.method not in ("GET", "HEAD"):
+        return False
+    if "HTTP_AUTHORIZATION" in request.META or session.is_authenticated(request):
+        return False
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        # Admin users logged in using the Django authentication
+        return False
+    # Pending messages are only loaded, they are still displayed by the
+    # view.
+    return len(messages.get_messages(request)) == 0
+
+
+def _get_headers(response: HttpResponseBase) -> dict:
+    return {
+        name: value
+        for name, value in response.headers.items()
+        if name.lower() not in ("etag", "content-length")
+    }
+
+
+class _StreamingCache:
+    """Collects the chunks of a streaming response to cache its content
+    once the response has been sent completely"""
+
+    def __init__(
+        self, cache_key: str, headers: dict, etag: Optional[str], timeout: int
+    ):
+        self.cache_key = cache_key
+        self.headers = headers
+        self.etag = etag
+        self.timeout = timeout
+        self.max_size: int = getattr(
+            settings, "PUBLIC_CACHE_MAX_SIZE", 16 * 1024 * 1024
+        )
+        self.chunks: Optional[List[bytes]] = []
+        self.size = 0
+
+    def add(self, chunk: bytes):
+        if self.chunks is None:
+            return
+        self.size += len(chunk)
+        if self.size > self.max_size:
+            # Response is too large, stop collecting chunks
+            self.chunks = None
+        else:
+            self.chunks.append(chunk)
+
+    def get_cached_response(self) -> Optional[CachedResponse]:
+        if self.chunks is None:
+            return None
+        content = b"".join(self.chunks)
+        etag = self.etag or quote_etag(hashlib.md5(content).hexdigest())
+        return content, self.headers, etag
+
+
+def _cache_streaming_content(
+    streaming_content: Iterable[bytes], streaming_cache: _StreamingCache
+) -> Iterator[bytes]:
+    for chunk in streaming_content:
+        yield chunk
+        streaming_cache.add(chunk)
+    cached = streaming_cache.get_cached_response()
+    if cached is not None:
+        cache.set(streaming_cache.cache_key, cached, streaming_cache.timeout)
+
+
+async def _acache_streaming_content(
+    streaming_content: AsyncIterable[bytes], streaming_cache: _StreamingCache
+) -> AsyncIterator[bytes]:
+    async for chunk in streaming_content:
+        yield chunk
+        streaming_cache.add(chunk)
+    cached = streaming_cache.get_cached_response()
+    if cached is not None:
+        await cache.aset(streaming_cache.cache_key, cached, streaming_cache.timeout)
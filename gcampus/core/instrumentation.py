@@ -0,0 +1,293 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Per-request instrumentation
+
+Collects the number and duration of database queries, repeated query
+signatures (usually caused by N+1 queries), cache hits and misses and
+the time spent on external HTTP requests while a request is processed.
+See :class:`gcampus.core.middleware.InstrumentationMiddleware`.
+
+Metrics are summed up per view in Redis and exported in the Prometheus
+text format by :func:`render_metrics`.
+"""
+
+__all__ = [
+    "RequestMetrics",
+    "collect_metrics",
+    "install_execute_wrapper",
+    "get_request_metrics",
+    "record_cache",
+    "external_request",
+    "export_metrics",
+    "render_metrics",
+    "has_metrics_token",
+]
+
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from secrets import compare_digest
+from typing import Optional, Iterator, List, Tuple, Dict
+
+from django.conf import settings
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.http import HttpRequest
+from redis import RedisError
+
+from gcampus.tasks.redis import get_redis_instance
+
+logger = logging.getLogger("gcampus.core.instrumentation")
+
+#: Prefix of the Redis hashes storing the metrics. Deployments sharing
+#: a single Redis instance keep separate metrics.
+METRICS_KEY = f"{settings.REDIS_KEY_PREFIX}:metrics"
+# Name and description of all exported metrics. All metrics are
+# counters labeled by the view name.
+METRICS: Dict[str, str] = {
+    "requests": "Number of requests",
+    "request_seconds": "Time spent processing requests",
+    "db_queries": "Number of database queries",
+    "db_duplicate_queries": "Number of repeated database queries",
+    "db_seconds": "Time spent on database queries",
+    "cache_hits": "Number of cache hits",
+    "cache_misses": "Number of cache misses",
+    "http_requests": "Number of external HTTP requests",
+    "http_seconds": "Time spent on external HTTP requests",
+}
+
+_request_metrics: ContextVar[Optional["RequestMetrics"]] = ContextVar(
+    "request_metrics", default=None
+)
+
+
+class RequestMetrics:
+    """Metrics of a single request
+
+    Instances are called by the database execute wrapper of every
+    connection (see :func:`install_execute_wrapper`). Queries are
+    grouped by their SQL without parameters, such that the same query
+    run for multiple rows counts as a repeated query.
+    """
+
+    def __init__(self):
+        self.start: float = time.perf_counter()
+        self.query_count: int = 0
+        self.query_time: float = 0.0
+        self.query_signatures: Counter = Counter()
+        self.cache_hits: int = 0
+        self.cache_misses: int = 0
+        self.http_count: int = 0
+        self.http_time: float = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.query_time += time.perf_counter() - start
+            self.query_count += 1
+            self.query_signatures[sql] += 1
+
+    @property
+    def duration(self) -> float:
+        return time.perf_counter() - self.start
+
+    @property
+    def duplicate_queries(self) -> int:
+        return sum(count - 1 for count in self.query_signatures.values())
+
+    def get_duplicates(self) -> List[Tuple[str, int]]:
+        """Get all repeated queries and their number of executions"""
+        return [
+            (sql, count)
+            for sql, count in self.query_signatures.most_common()
+            if count > 1
+        ]
+
+    def get_server_timing(self, duration: Optional[float] = None) -> str:
+        """Get the value of the ``Server-Timing`` header
+
+        :param duration: Total duration of the request in seconds.
+            Defaults to the time since the metrics have been created.
+        """
+        if duration is None:
+            duration = self.duration
+        return ", ".join(
+            [
+                f"total;dur={duration * 1000:.1f}",
+                f"db;dur={self.query_time * 1000:.1f};"
+                f'desc="{self.query_count} queries, '
+                f'{self.duplicate_queries} repeated"',
+                f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+                f"http;dur={self.http_time * 1000:.1f};"
+                f'desc="{self.http_count} requests"',
+            ]
+        )
+
+    def as_dict(self, duration: Optional[float] = None) -> Dict[str, float]:
+        if duration is None:
+            duration = self.duration
+        return {
+            "requests": 1,
+            "request_seconds": duration,
+            "db_queries": self.query_count,
+            "db_duplicate_queries": self.duplicate_queries,
+            "db_seconds": self.query_time,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "http_requests": self.http_count,
+            "http_seconds": self.http_time,
+        }
+
+
+def get_request_metrics() -> Optional[RequestMetrics]:
+    """Get the metrics of the current request
+
+    Returns ``None`` outside of :func:`collect_metrics`, e.g. in tasks
+    or management commands.
+    """
+    return _request_metrics.get()
+
+
+@contextmanager
+def collect_metrics(
+    metrics: Optional[RequestMetrics] = None,
+) -> Iterator[RequestMetrics]:
+    """Collect metrics of all database queries and instrumented calls
+    inside the context
+
+    The metrics are stored in a context variable. Thus, queries run in
+    other threads by :func:`asgiref.sync.sync_to_async` are collected as
+    well.
+
+    :param metrics: Continue collecting metrics of a request, e.g. while
+        a streaming response is sent. Defaults to new metrics.
+    """
+    if metrics is None:
+        metrics = RequestMetrics()
+    token = _request_metrics.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _request_metrics.reset(token)
+
+
+def install_execute_wrapper(connection: BaseDatabaseWrapper):
+    """Record the queries of a database connection in the metrics of
+    the current request (see :func:`collect_metrics`)
+
+    Connections are local to a thread. The wrapper is installed once
+    for every connection, as requests might use connections of multiple
+    threads.
+    """
+    if _execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute_wrapper)
+
+
+def _execute_wrapper(execute, sql, params, many, context):
+    metrics = _request_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+def record_cache(hits: int = 0, misses: int = 0):
+    """Record cache hits and misses of the current request"""
+    metrics = _request_metrics.get()
+    if metrics is not None:
+        metrics.cache_hits += hits
+        metrics.cache_misses += misses
+
+
+@contextmanager
+def external_request():
+    """Measure the time spent on an external HTTP request
+
+    .. code-block:: python
+
+        with external_request():
+            response = client.get(url)
+    """
+    metrics = _request_metrics.get()
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.http_time += time.perf_counter() - start
+        metrics.http_count += 1
+
+
+def export_metrics(view_name: str, metrics: RequestMetrics, duration: float):
+    """Add the metrics of a request to the totals of the view
+
+    Errors connecting to Redis are logged and otherwise ignored.
+
+    :param view_name: Name of the view, used as the metric label.
+    :param metrics: Metrics of the request.
+    :param duration: Total duration of the request in seconds.
+    """
+    try:
+        with get_redis_instance().pipeline(transaction=False) as pipe:
+            for name, value in metrics.as_dict(duration).items():
+                if value:
+                    pipe.hincrbyfloat(f"{METRICS_KEY}:{name}", view_name, value)
+            pipe.execute()
+    except RedisError:
+        logger.warning("Unable to export request metrics", exc_info=True)
+
+
+def render_metrics() -> str:
+    """Render all metrics in the Prometheus text format"""
+    redis = get_redis_instance()
+    with redis.pipeline(transaction=False) as pipe:
+        for name in METRICS:
+            pipe.hgetall(f"{METRICS_KEY}:{name}")
+        results = pipe.execute()
+    lines = []
+    for (name, description), values in zip(METRICS.items(), results):
+        metric = f"gcampus_{name}_total"
+        lines.append(f"# HELP {metric} {description}")
+        lines.append(f"# TYPE {metric} counter")
+        for view_name, value in sorted(values.items()):
+            label = _escape_label(view_name.decode("utf-8"))
+            lines.append(f'{metric}{{view="{label}"}} {float(value)!r}')
+    return "\n".join(lines) + "\n"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def has_metrics_token(request: HttpRequest) -> bool:
+    """Check whether the request provides the ``METRICS_TOKEN`` as a
+    bearer token in the ``Authorization`` header.
+
+    Always ``False`` if no token is configured.
+    """
+    token = getattr(settings, "METRICS_TOKEN", None)
+    if not token:
+        return False
+    authorization = request.headers.get("Authorization", "")
+    # Strings passed to 'compare_digest' must only contain ASCII
+    # characters. Headers may contain any character.
+    return compare_digest(
+        authorization.encode("utf-8"), f"Bearer {token}".encode("utf-8")
+    )
@@ -0,0 +1,160 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Maintenance
+
+Set-based operations used by the maintenance tasks in
+:mod:`gcampus.core.tasks`. Each operation requires a constant number of
+queries, independent of the number of affected courses or tokens.
+"""
+
+__all__ = [
+    "hide_empty_measurements",
+    "delete_unverified_courses",
+    "delete_unused_courses",
+    "deactivate_old_access_keys",
+]
+
+import datetime
+from typing import List
+
+from django.conf import settings
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from gcampus.auth.cache import invalidate_tokens
+from gcampus.auth.models import AccessKey, Course, CourseToken
+from gcampus.auth.receivers import invalidate_cached_token, update_access_key_documents
+from gcampus.core.http_cache import bump_data_version
+from gcampus.core.models import Measurement
+from gcampus.core.signals import suppress_receivers
+from gcampus.core.util import invalidate_time_histogram
+
+#: Receivers that are not required when deleting whole courses. The
+#: documents of deleted courses need no update and the token cache is
+#: invalidated explicitly.
+_TOKEN_DELETE_RECEIVERS = (update_access_key_documents, invalidate_cached_token)
+
+
+def hide_empty_measurements(now: datetime.datetime) -> int:
+    """Hide all measurements without parameters or comment that have
+    not been updated for ``MEASUREMENT_RETENTION_TIME``.
+
+    :returns: Number of hidden measurements.
+    """
+    # Hidden measurements are returned as tombstones by the 'changes'
+    # API. Thus, 'updated_at' has to be set explicitly.
+    count = Measurement.all_objects.filter(
+        Q(parameters__isnull=True),
+        # AND
+        Q(hidden=False),
+        # AND
+        Q(updated_at__lt=(now - settings.MEASUREMENT_RETENTION_TIME)),
+        # AND
+        Q(comment__isnull=True) | Q(comment__exact=""),
+    ).update(hidden=True, updated_at=now)
+    if count:
+        # 'update' does not send any signals
+        invalidate_time_histogram()
+        transaction.on_commit(bump_data_version)
+    return count
+
+
+def _delete_courses(course_ids: List[int]):
+    access_key_ids = list(
+        AccessKey.objects.filter(course_id__in=course_ids).values_list("pk", flat=True)
+    )
+    course_token_ids = list(
+        CourseToken.objects.filter(course_id__in=course_ids).values_list(
+            "pk", flat=True
+        )
+    )
+    with suppress_receivers(*_TOKEN_DELETE_RECEIVERS):
+        AccessKey.objects.filter(pk__in=access_key_ids).delete()
+        CourseToken.objects.filter(pk__in=course_token_ids).delete()
+        Course.objects.filter(pk__in=course_ids).delete()
+    invalidate_tokens(AccessKey, access_key_ids)
+    invalidate_tokens(CourseToken, course_token_ids)
+
+
+def delete_unverified_courses(now: datetime.datetime) -> int:
+    """Delete all courses (including their tokens) whose email address
+    has not been verified within ``UNVERIFIED_COURSE_RETENTION_TIME``.
+
+    :returns: Number of deleted courses.
+    """
+    course_ids = list(
+        Course.objects.filter(
+            email_verified=False,
+            updated_at__lt=(now - settings.UNVERIFIED_COURSE_RETENTION_TIME),
+        ).values_list("pk", flat=True)
+    )
+    with transaction.atomic():
+        _delete_courses(course_ids)
+    return len(course_ids)
+
+
+def delete_unused_courses(now: datetime.datetime) -> List[dict]:
+    """Delete all courses (including their tokens) without any
+    measurements whose course token has not been used for
+    ``UNUSED_COURSE_RETENTION_TIME``.
+
+    :returns: List of the deleted courses as dictionaries with the keys
+        ``teacher_email``, ``name`` and ``school_name``, e.g. to notify
+        the teachers.
+    """
+    courses = list(
+        Course.objects.filter(
+            email_verified=True,
+            course_token__last_login__lt=(now - settings.UNUSED_COURSE_RETENTION_TIME),
+        )
+        .annotate(measurement_count=Count("access_keys__measurements"))
+        .filter(measurement_count=0)
+        .values("pk", "teacher_email", "name", "school_name")
+    )
+    with transaction.atomic():
+        _delete_courses([course["pk"] for course in courses])
+    return courses
+
+
+def deactivate_old_access_keys(now: datetime.datetime) -> List[dict]:
+    """Deactivate all access keys older than ``ACCESS_KEY_LIFETIME``.
+
+    :returns: List of the affected courses as dictionaries with the
+        keys ``course_id``, ``teacher_email``, ``name``, ``school_name``
+        and ``tokens`` (list of deactivated access keys).
+    """
+    access_keys = AccessKey.objects.filter(
+        deactivated=False,
+        created_at__lt=now - settings.ACCESS_KEY_LIFETIME,
+    )
+    with transaction.atomic():
+        courses = list(
+            access_keys.values(
+                "course_id",
+                teacher_email=F("course__teacher_email"),
+                name=F("course__name"),
+                school_name=F("course__school_name"),
+            )
+            .annotate(tokens=ArrayAgg("token"), pks=ArrayAgg("pk"))
+            .order_by("course_id")
+        )
+        access_keys.update(deactivated=True)
+    access_key_ids: List[int] = []
+    for course in courses:
+        access_key_ids += course.pop("pks")
+    invalidate_tokens(AccessKey, access_key_ids)
+    return courses
@@ -12,22 +12,31 @@
 #
 #  You should have received a copy of the GNU Affero General Public License
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
-from typing import List
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set
 
-from django.db import transaction
+from django.core.management import CommandError
+from django.db import connection, transaction
 from django_rich.management import RichCommand
-from rich.progress import track
+from rich.progress import Progress, TaskID, track
 
-from gcampus.api import overpass
+from gcampus.api import overpass, osmfile
 from gcampus.api.overpass import Element, Relation
+from gcampus.core.http_cache import bump_data_version
 from gcampus.core.models.water import Water
 
+#: Fields updated if a water with the same OSM ID already exists. The
+#: water and flow type are kept as they might have been set manually.
+_UPSERT_FIELDS = ("tags", "geometry", "name", "osm_element_type", "updated_at")
+
 
 class Command(RichCommand):
     help = "Import water from OpenStreetMaps"
 
     def add_arguments(self, parser):
-        parser.add_argument("area", type=str, help="Area name")
+        parser.add_argument("area", type=str, nargs="?", help="Area name")
         parser.add_argument(
             "-l, --length",
             type=int,
@@ -35,9 +44,36 @@ class Command(RichCommand):
             metavar="length",
             help="Length of the water bodies",
         )
+        parser.add_argument(
+            "-f",
+            "--file",
+            type=Path,
+            help=(
+                "Import from a local OpenStreetMap extract ('.osm.pbf' or "
+                "Overpass '.json') instead of querying the Overpass API"
+            ),
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of waters saved per batch when importing a file",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=4,
+            help="Number of batches saved in parallel when importing a file",
+        )
 
-    def handle(self, area: str, **kwargs):
-        if "length" in kwargs:
+    def handle(self, area: Optional[str], file: Optional[Path] = None, **kwargs):
+        if file is not None:
+            self.import_file(
+                file, batch_size=kwargs["batch_size"], workers=kwargs["workers"]
+            )
+        elif area is None:
+            raise CommandError("Either an area name or a file is required")
+        elif "length" in kwargs:
             self.import_rivers(area, length=kwargs["length"])
         else:
             self.import_rivers(area)
@@ -71,3 +107,81 @@ class Command(RichCommand):
                     water = Water.from_element(relation)
                 water.save()
         self.console.print("Done!")
+
+    def import_file(self, path: Path, batch_size: int = 500, workers: int = 4):
+        """Import all waters from a local OpenStreetMap extract. The
+        waters are created or updated in batches using a single query
+        per batch. The extract is read lazily and multiple batches are
+        saved in parallel, each using its own database connection.
+
+        :param path: Path to the extract.
+        :param batch_size: Number of waters per batch.
+        :param workers: Number of threads saving batches in parallel.
+        """
+        if not path.is_file():
+            raise CommandError(f"File '{path!s}' does not exist")
+        try:
+            elements: Iterator[Element] = osmfile.read_elements(path)
+        except osmfile.OSMFileError as e:
+            raise CommandError(str(e)) from e
+        # The extract is read while the previous batches are saved. At
+        # most two batches per worker are read ahead.
+        total = 0
+        with Progress(console=self.console) as progress:
+            task = progress.add_task(f"Importing {path.name!s}...", total=None)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                pending: Set[Future] = set()
+                try:
+                    for batch in _batches(elements, batch_size):
+                        pending.add(executor.submit(_upsert, batch))
+                        if len(pending) >= workers * 2:
+                            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                            total += _advance(progress, task, done)
+                except osmfile.OSMFileError as e:
+                    raise CommandError(str(e)) from e
+                done, _ = wait(pending)
+                total += _advance(progress, task, done)
+        # Bulk upserts do not send any signals. Cached public responses
+        # have to be invalidated explicitly.
+        bump_data_version()
+        self.console.print(f"Imported {total:d} waters")
+        self.console.print("Done!")
+
+
+def _batches(elements: Iterable[Element], batch_size: int) -> Iterator[List[Element]]:
+    iterator = iter(elements)
+    while batch := list(islice(iterator, batch_size)):
+        yield batch
+
+
+def _advance(progress: Progress, task: TaskID, futures: Set[Future]) -> int:
+    count = sum(future.result() for future in futures)
+    progress.advance(task, count)
+    return count
+
+
+def _upsert(elements: List[Element]) -> int:
+    """Create or update the waters for all elements in a single query.
+
+    Executed in a worker thread. As database connections are local to
+    each thread, the connection is closed after the batch is done.
+    """
+    # Elements may share an OSM ID (e.g. a node and a way). The same
+    # row must not be affected twice by a single upsert.
+    waters: Dict[int, Water] = {}
+    for element in elements:
+        water = Water.from_element(element)
+        # Bulk creation skips 'Water.save', which guesses both types
+        water.water_type = Water.guess_water_type(water.tags)
+        water.flow_type = Water.guess_flow_type(water.water_type)
+        waters[element.osm_id] = water
+    try:
+        Water.objects.bulk_create(
+            waters.values(),
+            update_conflicts=True,
+            unique_fields=("osm_id",),
+            update_fields=_UPSERT_FIELDS,
+        )
+    finally:
+        connection.close()
+    return len(elements)
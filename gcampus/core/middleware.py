@@ -13,18 +13,49 @@
 #  You should have received a copy of the GNU Affero General Public License
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-__all__ = ["TimezoneMiddleware"]
+__all__ = ["TimezoneMiddleware", "InstrumentationMiddleware"]
 
+import logging
+from functools import partial
+from typing import AsyncIterable, AsyncIterator, Callable, Iterable, Iterator
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
 from django.conf import settings
-from django.http import HttpRequest
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse, HttpRequest, HttpResponseBase
 from django.utils import timezone
 
+from gcampus.core.instrumentation import (
+    RequestMetrics,
+    collect_metrics,
+    export_metrics,
+    has_metrics_token,
+)
+
+logger = logging.getLogger("gcampus.core.instrumentation")
+
 
 class TimezoneMiddleware:
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request: HttpRequest):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self.activate_timezone(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request: HttpRequest):
+        self.activate_timezone(request)
+        return await self.get_response(request)
+
+    @staticmethod
+    def activate_timezone(request: HttpRequest):
         tzname = request.COOKIES.get(
             getattr(settings, "TIME_ZONE_COOKIE_NAME"), getattr(settings, "TIME_ZONE")
         )
@@ -32,4 +63,131 @@ class TimezoneMiddleware:
             timezone.activate(tzname)
         else:
             timezone.deactivate()
-        return self.get_response(request)
+
+
+class InstrumentationMiddleware:
+    """Collect database, cache and external HTTP metrics per request
+
+    The metrics are summed up per view (see
+    :func:`gcampus.core.instrumentation.export_metrics`). Repeated
+    queries are logged to find N+1 queries.
+
+    The metrics are only added to the response as a ``Server-Timing``
+    header if ``INSTRUMENTATION_SERVER_TIMING`` is set, for staff users
+    and for requests providing the ``METRICS_TOKEN``. Otherwise, the
+    internal costs of views would be exposed to all clients.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, "INSTRUMENTATION_ENABLED", False):
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+        self.export = getattr(settings, "INSTRUMENTATION_EXPORT_METRICS", True)
+        self.duplicate_threshold: int = getattr(
+            settings, "INSTRUMENTATION_DUPLICATE_QUERY_THRESHOLD", 10
+        )
+
+    def __call__(self, request: HttpRequest):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with collect_metrics() as metrics:
+            response = self.get_response(request)
+        return self.process_metrics(request, response, metrics)
+
+    async def __acall__(self, request: HttpRequest):
+        with collect_metrics() as metrics:
+            response = await self.get_response(request)
+        # Loading the user and exporting the metrics to Redis is
+        # blocking I/O.
+        return await sync_to_async(self.process_metrics)(request, response, metrics)
+
+    def process_metrics(
+        self, request: HttpRequest, response: HttpResponseBase, metrics: RequestMetrics
+    ) -> HttpResponseBase:
+        if _show_server_timing(request):
+            # Queries run while streaming the response are not included
+            # in the header, as it has already been sent.
+            response["Server-Timing"] = metrics.get_server_timing()
+        if response.streaming and not isinstance(response, FileResponse):
+            # Streaming responses (e.g. GeoJSON) run queries while the
+            # content is sent. The metrics are exported afterwards.
+            # File responses are skipped to keep using the file wrapper
+            # of the server.
+            finish = partial(self.finish_metrics, request, metrics)
+            if response.is_async:
+                response.streaming_content = _aiter_with_metrics(
+                    response.streaming_content, metrics, finish
+                )
+            else:
+                response.streaming_content = _iter_with_metrics(
+                    response.streaming_content, metrics, finish
+                )
+        else:
+            self.finish_metrics(request, metrics)
+        return response
+
+    def finish_metrics(self, request: HttpRequest, metrics: RequestMetrics):
+        duration = metrics.duration
+        view_name = _get_view_name(request)
+        if metrics.duplicate_queries >= self.duplicate_threshold:
+            logger.info(
+                "View '%s' repeated %d queries: %s",
+                view_name,
+                metrics.duplicate_queries,
+                metrics.get_duplicates()[:5],
+            )
+        if self.export:
+            export_metrics(view_name, metrics, duration)
+
+
+def _iter_with_metrics(
+    content: Iterable[bytes], metrics: RequestMetrics, finish: Callable[[], None]
+) -> Iterator[bytes]:
+    iterator = iter(content)
+    try:
+        while True:
+            with collect_metrics(metrics):
+                chunk = next(iterator, None)
+            if chunk is None:
+                break
+            yield chunk
+    finally:
+        finish()
+
+
+async def _aiter_with_metrics(
+    content: AsyncIterable[bytes], metrics: RequestMetrics, finish: Callable[[], None]
+) -> AsyncIterator[bytes]:
+    iterator = aiter(content)
+    try:
+        while True:
+            with collect_metrics(metrics):
+                chunk = await anext(iterator, None)
+            if chunk is None:
+                break
+            yield chunk
+    finally:
+        await sync_to_async(finish)()
+
+
+def _show_server_timing(request: HttpRequest) -> bool:
+    if getattr(settings, "INSTRUMENTATION_SERVER_TIMING", False):
+        return True
+    user = getattr(request, "user", None)
+    if user is not None and user.is_staff:
+        return True
+    return has_metrics_token(request)
+
+
+def _get_view_name(request: HttpRequest) -> str:
+    resolver_match = getattr(request, "resolver_match", None)
+    if resolver_match is None:
+        # Use a single label for all requests that could not be resolved
+        # to limit the number of metrics, e.g. due to scanning bots.
+        return "<unresolved>"
+    return resolver_match.view_name
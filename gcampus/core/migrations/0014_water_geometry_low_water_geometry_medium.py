@@ -0,0 +1,45 @@
+# Generated by Django 6.0 on 2026-10-19 18:40
+
+import django.contrib.gis.db.models.fields
+import gcampus.core.models.functions
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        (
+            "gcampuscore",
+            "0013_rename_data_quality_warning_measurement_parameter_quality_warning",
+        ),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="water",
+            name="geometry_medium",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=gcampus.core.models.functions.SimplifyPreserveTopology(
+                    "geometry", 0.0001
+                ),
+                output_field=django.contrib.gis.db.models.fields.GeometryField(
+                    srid=4326
+                ),
+                verbose_name="Geometry (medium resolution)",
+            ),
+        ),
+        migrations.AddField(
+            model_name="water",
+            name="geometry_low",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=gcampus.core.models.functions.SimplifyPreserveTopology(
+                    "geometry", 0.001
+                ),
+                output_field=django.contrib.gis.db.models.fields.GeometryField(
+                    srid=4326
+                ),
+                verbose_name="Geometry (low resolution)",
+            ),
+        ),
+    ]
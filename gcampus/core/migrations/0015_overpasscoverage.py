@@ -0,0 +1,45 @@
+# Generated by Django 6.0 on 2026-10-19 19:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("gcampuscore", "0014_water_geometry_low_water_geometry_medium"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OverpassCoverage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("x", models.IntegerField(verbose_name="Column")),
+                ("y", models.IntegerField(verbose_name="Row")),
+                (
+                    "synced_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        verbose_name="Synchronized at",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Overpass coverage",
+                "verbose_name_plural": "Overpass coverage",
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("x", "y"), name="unique_coverage_cell"
+                    )
+                ],
+            },
+        ),
+    ]
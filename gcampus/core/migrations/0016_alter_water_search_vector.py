@@ -0,0 +1,33 @@
+# Generated by Django 6.0 on 2026-10-19 19:30
+
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations, models
+
+TSVECTOR_CONF = getattr(settings, "TSVECTOR_CONF", "german")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("gcampuscore", "0015_overpasscoverage"),
+    ]
+
+    operations = [
+        # The column already is a generated column (see migration
+        # '0009_water_search'). Only the model state is updated.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name="water",
+                    name="search_vector",
+                    field=models.GeneratedField(
+                        db_persist=True,
+                        expression=django.contrib.postgres.search.SearchVector(
+                            "name", config=TSVECTOR_CONF, weight="A"
+                        ),
+                        output_field=django.contrib.postgres.search.SearchVectorField(),
+                    ),
+                ),
+            ],
+        ),
+    ]
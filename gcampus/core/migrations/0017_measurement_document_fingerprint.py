@@ -0,0 +1,23 @@
+# Generated by Django 6.0 on 2026-10-19 19:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("gcampuscore", "0016_alter_water_search_vector"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="measurement",
+            name="document_fingerprint",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                max_length=64,
+                null=True,
+                verbose_name="Document fingerprint",
+            ),
+        ),
+    ]
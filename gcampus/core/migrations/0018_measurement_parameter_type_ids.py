@@ -0,0 +1,93 @@
+# Generated by Django 6.0 on 2026-10-19 20:10
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("gcampuscore", "0017_measurement_document_fingerprint"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="measurement",
+            name="parameter_type_ids",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.IntegerField(),
+                blank=True,
+                default=list,
+                editable=False,
+                size=None,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="measurement",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["parameter_type_ids"],
+                name="gcampuscore_paramet_f74b87_gin",
+            ),
+        ),
+        # The parameter types are computed every time a measurement is
+        # saved. Changes to parameters touch the related measurements
+        # to trigger the computation.
+        migrations.RunSQL(
+            """
+            CREATE FUNCTION gcampuscore_measurement_parameter_type_ids()
+            RETURNS trigger AS $$
+            BEGIN
+                NEW."parameter_type_ids" := ARRAY(
+                    SELECT DISTINCT "parameter_type_id"
+                    FROM "gcampuscore_parameter"
+                    WHERE "measurement_id" = NEW."id" AND NOT "hidden"
+                    ORDER BY "parameter_type_id"
+                );
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            CREATE TRIGGER "gcampuscore_measurement_parameter_type_ids"
+                BEFORE INSERT OR UPDATE ON "gcampuscore_measurement"
+                FOR EACH ROW
+                EXECUTE FUNCTION gcampuscore_measurement_parameter_type_ids();
+
+            CREATE FUNCTION gcampuscore_parameter_touch_measurement()
+            RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                    UPDATE "gcampuscore_measurement"
+                        SET "parameter_type_ids" = '{}'
+                        WHERE "id" = OLD."measurement_id";
+                END IF;
+                IF TG_OP = 'INSERT' OR (
+                    TG_OP = 'UPDATE' AND NEW."measurement_id" <> OLD."measurement_id"
+                ) THEN
+                    UPDATE "gcampuscore_measurement"
+                        SET "parameter_type_ids" = '{}'
+                        WHERE "id" = NEW."measurement_id";
+                END IF;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            CREATE TRIGGER "gcampuscore_parameter_touch_measurement"
+                AFTER INSERT OR DELETE
+                OR UPDATE OF "parameter_type_id", "measurement_id", "hidden"
+                ON "gcampuscore_parameter"
+                FOR EACH ROW
+                EXECUTE FUNCTION gcampuscore_parameter_touch_measurement();
+
+            -- Compute the parameter types of all existing measurements
+            UPDATE "gcampuscore_measurement" SET "parameter_type_ids" = '{}';
+            """,
+            reverse_sql="""
+            DROP TRIGGER "gcampuscore_parameter_touch_measurement"
+                ON "gcampuscore_parameter";
+            DROP FUNCTION gcampuscore_parameter_touch_measurement();
+            DROP TRIGGER "gcampuscore_measurement_parameter_type_ids"
+                ON "gcampuscore_measurement";
+            DROP FUNCTION gcampuscore_measurement_parameter_type_ids();
+            """,
+        ),
+    ]
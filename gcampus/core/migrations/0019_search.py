@@ -0,0 +1,131 @@
+# Generated by Django 6.0 on 2026-10-19 20:40
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+TSVECTOR_CONF = getattr(settings, "TSVECTOR_CONF", "german")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("gcampuscore", "0018_measurement_parameter_type_ids"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name="water",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["name"],
+                name="gcampuscore_water_name_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+        migrations.AddField(
+            model_name="measurement",
+            name="water_search_name",
+            field=models.CharField(
+                blank=True, editable=False, max_length=200, null=True
+            ),
+        ),
+        # Copy the name of the water to the measurement. Renaming a
+        # water touches all of its measurements.
+        migrations.RunSQL(
+            """
+            CREATE FUNCTION gcampuscore_measurement_water_search_name()
+            RETURNS trigger AS $$
+            BEGIN
+                NEW."water_search_name" := (
+                    SELECT "name" FROM "gcampuscore_water"
+                    WHERE "id" = NEW."water_id"
+                );
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            CREATE TRIGGER "gcampuscore_measurement_water_search_name"
+                BEFORE INSERT OR UPDATE OF "water_id", "water_search_name"
+                ON "gcampuscore_measurement"
+                FOR EACH ROW
+                EXECUTE FUNCTION gcampuscore_measurement_water_search_name();
+
+            CREATE FUNCTION gcampuscore_water_touch_measurements()
+            RETURNS trigger AS $$
+            BEGIN
+                UPDATE "gcampuscore_measurement"
+                    SET "water_search_name" = NULL
+                    WHERE "water_id" = NEW."id";
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            CREATE TRIGGER "gcampuscore_water_touch_measurements"
+                AFTER UPDATE OF "name" ON "gcampuscore_water"
+                FOR EACH ROW
+                WHEN (OLD."name" IS DISTINCT FROM NEW."name")
+                EXECUTE FUNCTION gcampuscore_water_touch_measurements();
+
+            UPDATE "gcampuscore_measurement" SET "water_search_name" = NULL;
+            """,
+            reverse_sql="""
+            DROP TRIGGER "gcampuscore_water_touch_measurements"
+                ON "gcampuscore_water";
+            DROP FUNCTION gcampuscore_water_touch_measurements();
+            DROP TRIGGER "gcampuscore_measurement_water_search_name"
+                ON "gcampuscore_measurement";
+            DROP FUNCTION gcampuscore_measurement_water_search_name();
+            """,
+        ),
+        # The search vector has been a generated column added in
+        # migration '0002_search'. It is recreated to include the name
+        # of the water.
+        migrations.RemoveIndex(
+            model_name="measurement",
+            name="gcampuscore_search__13d7ba_gin",
+        ),
+        migrations.RemoveField(
+            model_name="measurement",
+            name="search_vector",
+        ),
+        migrations.AddField(
+            model_name="measurement",
+            name="search_vector",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.CombinedSearchVector(
+                    django.contrib.postgres.search.CombinedSearchVector(
+                        django.contrib.postgres.search.CombinedSearchVector(
+                            django.contrib.postgres.search.SearchVector(
+                                "name", config=TSVECTOR_CONF, weight="A"
+                            ),
+                            "||",
+                            django.contrib.postgres.search.SearchVector(
+                                "comment", config=TSVECTOR_CONF, weight="B"
+                            ),
+                            django.contrib.postgres.search.SearchConfig(TSVECTOR_CONF),
+                        ),
+                        "||",
+                        django.contrib.postgres.search.SearchVector(
+                            "location_name", config=TSVECTOR_CONF, weight="A"
+                        ),
+                        django.contrib.postgres.search.SearchConfig(TSVECTOR_CONF),
+                    ),
+                    "||",
+                    django.contrib.postgres.search.SearchVector(
+                        "water_search_name", config=TSVECTOR_CONF, weight="B"
+                    ),
+                    django.contrib.postgres.search.SearchConfig(TSVECTOR_CONF),
+                ),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="measurement",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="gcampuscore_search__13d7ba_gin"
+            ),
+        ),
+    ]
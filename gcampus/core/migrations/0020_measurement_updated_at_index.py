@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-19 22:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("gcampuscore", "0019_search"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="measurement",
+            index=models.Index(
+                fields=["updated_at", "id"], name="gcampuscore_meas_updated_at"
+            ),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 6.0 on 2026-10-19 22:40
+
+from django.db import migrations, models
+
+TOUCH_MEASUREMENT_FUNCTION = """
+CREATE OR REPLACE FUNCTION gcampuscore_parameter_touch_measurement()
+RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE "gcampuscore_measurement"
+            SET "parameter_type_ids" = '{}'%(updated_at)s
+            WHERE "id" = OLD."measurement_id";
+    END IF;
+    IF TG_OP = 'INSERT' OR (
+        TG_OP = 'UPDATE' AND NEW."measurement_id" <> OLD."measurement_id"
+    ) THEN
+        UPDATE "gcampuscore_measurement"
+            SET "parameter_type_ids" = '{}'%(updated_at)s
+            WHERE "id" = NEW."measurement_id";
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("gcampuscore", "0020_measurement_updated_at_index"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="parameter",
+            index=models.Index(
+                fields=["updated_at", "id"], name="gcampuscore_param_updated_at"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="water",
+            index=models.Index(
+                fields=["updated_at", "id"], name="gcampuscore_water_updated_at"
+            ),
+        ),
+        # Adding or removing parameters also updates the measurement.
+        # Clients of the 'changes' API detect removed parameters using
+        # the list of parameters of the measurement. Like 'auto_now',
+        # the current time is used instead of the transaction start.
+        migrations.RunSQL(
+            TOUCH_MEASUREMENT_FUNCTION
+            % {"updated_at": ', "updated_at" = clock_timestamp()'},
+            reverse_sql=TOUCH_MEASUREMENT_FUNCTION % {"updated_at": ""},
+        ),
+    ]
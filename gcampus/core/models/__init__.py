@@ -18,6 +18,8 @@ __all__ = [
     "Parameter",
     "ParameterType",
     "Water",
+    "GeometryResolution",
+    "OverpassCoverage",
     "BACHIndex",
     "SaprobicIndex",
     "TrophicIndex",
@@ -26,7 +28,8 @@ __all__ = [
 
 from gcampus.core.models.measurement import Measurement
 from gcampus.core.models.parameter import ParameterType, Parameter
-from gcampus.core.models.water import Water
+from gcampus.core.models.water import Water, GeometryResolution
+from gcampus.core.models.coverage import OverpassCoverage
 from gcampus.core.models.index import (
     BACHIndex,
     SaprobicIndex,
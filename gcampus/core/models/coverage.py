@@ -0,0 +1,168 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+__all__ = ["OverpassCoverage"]
+
+import math
+from datetime import timedelta
+from typing import Dict, List, Tuple
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+
+#: Grid cell identified by its column (longitude) and row (latitude).
+Cell = Tuple[int, int]
+BBox = Tuple[float, float, float, float]
+
+
+class OverpassCoverage(models.Model):
+    """Records which cells of a regular longitude/latitude grid have
+    been synchronized with OpenStreetMap using the Overpass API and when.
+
+    Waters inside a cell that has been synchronized recently (see
+    ``OVERPASS_COVERAGE_MAX_AGE``) are assumed to be complete in the
+    database and do not require another Overpass query. The size of
+    each cell in degrees is configured using
+    ``OVERPASS_COVERAGE_CELL_SIZE``.
+    """
+
+    class Meta:
+        verbose_name = gettext_lazy("Overpass coverage")
+        verbose_name_plural = gettext_lazy("Overpass coverage")
+        constraints = (
+            models.UniqueConstraint(fields=("x", "y"), name="unique_coverage_cell"),
+        )
+
+    x = models.IntegerField(verbose_name=gettext_lazy("Column"))
+    y = models.IntegerField(verbose_name=gettext_lazy("Row"))
+    synced_at = models.DateTimeField(
+        default=timezone.now, verbose_name=gettext_lazy("Synchronized at")
+    )
+
+    def __repr__(self):
+        return f"OverpassCoverage(x={self.x}, y={self.y})"
+
+    @staticmethod
+    def get_cell_size() -> float:
+        return getattr(settings, "OVERPASS_COVERAGE_CELL_SIZE", 0.01)
+
+    @classmethod
+    def get_cells(cls, bbox: BBox) -> List[Cell]:
+        """Get all grid cells intersecting the bounding box.
+
+        :param bbox: Bounding box as ``(xmin, ymin, xmax, ymax)`` in
+            longitude and latitude.
+        :returns: List of cells.
+        """
+        size = cls.get_cell_size()
+        xmin, ymin, xmax, ymax = bbox
+        return [
+            (x, y)
+            for x in range(math.floor(xmin / size), math.floor(xmax / size) + 1)
+            for y in range(math.floor(ymin / size), math.floor(ymax / size) + 1)
+        ]
+
+    @classmethod
+    def get_cells_bbox(cls, cells: List[Cell]) -> BBox:
+        """Get the bounding box enclosing all provided cells.
+
+        :param cells: Non-empty list of cells.
+        :returns: Bounding box as ``(xmin, ymin, xmax, ymax)``.
+        """
+        size = cls.get_cell_size()
+        xs = [x for x, _ in cells]
+        ys = [y for _, y in cells]
+        return (
+            min(xs) * size,
+            min(ys) * size,
+            (max(xs) + 1) * size,
+            (max(ys) + 1) * size,
+        )
+
+    @staticmethod
+    def group_cells(cells: List[Cell]) -> List[List[Cell]]:
+        """Group cells into rectangles without any gaps. Cells in the
+        same row are joined if they are adjacent. Runs of the same
+        columns in adjacent rows are joined as well.
+
+        The bounding box of each group (see :meth:`get_cells_bbox`) does
+        not contain any other cells. Thus, scattered cells do not result
+        in a query covering the whole area in between.
+
+        :param cells: List of cells.
+        :returns: List of groups, each a list of cells.
+        """
+        # Adjacent cells in the same row, as (row, first, last column)
+        runs: List[Tuple[int, int, int]] = []
+        for y, x in sorted((y, x) for x, y in set(cells)):
+            if runs and runs[-1][0] == y and runs[-1][2] == x - 1:
+                runs[-1] = (y, runs[-1][1], x)
+            else:
+                runs.append((y, x, x))
+        # Open rectangles by their columns, as (first, last row)
+        open_rectangles: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        rectangles: List[Tuple[int, int, int, int]] = []
+        for y, xmin, xmax in runs:
+            rows = open_rectangles.get((xmin, xmax))
+            if rows is not None and rows[1] == y - 1:
+                open_rectangles[(xmin, xmax)] = (rows[0], y)
+                continue
+            if rows is not None:
+                rectangles.append((xmin, rows[0], xmax, rows[1]))
+            open_rectangles[(xmin, xmax)] = (y, y)
+        for (xmin, xmax), (ymin, ymax) in open_rectangles.items():
+            rectangles.append((xmin, ymin, xmax, ymax))
+        return [
+            [(x, y) for x in range(xmin, xmax + 1) for y in range(ymin, ymax + 1)]
+            for xmin, ymin, xmax, ymax in sorted(rectangles)
+        ]
+
+    @classmethod
+    def get_stale_cells(cls, cells: List[Cell]) -> List[Cell]:
+        """Filter the provided cells and return only those that have
+        never been synchronized or not within ``OVERPASS_COVERAGE_MAX_AGE``.
+
+        :param cells: List of cells to check.
+        :returns: List of stale cells in the same order.
+        """
+        if not cells:
+            return []
+        max_age = getattr(settings, "OVERPASS_COVERAGE_MAX_AGE", timedelta(days=30))
+        x_values = {x for x, _ in cells}
+        y_values = {y for _, y in cells}
+        fresh = set(
+            cls.objects.filter(
+                x__in=x_values,
+                y__in=y_values,
+                synced_at__gte=timezone.now() - max_age,
+            ).values_list("x", "y")
+        )
+        return [cell for cell in cells if cell not in fresh]
+
+    @classmethod
+    def mark_synced(cls, cells: List[Cell]):
+        """Record that the provided cells have just been synchronized.
+
+        :param cells: List of cells.
+        """
+        now = timezone.now()
+        cls.objects.bulk_create(
+            [cls(x=x, y=y, synced_at=now) for x, y in cells],
+            update_conflicts=True,
+            unique_fields=("x", "y"),
+            update_fields=("synced_at",),
+        )
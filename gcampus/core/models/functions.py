@@ -0,0 +1,190 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+__all__ = [
+    "KNNDistance",
+    "SimplifyPreserveTopology",
+    "WidthBucket",
+    "JSONBuildObject",
+    "AsGeoJSONObject",
+    "BoundingBoxCoordinate",
+    "BOUNDING_BOX_COORDINATES",
+]
+
+import datetime
+from typing import List, Tuple
+
+from django.contrib.gis.db.models import GeometryField
+from django.contrib.gis.geos import GEOSGeometry
+from django.contrib.postgres.fields import ArrayField
+from django.db.models import (
+    DateTimeField,
+    FloatField,
+    Func,
+    IntegerField,
+    JSONField,
+    TextField,
+    Value,
+)
+from django.db.models.functions import Cast
+
+#: Coordinates of a bounding box, see :class:`BoundingBoxCoordinate`
+BOUNDING_BOX_COORDINATES: Tuple[str, ...] = ("xmin", "ymin", "xmax", "ymax")
+
+
+class KNNDistance(Func):
+    """PostGIS distance operator ``<->``.
+
+    Unlike :class:`django.contrib.gis.db.models.functions.Distance`
+    (i.e. ``ST_Distance``), ordering by this operator is assisted by the
+    spatial (GiST) index of the geometry column. Use it to retrieve the
+    ``k`` nearest neighbours of a geometry:
+
+    .. code-block:: python
+
+        Measurement.objects.annotate(
+            distance=KNNDistance("location", point)
+        ).order_by("distance")[:k]
+
+    Note that the distance is measured in units of the spatial reference
+    system (i.e. degrees for EPSG:4326) and is only meant for ordering.
+    """
+
+    arg_joiner = " <-> "
+    template = "(%(expressions)s)"
+    output_field = FloatField()
+
+    def __init__(self, expression, geometry: GEOSGeometry, **extra):
+        if geometry.srid is None:
+            geometry.srid = 4326  # default coordinate system
+        value = Value(geometry, output_field=GeometryField(srid=geometry.srid))
+        super().__init__(expression, value, **extra)
+
+
+class SimplifyPreserveTopology(Func):
+    """PostGIS function ``ST_SimplifyPreserveTopology``.
+
+    Simplifies a geometry using the Douglas-Peucker algorithm while
+    keeping the result valid. The function is immutable and can thereby
+    be used for generated columns (see
+    :class:`django.db.models.GeneratedField`).
+
+    :param expression: Geometry expression or name of a geometry field.
+    :param tolerance: Distance tolerance in units of the spatial
+        reference system (i.e. degrees for EPSG:4326).
+    """
+
+    function = "ST_SimplifyPreserveTopology"
+    arity = 2
+    output_field = GeometryField()
+
+    def __init__(self, expression, tolerance: float, **extra):
+        super().__init__(expression, Value(float(tolerance)), **extra)
+
+
+class WidthBucket(Func):
+    """PostgreSQL function ``width_bucket`` with a list of thresholds.
+
+    Returns the index of the bucket the expression falls into: ``0``
+    for values lower than the first threshold, ``i`` for values greater
+    or equal to the ``i``-th threshold (counting from ``1``) but lower
+    than the next one.
+
+    :param expression: Expression or name of a date time field.
+    :param thresholds: Sorted list of bucket boundaries.
+    """
+
+    function = "width_bucket"
+    arity = 2
+    output_field = IntegerField()
+
+    def __init__(self, expression, thresholds: List[datetime.datetime], **extra):
+        value = Value(list(thresholds), output_field=ArrayField(DateTimeField()))
+        super().__init__(expression, value, **extra)
+
+
+class JSONBuildObject(Func):
+    """PostgreSQL function ``json_build_object``.
+
+    Unlike :class:`django.db.models.functions.JSONObject` (i.e.
+    ``jsonb_build_object``), the order of the keys is preserved and the
+    object is not converted to the binary ``jsonb`` format.
+
+    .. code-block:: python
+
+        Measurement.objects.annotate(
+            properties=JSONBuildObject(id=F("id"), water_id=F("water_id"))
+        )
+
+    :param fields: Keys of the object and the corresponding expressions.
+    """
+
+    function = "json_build_object"
+    output_field = JSONField()
+
+    def __init__(self, **fields):
+        expressions = []
+        for key, value in fields.items():
+            # Keys have to be typed explicitly if parameters are bound
+            # on the server.
+            expressions.extend((Cast(Value(key), TextField()), value))
+        super().__init__(*expressions)
+
+
+class AsGeoJSONObject(Func):
+    """PostGIS function ``ST_AsGeoJSON`` cast to ``json``.
+
+    Unlike :class:`django.contrib.gis.db.models.functions.AsGeoJSON`,
+    the geometry can be nested in a JSON object (see
+    :class:`JSONBuildObject`) instead of being included as a string.
+
+    :param expression: Geometry expression or name of a geometry field.
+    """
+
+    function = "ST_AsGeoJSON"
+    template = "%(function)s(%(expressions)s)::json"
+    arity = 1
+    output_field = JSONField()
+
+
+class BoundingBoxCoordinate(Func):
+    """PostGIS functions ``ST_XMin``, ``ST_YMin``, ``ST_XMax`` and
+    ``ST_YMax``.
+
+    Returns a single coordinate of the bounding box of a geometry. Used
+    to compute bounding boxes in the database instead of loading the
+    whole geometry:
+
+    .. code-block:: python
+
+        Water.objects.annotate(
+            **{
+                f"bbox_{coordinate}": BoundingBoxCoordinate("geometry", coordinate)
+                for coordinate in BOUNDING_BOX_COORDINATES
+            }
+        )
+
+    :param expression: Geometry expression or name of a geometry field.
+    :param coordinate: One of :data:`BOUNDING_BOX_COORDINATES`.
+    """
+
+    arity = 1
+    output_field = FloatField()
+
+    def __init__(self, expression, coordinate: str, **extra):
+        if coordinate not in BOUNDING_BOX_COORDINATES:
+            raise ValueError(f"Unknown bounding box coordinate '{coordinate}'")
+        extra["function"] = f"ST_{coordinate[0].upper()}{coordinate[1:].title()}"
+        super().__init__(expression, **extra)
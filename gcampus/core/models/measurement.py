@@ -15,18 +15,32 @@
 
 from __future__ import annotations
 
-__all__ = ["Measurement", "HiddenManager"]
+__all__ = ["Measurement", "HiddenManager", "ParameterTypeSummary"]
 
+from typing import NamedTuple, FrozenSet
+
+from django.conf import settings
 from django.contrib.gis.db import models
+from django.contrib.postgres.fields import ArrayField
 from django.contrib.postgres.indexes import GinIndex
-from django.contrib.postgres.search import SearchVectorField
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.core.exceptions import ObjectDoesNotExist
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as gettext_lazy
 from django.utils.translation import gettext, pgettext_lazy
 
 from gcampus.core.models import util
 from gcampus.core.util import get_location_name
 
+TSVECTOR_CONF = getattr(settings, "TSVECTOR_CONF", "german")
+
+
+class ParameterTypeSummary(NamedTuple):
+    #: Identifiers of all parameter types of a measurement
+    identifiers: FrozenSet[str]
+    #: Categories of all parameter types of a measurement
+    categories: FrozenSet[str]
+
 
 class HiddenManager(models.Manager):
     def get_queryset(self):
@@ -46,7 +60,14 @@ class Measurement(util.DateModelMixin):
         default_manager_name = "objects"
         verbose_name = gettext_lazy("Measurement")
         verbose_name_plural = gettext_lazy("Measurements")
-        indexes = (GinIndex(fields=("search_vector",)),)
+        indexes = (
+            GinIndex(fields=("search_vector",)),
+            GinIndex(fields=("parameter_type_ids",)),
+            # Used by the cursor pagination of the API
+            models.Index(
+                fields=("updated_at", "id"), name="gcampuscore_meas_updated_at"
+            ),
+        )
         ordering = ("created_at", "name")
 
     #: The token is used to link a measurement to a specific access key.
@@ -137,9 +158,33 @@ class Measurement(util.DateModelMixin):
         verbose_name=gettext_lazy("internal comment"),
     )
 
-    #: The search vector will be overwritten and turned into a postgres
-    #: generated column in migration ``0002_search``.
-    search_vector = SearchVectorField(null=True, editable=False)
+    #: Name of the related water, copied by a database trigger (see
+    #: migration ``0019_search``). Used in :attr:`.search_vector` to
+    #: avoid joining the waters when searching for measurements.
+    water_search_name = models.CharField(
+        max_length=200, blank=True, null=True, editable=False
+    )
+
+    #: Generated column used for full-text search.
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector("name", config=TSVECTOR_CONF, weight="A")
+            + SearchVector("comment", config=TSVECTOR_CONF, weight="B")
+            + SearchVector("location_name", config=TSVECTOR_CONF, weight="A")
+            + SearchVector("water_search_name", config=TSVECTOR_CONF, weight="B")
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    #: Sorted primary keys of all parameter types of the (not hidden)
+    #: parameters of this measurement. The column is maintained by
+    #: database triggers added in migration
+    #: ``0018_measurement_parameter_type_ids`` and can be used to filter
+    #: for measurements containing specific parameters.
+    parameter_type_ids = ArrayField(
+        models.IntegerField(), default=list, blank=True, editable=False
+    )
 
     #: File field to cache the measurement detail document for this
     #: measurement.
@@ -150,6 +195,16 @@ class Measurement(util.DateModelMixin):
         null=True,
     )
 
+    #: Fingerprint of the inputs used to render :attr:`.document`. The
+    #: document is only rendered again if the fingerprint changes.
+    document_fingerprint = models.CharField(
+        verbose_name=gettext_lazy("Document fingerprint"),
+        max_length=64,
+        blank=True,
+        null=True,
+        editable=False,
+    )
+
     #: Related field: List of all parameters associated with this
     #: measurement.
     parameters: list
@@ -165,6 +220,32 @@ class Measurement(util.DateModelMixin):
     def water_name(self):
         return self.water.display_name
 
+    @cached_property
+    def parameter_type_summary(self) -> ParameterTypeSummary:
+        """Identifiers and categories of all parameter types
+
+        Uses the parameters and parameter types prefetched with
+        ``prefetch_related("parameters__parameter_type")`` if available.
+        Otherwise, the summary is retrieved using a single query. The
+        summary is cached on the instance and not updated if parameters
+        are changed afterwards.
+        """
+        if "parameters" in getattr(self, "_prefetched_objects_cache", {}):
+            parameters = self.parameters.all()
+            if all(p.__class__.parameter_type.is_cached(p) for p in parameters):
+                parameter_types = [p.parameter_type for p in parameters]
+                return ParameterTypeSummary(
+                    identifiers=frozenset(pt.identifier for pt in parameter_types),
+                    categories=frozenset(pt.category for pt in parameter_types),
+                )
+        values = self.parameters.values_list(
+            "parameter_type__identifier", "parameter_type__category"
+        )
+        return ParameterTypeSummary(
+            identifiers=frozenset(identifier for identifier, _ in values),
+            categories=frozenset(category for _, category in values),
+        )
+
     def did_location_change(self, update_fields=None):
         if update_fields is not None and "location" in update_fields:
             # The ``update_fields`` parameter explicitly states that the
@@ -195,24 +276,6 @@ class Measurement(util.DateModelMixin):
             # In this case, ``id`` will be replaced with ``None``
             return gettext("Measurement %(id)s") % {"id": self.pk}
 
-    def _do_insert(self, manager, using, fields, update_pk, raw):
-        mod_fields = list(fields)
-        for i, field in enumerate(mod_fields):
-            if field.name == "search_vector":
-                del mod_fields[i]
-        return super(Measurement, self)._do_insert(
-            manager, using, mod_fields, update_pk, raw
-        )
-
-    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update, returning_fields):
-        mod_values = list(values)
-        for i, (field, _, value) in enumerate(mod_values):
-            if field.name == "search_vector":
-                del mod_values[i]
-        return super(Measurement, self)._do_update(
-            base_qs, using, pk_val, mod_values, update_fields, forced_update, returning_fields
-        )
-
     @property
     def indices(self) -> list:
         return [
@@ -89,6 +89,12 @@ class Parameter(util.DateModelMixin):
         default_manager_name = "all_objects"
         verbose_name = _("Parameter")
         verbose_name_plural = _("Parameters")
+        indexes = (
+            # Used by the 'changes' API
+            models.Index(
+                fields=("updated_at", "id"), name="gcampuscore_param_updated_at"
+            ),
+        )
 
     parameter_type = models.ForeignKey(
         ParameterType,
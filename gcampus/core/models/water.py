@@ -20,22 +20,24 @@ __all__ = [
     "FlowType",
     "Water",
     "OSMElementType",
+    "GeometryResolution",
 ]
 
 import logging
 from functools import lru_cache
-from typing import Optional, List, Union
+from typing import Optional, List, Tuple, Union
 
 import httpx
 from django.conf import settings
 from django.contrib.gis.db.models import GeometryField
 from django.contrib.postgres.indexes import GinIndex
-from django.contrib.postgres.search import SearchVectorField
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
 from django.utils.translation import gettext_lazy, pgettext_lazy, get_language
 
 from gcampus.api import overpass, wikidata
 from gcampus.api.overpass import Element
+from gcampus.core.models.functions import SimplifyPreserveTopology
 from gcampus.core.models.util import EMPTY, DateModelMixin
 
 logger = logging.getLogger("gcampus.core.models.water")
@@ -153,17 +155,90 @@ class FlowType(models.TextChoices):
         return None
 
 
+class GeometryResolution(models.TextChoices):
+    """Resolution levels of the water geometry. Apart from the full
+    resolution, each level is stored as a precomputed and simplified
+    copy of :attr:`Water.geometry`.
+    """
+
+    LOW = "low", gettext_lazy("low")
+    MEDIUM = "medium", gettext_lazy("medium")
+    FULL = "full", gettext_lazy("full")
+
+    @classmethod
+    def from_zoom(cls, zoom: int) -> GeometryResolution:
+        """Choose a resolution suitable for the provided web map zoom
+        level. At zoom level 10, a single pixel covers roughly 100
+        meters in central Europe, at zoom level 14 roughly 6 meters.
+
+        :param zoom: Zoom level of the map (usually 0 to 22).
+        :returns: A geometry resolution member.
+        """
+        if zoom <= 10:
+            return cls.LOW
+        elif zoom <= 14:
+            return cls.MEDIUM
+        return cls.FULL
+
+    @property
+    def field_name(self) -> str:
+        """Name of the :class:`Water` field storing the geometry in
+        this resolution.
+        """
+        if self is GeometryResolution.FULL:
+            return "geometry"
+        return f"geometry_{self.value}"
+
+
+#: Tolerances (in degrees) used to simplify the water geometry. Roughly
+#: 100 and 10 meters respectively.
+_SIMPLIFY_TOLERANCE_LOW: float = 0.001
+_SIMPLIFY_TOLERANCE_MEDIUM: float = 0.0001
+
+
 class Water(DateModelMixin):
     class Meta:
         verbose_name = gettext_lazy("Water")
         verbose_name_plural = gettext_lazy("Waters")
-        indexes = (GinIndex(fields=("search_vector",)),)
+        indexes = (
+            GinIndex(fields=("search_vector",)),
+            # Trigram index for similarity searches (typo tolerance)
+            GinIndex(
+                fields=("name",),
+                opclasses=("gin_trgm_ops",),
+                name="gcampuscore_water_name_trgm",
+            ),
+            # Used by the 'changes' API
+            models.Index(
+                fields=("updated_at", "id"), name="gcampuscore_water_updated_at"
+            ),
+        )
         ordering = ("name", "osm_id")
 
-    #: The search vector will be overwritten and turned into a postgres
-    #: generated column in migration ``0002_search``.
-    search_vector = SearchVectorField(null=True, editable=False)
+    #: Generated column used for full-text search. The column has been
+    #: created in migration ``0009_water_search``.
+    search_vector = models.GeneratedField(
+        expression=SearchVector(
+            "name", config=getattr(settings, "TSVECTOR_CONF", "german"), weight="A"
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
     geometry = GeometryField(blank=False, verbose_name=gettext_lazy("Geometry"))
+    #: Simplified copies of :attr:`.geometry`, computed by the database
+    #: whenever the geometry changes. See :class:`.GeometryResolution`.
+    geometry_medium = models.GeneratedField(
+        expression=SimplifyPreserveTopology("geometry", _SIMPLIFY_TOLERANCE_MEDIUM),
+        output_field=GeometryField(),
+        db_persist=True,
+        verbose_name=gettext_lazy("Geometry (medium resolution)"),
+    )
+    geometry_low = models.GeneratedField(
+        expression=SimplifyPreserveTopology("geometry", _SIMPLIFY_TOLERANCE_LOW),
+        output_field=GeometryField(),
+        db_persist=True,
+        verbose_name=gettext_lazy("Geometry (low resolution)"),
+    )
     tags = models.JSONField(
         default=dict, blank=True, null=False, verbose_name=gettext_lazy("Tags")
     )
@@ -207,6 +282,12 @@ class Water(DateModelMixin):
 
     _default_water_name: str = gettext_lazy("Unnamed {water_type!s}")
 
+    #: Names of all geometry fields. Useful to defer all of them if the
+    #: geometry is not needed.
+    geometry_fields: Tuple[str, ...] = tuple(
+        resolution.field_name for resolution in GeometryResolution
+    )
+
     def save(self, *args, **kwargs):
         if not kwargs.get("update_fields", None):
             # skip if 'update_fields' is provided
@@ -216,22 +297,6 @@ class Water(DateModelMixin):
                 self.flow_type = self.guess_flow_type(self.water_type)
         return super(Water, self).save(*args, **kwargs)
 
-    def _do_insert(self, manager, using, fields, update_pk, raw):
-        mod_fields = list(fields)
-        for i, field in enumerate(mod_fields):
-            if field.name == "search_vector":
-                del mod_fields[i]
-        return super(Water, self)._do_insert(manager, using, mod_fields, update_pk, raw)
-
-    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update, returning_fields):
-        mod_values = list(values)
-        for i, (field, _, value) in enumerate(mod_values):
-            if field.name == "search_vector":
-                del mod_values[i]
-        return super(Water, self)._do_update(
-            base_qs, using, pk_val, mod_values, update_fields, forced_update, returning_fields
-        )
-
     @property
     def display_name(self) -> str:
         """Retrieve human-readable name. Defaults to the :attr:`.name`
@@ -15,20 +15,24 @@
 
 __all__ = [
     "update_measurement_document",
-    "clear_measurement_documents",
     "update_measurement_indices",
     "create_measurement_indices",
+    "invalidate_measurement_histogram",
+    "invalidate_public_cache",
+    "instrument_connection",
 ]
 
 import logging
 from typing import Union, Optional
 
 from django.db import transaction
-from django.db.models import QuerySet
+from django.db.backends.signals import connection_created
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.utils.translation import get_language
 
+from gcampus.core.http_cache import bump_data_version
+from gcampus.core.instrumentation import install_execute_wrapper
 from gcampus.core.models import (
     Parameter,
     Measurement,
@@ -39,7 +43,9 @@ from gcampus.core.models import (
     TrophicIndex,
     StructureIndex,
 )
-from gcampus.documents.tasks import render_cached_document_view
+from gcampus.core.signals import suppressible
+from gcampus.core.util import invalidate_time_histogram
+from gcampus.documents.tasks import schedule_document_render
 
 logger = logging.getLogger("gcampus.core.receivers")
 
@@ -47,6 +53,7 @@ logger = logging.getLogger("gcampus.core.receivers")
 @receiver(post_save, sender=Measurement)
 @receiver(post_save, sender=Parameter)
 @receiver(post_delete, sender=Parameter)
+@suppressible
 def update_measurement_document(
     sender,  # noqa
     instance: Union[Parameter, Measurement],
@@ -85,39 +92,15 @@ def update_measurement_document(
         # Only build the document if it has been build already.
         return
 
-    render_cached_document_view.apply_async(
-        args=(
-            "gcampus.documents.views.MeasurementDetailPDF",
-            measurement.pk,
-            get_language(),
-        ),
-        # If multiple parameters are created/deleted at the same time,
-        # skip rebuilding the document after the first parameter.
-        kwargs={"force": False},
+    # Saving multiple parameters at once (e.g. in a formset) results in
+    # a single render of the document.
+    schedule_document_render(
+        "gcampus.documents.views.MeasurementDetailPDF",
+        measurement.pk,
+        get_language(),
     )
 
 
-@receiver(post_save, sender=ParameterType)
-def clear_measurement_documents(
-    sender,  # noqa
-    instance: ParameterType,
-    created: bool = False,
-    **kwargs,  # noqa
-):
-    if created:
-        return
-    qs: QuerySet
-    if isinstance(instance, ParameterType):
-        qs = Measurement.objects.filter(parameters__parameter_type=instance)
-    elif isinstance(instance, Water):
-        qs = Measurement.objects.filter(water=instance)
-    else:
-        raise NotImplementedError(f"Unhandled instance '{type(instance)}'")
-    # Note that the file will not be deleted from the storage backend,
-    # only its reference is removed from the database.
-    qs.update(document=None)
-
-
 @receiver(post_save, sender=Parameter)
 def update_measurement_indices(sender, instance: Parameter, **kwargs):
     with transaction.atomic():
@@ -147,3 +130,28 @@ def create_measurement_indices(
         SaprobicIndex.objects.get_or_create(measurement_id=instance.pk)
         TrophicIndex.objects.get_or_create(measurement_id=instance.pk)
         StructureIndex.objects.get_or_create(measurement_id=instance.pk)
+
+
+@receiver(post_save, sender=Measurement)
+@receiver(post_delete, sender=Measurement)
+def invalidate_measurement_histogram(sender, **kwargs):  # noqa
+    invalidate_time_histogram()
+
+
+@receiver(post_save, sender=Measurement)
+@receiver(post_delete, sender=Measurement)
+@receiver(post_save, sender=Parameter)
+@receiver(post_delete, sender=Parameter)
+@receiver(post_save, sender=ParameterType)
+@receiver(post_delete, sender=ParameterType)
+@receiver(post_save, sender=Water)
+@receiver(post_delete, sender=Water)
+def invalidate_public_cache(sender, **kwargs):  # noqa
+    # Public responses rendered before the transaction has been
+    # committed would otherwise be cached with the new data version.
+    transaction.on_commit(bump_data_version)
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):  # noqa
+    install_execute_wrapper(connection)
@@ -0,0 +1,92 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+__all__ = ["get_search_query", "search"]
+
+import re
+from typing import Optional
+
+from django.conf import settings
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramSimilarity,
+)
+from django.db.models import F, Q, QuerySet
+
+TSVECTOR_CONF = getattr(settings, "TSVECTOR_CONF", "german")
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def get_search_query(value: str, config: str = TSVECTOR_CONF) -> SearchQuery:
+    """Get the full-text search query for user input
+
+    The input is parsed with the web search syntax (quoted phrases,
+    ``or`` and ``-`` to exclude words). Additionally, all words that
+    are not excluded match as prefixes, e.g. ``Neck`` matches
+    ``Neckar``. Excluded words are excluded from the prefix query
+    as well.
+
+    :param value: Search input provided by the user.
+    :param config: Text search configuration.
+    """
+    query = SearchQuery(value, config=config, search_type="websearch")
+    terms = []
+    for term in value.split():
+        if term.lower() == "or":
+            continue
+        if term.startswith("-"):
+            terms.extend(f"!{word}" for word in _WORD_PATTERN.findall(term))
+        else:
+            terms.extend(f"{word}:*" for word in _WORD_PATTERN.findall(term))
+    if any(not term.startswith("!") for term in terms):
+        query |= SearchQuery(" & ".join(terms), config=config, search_type="raw")
+    return query
+
+
+def search(
+    qs: QuerySet,
+    value: str,
+    field_name: str = "search_vector",
+    trigram_field: Optional[str] = None,
+    config: str = TSVECTOR_CONF,
+) -> QuerySet:
+    """Search and order a queryset by relevance
+
+    Filters the queryset using the full-text search vector
+    ``field_name`` and orders the results by their rank (annotated as
+    ``search_rank``). If ``trigram_field`` is provided, rows that are
+    similar to the search input (see ``pg_trgm``) are included as well,
+    which tolerates typos.
+
+    :param qs: Queryset to search.
+    :param value: Search input provided by the user.
+    :param field_name: Name of the search vector field.
+    :param trigram_field: Optional name of a text field with a trigram
+        index.
+    :param config: Text search configuration.
+    """
+    search_query = get_search_query(value, config=config)
+    query = Q(**{field_name: search_query})
+    rank = SearchRank(F(field_name), search_query)
+    if trigram_field:
+        query |= Q(**{f"{trigram_field}__trigram_similar": value})
+        rank = rank + TrigramSimilarity(trigram_field, value)
+    return (
+        qs.filter(query)
+        .annotate(search_rank=rank)
+        .order_by("-search_rank", *qs.query.order_by)
+    )
@@ -0,0 +1,75 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""Signal utilities
+
+Receivers decorated with :func:`suppressible` can be suppressed for the
+current thread, greenlet or task using :func:`suppress_receivers`. Unlike
+disconnecting a receiver from its signal, this does not affect any other
+request or task running in the same process.
+"""
+
+__all__ = ["suppressible", "suppress_receivers"]
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, FrozenSet, Iterator
+
+_suppressed_receivers: ContextVar[FrozenSet[Callable]] = ContextVar(
+    "suppressed_receivers", default=frozenset()
+)
+
+
+def suppressible(func: Callable) -> Callable:
+    """Allow suppressing a signal receiver using
+    :func:`suppress_receivers`. Has to be applied before connecting the
+    receiver:
+
+    .. code-block:: python
+
+        @receiver(post_delete, sender=MyModel)
+        @suppressible
+        def my_receiver(sender, instance, **kwargs):
+            ...
+    """
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if wrapper in _suppressed_receivers.get():
+            return None
+        return func(*args, **kwargs)
+
+    return wrapper
+
+
+@contextmanager
+def suppress_receivers(*receivers: Callable) -> Iterator[None]:
+    """Temporarily suppress signal receivers in the current context.
+
+    .. code-block:: python
+
+        with suppress_receivers(my_receiver):
+            MyModel.objects.all().delete()
+
+    :param receivers: Receivers decorated with :func:`suppressible`.
+    """
+    token = _suppressed_receivers.set(
+        _suppressed_receivers.get() | frozenset(receivers)
+    )
+    try:
+        yield
+    finally:
+        _suppressed_receivers.reset(token)
@@ -56,12 +56,16 @@ class UnknownSourceError extends Error {
  * @param source {string} - Can be either 'osm' or 'db'
  * @param lng {number|string} - Longitude
  * @param lat {number|string} - Latitude
+ * @param zoom {number} - Zoom level of the map, used to choose the
+ *     resolution of the returned geometries
  * @returns {string} - URL for the query
  */
-function getLookupQuery(source, lng, lat) {
+function getLookupQuery(source, lng, lat, zoom) {
     let url;
     if (source === 'osm') {
-        url = '/api/v1/overpasslookup/';
+        // The hybrid lookup only queries Overpass for areas that have
+        // not been synchronized recently.
+        url = '/api/v1/hybridlookup/';
     } else if (source === 'db') {
         url = '/api/v1/waterlookup';
     } else {
@@ -79,6 +83,8 @@ function getLookupQuery(source, lng, lat) {
         geo_center: location,
         geo_size: bboxSize
     };
+    if (zoom !== undefined && zoom !== null)
+        params.zoom = Math.floor(zoom).toString();
     let searchParams = new URLSearchParams(params).toString();
     return [url, searchParams].join('?');
 }
@@ -92,10 +98,11 @@ function getLookupQuery(source, lng, lat) {
  *
  * @param lng {number|string} - Longitude
  * @param lat {number|string} - Latitude
+ * @param zoom {number} - Zoom level of the map
  * @returns {Promise} - Fetch promise
  */
-function fetchWaterLookup(lng, lat) {
-    let lookupQuery = getLookupQuery('db', lng, lat);
+function fetchWaterLookup(lng, lat, zoom) {
+    let lookupQuery = getLookupQuery('db', lng, lat, zoom);
     return fetch(lookupQuery).then(response => response.json());
 }
 
@@ -108,10 +115,11 @@ function fetchWaterLookup(lng, lat) {
  *
  * @param lng {number|string} - Longitude
  * @param lat {number|string} - Latitude
+ * @param zoom {number} - Zoom level of the map
  * @returns {Promise} - Fetch promise
  */
-function fetchOverpassLookup(lng, lat) {
-    let lookupQuery = getLookupQuery('osm', lng, lat);
+function fetchOverpassLookup(lng, lat, zoom) {
+    let lookupQuery = getLookupQuery('osm', lng, lat, zoom);
     return fetch(lookupQuery).then(response => response.json());
 }
 
@@ -360,7 +368,7 @@ class WaterList {
         // through to the server.
         this._requestTimeout = setTimeout(() => {
             this._requestTimeout = null;
-            fetchWaterLookup(lng, lat)
+            fetchWaterLookup(lng, lat, this.map.getZoom())
                 .then(data => this.setFeatures(data.features, 'db'))
                 .catch((err) => {
                     // Set empty features to continue with the flow
@@ -390,7 +398,7 @@ class WaterList {
                 loadingTextElement.classList.add("show");
             }, 250);
         }, 3000);
-        fetchOverpassLookup(this.lng, this.lat)
+        fetchOverpassLookup(this.lng, this.lat, this.map.getZoom())
             .then(data => this.setFeatures(data.features, 'osm'))
             .catch((err) => {
                 // Set empty features to continue with the flow
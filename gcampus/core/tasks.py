@@ -14,29 +14,42 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import logging
-from typing import List, Dict, Optional
+import warnings
+from typing import List, Optional
 
 import httpx
 from celery import shared_task
 from django.conf import settings
 from django.core.mail import mail_managers
 from django.db import transaction
-from django.db.models import Q, Count
-from django.db.models.signals import post_delete, post_save
+from django.db.models import Q
 from django.utils import timezone, translation
 
 from gcampus.auth.models import Course, AccessKey, CourseToken
 from gcampus.auth.receivers import update_access_key_documents
-from gcampus.core.models import Measurement, Water, Parameter
+from gcampus.core.maintenance import (
+    hide_empty_measurements,
+    delete_unverified_courses,
+    delete_unused_courses,
+    deactivate_old_access_keys,
+)
+from gcampus.core.models import Measurement, Water
 from gcampus.core.receivers import update_measurement_document
+from gcampus.core.signals import suppress_receivers
 from gcampus.documents.tasks import render_cached_document_view
-from gcampus.mail.messages.maintenance import (
-    MaintenanceAccessKeys,
-    MaintenanceCourseDeletion,
+from gcampus.mail.tasks import (
+    prepare_template_email,
+    enqueue_template_emails,
+    send_template_emails,
 )
 
 logger = logging.getLogger("gcampus.core.tasks")
 
+COURSE_DELETION_TEMPLATE = "gcampus.mail.messages.maintenance.MaintenanceCourseDeletion"
+ACCESS_KEY_DEACTIVATION_TEMPLATE = (
+    "gcampus.mail.messages.maintenance.MaintenanceAccessKeys"
+)
+
 
 @shared_task
 def send_course_deletion_email(
@@ -45,12 +58,26 @@ def send_course_deletion_email(
     course_school: Optional[str],
     language: Optional[str] = None,
 ):
-    if language is None:
-        language = settings.LANGUAGE_CODE
-    with translation.override(language):
-        email_template = MaintenanceCourseDeletion(course_name, course_school)
-        message = email_template.as_message([email])
-    message.send()
+    """Deprecated, use :func:`gcampus.mail.tasks.send_template_emails`.
+
+    Kept for tasks enqueued before the update and removed in the next
+    release.
+    """
+    warnings.warn(
+        "'send_course_deletion_email' is deprecated, use 'send_template_emails'",
+        DeprecationWarning,
+    )
+    send_template_emails(
+        [
+            prepare_template_email(
+                COURSE_DELETION_TEMPLATE,
+                [email],
+                language=language,
+                course_name=course_name,
+                course_school=course_school,
+            )
+        ]
+    )
 
 
 @shared_task
@@ -61,111 +88,72 @@ def send_access_key_deactivation_email(
     access_keys: List[str],
     language: Optional[str] = None,
 ):
-    if language is None:
-        language = settings.LANGUAGE_CODE
-    with translation.override(language):
-        email_template = MaintenanceAccessKeys(course_name, course_school, access_keys)
-        message = email_template.as_message([email])
-    message.send()
+    """Deprecated, use :func:`gcampus.mail.tasks.send_template_emails`.
+
+    Kept for tasks enqueued before the update and removed in the next
+    release.
+    """
+    warnings.warn(
+        "'send_access_key_deactivation_email' is deprecated, "
+        "use 'send_template_emails'",
+        DeprecationWarning,
+    )
+    send_template_emails(
+        [
+            prepare_template_email(
+                ACCESS_KEY_DEACTIVATION_TEMPLATE,
+                [email],
+                language=language,
+                course_name=course_name,
+                course_school=course_school,
+                access_keys=access_keys,
+            )
+        ]
+    )
 
 
 @shared_task
 def maintenance():
     now = timezone.now()
 
-    measurements = Measurement.all_objects.filter(
-        Q(parameters__isnull=True),
-        # AND
-        Q(hidden=False),
-        # AND
-        Q(updated_at__lt=(now - settings.MEASUREMENT_RETENTION_TIME)),
-        # AND
-        Q(comment__isnull=True) | Q(comment__exact=""),
-    )
-    measurement_count: int = measurements.all().count()
-    measurements.update(hidden=True)
-
-    unverified_courses: List[Course] = Course.objects.filter(
-        email_verified=False,
-        updated_at__lt=(now - settings.UNVERIFIED_COURSE_RETENTION_TIME),
-    ).all()
-    unverified_courses_count = 0
-    with transaction.atomic():
-        for course in unverified_courses:
-            try:
-                post_delete.disconnect(
-                    receiver=update_access_key_documents, sender=AccessKey
-                )
-                AccessKey.objects.filter(course=course).delete()
-            finally:
-                post_delete.connect(
-                    receiver=update_access_key_documents, sender=AccessKey
-                )
-            CourseToken.objects.filter(course=course).delete()
-            course.delete()
-            unverified_courses_count += 1
-
-    unused_courses: List[Course] = (
-        Course.objects.filter(
-            email_verified=True,
-            course_token__last_login__lt=(now - settings.UNUSED_COURSE_RETENTION_TIME),
+    measurement_count = hide_empty_measurements(now)
+    unverified_courses_count = delete_unverified_courses(now)
+
+    unused_courses = delete_unused_courses(now)
+    unused_courses_count = len(unused_courses)
+    emails = [
+        prepare_template_email(
+            COURSE_DELETION_TEMPLATE,
+            [course["teacher_email"]],
+            course_name=course["name"],
+            course_school=course["school_name"],
         )
-        .annotate(measurement_count=Count("access_keys__measurements"))
-        .filter(measurement_count=0)
-        .all()
-    )
-    unused_courses_count = 0
-    with transaction.atomic():
-        for course in unused_courses:
-            try:
-                post_delete.disconnect(
-                    receiver=update_access_key_documents, sender=AccessKey
-                )
-                AccessKey.objects.filter(course=course).delete()
-            finally:
-                post_delete.connect(
-                    receiver=update_access_key_documents, sender=AccessKey
-                )
-            CourseToken.objects.filter(course=course).delete()
-            send_course_deletion_email.apply_async(
-                args=(course.teacher_email, course.name, course.school_name)
-            )
-            course.delete()
-            unused_courses_count += 1
-
-    old_access_keys: List[AccessKey] = AccessKey.objects.filter(
-        deactivated=False,
-        created_at__lt=now - settings.ACCESS_KEY_LIFETIME,
-    ).all()
-    courses: Dict[int, List[str]] = {}
-    access_key_count = 0
-    with transaction.atomic():
-        try:
-            post_save.disconnect(receiver=update_access_key_documents, sender=AccessKey)
-            for access_key in old_access_keys:
-                access_key.deactivated = True
-                access_key.save()
-                access_key_count += 1
-                courses.setdefault(access_key.course_id, [])
-                courses[access_key.course_id].append(access_key.token)
-        finally:
-            post_save.connect(receiver=update_access_key_documents, sender=AccessKey)
+        for course in unused_courses
+    ]
 
+    courses = deactivate_old_access_keys(now)
+    access_key_count = sum(len(course["tokens"]) for course in courses)
     # Send email notifying the teacher about deactivated courses
-    for course_id, access_keys in courses.items():
-        course = Course.objects.only("teacher_email", "name", "school_name").get(
-            pk=course_id
-        )
+    for course in courses:
         render_cached_document_view.apply_async(
             args=(
                 "gcampus.documents.views.CourseOverviewPDF",
-                course.pk,
+                course["course_id"],
                 translation.get_language(),
             ),
         )
-        send_access_key_deactivation_email.apply_async(
-            args=(course.teacher_email, course.name, course.school_name, access_keys)
+        emails.append(
+            prepare_template_email(
+                ACCESS_KEY_DEACTIVATION_TEMPLATE,
+                [course["teacher_email"]],
+                course_name=course["name"],
+                course_school=course["school_name"],
+                access_keys=course["tokens"],
+            )
         )
+    # All notification emails are sent in batches, each using a single
+    # connection to the email backend.
+    enqueue_template_emails(emails)
 
     mail_managers(
         "Maintenance report",
@@ -194,12 +182,9 @@ def staging_maintenance():
     measurements = Measurement.all_objects.filter(
         Q(hidden=True) | Q(updated_at__lt=now - settings.MEASUREMENT_LIFETIME_STAGING)
     )
-    try:
-        # Detach post_delete for all parameters
-        post_delete.disconnect(receiver=update_measurement_document, sender=Parameter)
+    # Skip document updates for all deleted parameters
+    with suppress_receivers(update_measurement_document):
         total, detail = measurements.delete()
-    finally:
-        post_delete.connect(receiver=update_measurement_document, sender=Parameter)
     measurement_count = detail.get("gcampuscore.Measurement", 0)
 
     # Delete all old access keys
@@ -207,11 +192,8 @@ def staging_maintenance():
     access_keys = AccessKey.objects.filter(
         Q(last_login__isnull=True) | Q(last_login__lt=course_deletion_date)
     )
-    try:
-        post_delete.disconnect(receiver=update_access_key_documents, sender=AccessKey)
+    with suppress_receivers(update_access_key_documents):
         total, detail = access_keys.delete()
-    finally:
-        post_delete.connect(receiver=update_access_key_documents, sender=AccessKey)
     access_key_count = detail.get("gcampusauth.AccessKey", 0)
 
     # Delete all old courses
@@ -222,16 +204,13 @@ def staging_maintenance():
         | Q(course_token__last_login__lt=course_deletion_date),
     )
     course_token_count = 0
-    try:
-        post_delete.disconnect(receiver=update_access_key_documents, sender=AccessKey)
+    with suppress_receivers(update_access_key_documents):
         for course in courses:
             _, detail = AccessKey.objects.filter(course=course).delete()
             access_key_count += detail.get("gcampusauth.AccessKey", 0)
             _, detail = CourseToken.objects.filter(course=course).delete()
             course_token_count += detail.get("gcampusauth.CourseToken", 0)
         _, detail = courses.delete()
-    finally:
-        post_delete.connect(receiver=update_access_key_documents, sender=AccessKey)
 
     course_count = detail.get("gcampusauth.Course", 0)
 
@@ -22,9 +22,7 @@ register = template.Library()
 
 @register.simple_tag()
 def has_parameter_type(measurement: Measurement, parameter_type_identifier: str) -> str:
-    if parameter_type_identifier in measurement.parameters.values_list(
-        "parameter_type__identifier", flat="true"
-    ):
+    if parameter_type_identifier in measurement.parameter_type_summary.identifiers:
         return "active"
     else:
         return "inactive"
@@ -34,9 +32,7 @@ def has_parameter_type(measurement: Measurement, parameter_type_identifier: str)
 def has_parameter_category(
     measurement: Measurement, parameter_type_category: str
 ) -> bool:
-    if parameter_type_category in measurement.parameters.values_list(
-        "parameter_type__category", flat="true"
-    ):
+    if parameter_type_category in measurement.parameter_type_summary.categories:
         return True
     else:
         return False
@@ -24,6 +24,7 @@ from django.utils.timezone import now
 from rest_framework.throttling import SimpleRateThrottle
 
 from gcampus.auth.models import CourseToken, AccessKey, Course, BaseToken
+from gcampus.auth.throttling import RedisRateThrottle
 from gcampus.core.models import Water, Measurement
 from gcampus.core.models.water import WaterType
 
@@ -47,19 +48,27 @@ class FormTestMixin:
 
 class ThrottleTestMixin:
     def setUp(self):
-        # Mock the 'allow_request' function of FrontendAnonRateThrottle.
-        # All throttled endpoints will be allowed.
+        # Mock the 'allow_request' function of all throttles (including
+        # the ones using Redis). All throttled endpoints will be allowed.
         self.throttle_mock = mock.patch.object(
             SimpleRateThrottle,
             "allow_request",
             return_value=True,
             autospec=True,
         )
+        self.redis_throttle_mock = mock.patch.object(
+            RedisRateThrottle,
+            "allow_request",
+            return_value=True,
+            autospec=True,
+        )
         self.throttle_mock.start()
+        self.redis_throttle_mock.start()
         super().setUp()
 
     def tearDown(self):
         self.throttle_mock.stop()
+        self.redis_throttle_mock.stop()
         super().tearDown()
 
 
@@ -92,8 +92,9 @@ class MeasurementViewTest(
         token = self.tokens[0]
         login_response = self.login(self.tokens[0])
         self.assertEqual(login_response.status_code, 302)
-        token.permissions.remove(perm)
-        token.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            token.permissions.remove(perm)
+            token.save()
         form_data: dict = {"water": self.water.pk}
         form_data.update(self.form_data_stub)
         with patch.object(MeasurementForm, "save", return_value=MockMeasurement) as m:
@@ -0,0 +1,75 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from datetime import timedelta
+
+from django.contrib.gis.geos import Point
+from django.test import SimpleTestCase
+from django.utils import timezone
+
+from gcampus.core.models import Measurement
+from gcampus.core.tests.mixins import TokenTestMixin, WaterTestMixin
+from gcampus.core.util import (
+    get_measurement_intervals,
+    get_measurement_histogram,
+    get_time_histogram,
+)
+from gcampus.tasks.tests.utils import BaseMockTaskTest
+
+
+class MeasurementIntervalsTest(SimpleTestCase):
+    def test_measurement_intervals(self):
+        now = timezone.now()
+        intervals = [now - timedelta(weeks=x) for x in reversed(range(4))]
+        dates = [
+            now - timedelta(weeks=2, days=1),
+            now - timedelta(days=1),
+            now - timedelta(days=2),
+            now,
+        ]
+        self.assertEqual(get_measurement_intervals(intervals, dates), [33, 0, 100])
+        self.assertEqual(get_measurement_intervals(intervals, []), [])
+
+
+class MeasurementHistogramTest(TokenTestMixin, WaterTestMixin, BaseMockTaskTest):
+    def test_measurement_histogram(self):
+        now = timezone.now()
+        intervals = [now - timedelta(weeks=x) for x in reversed(range(4))]
+        dates = [
+            now - timedelta(weeks=2, days=1),
+            now - timedelta(days=1),
+            now - timedelta(days=2),
+            now - timedelta(weeks=5),
+        ]
+        for date in dates:
+            Measurement.objects.create(
+                token=self.tokens[0], location=Point(0, 0), water=self.water, time=date
+            )
+        self.assertEqual(
+            get_measurement_histogram(Measurement.objects.all(), intervals),
+            get_measurement_intervals(intervals, dates),
+        )
+
+    def test_time_histogram_invalidation(self):
+        self.assertEqual(get_time_histogram(Measurement.objects.all()), ([], []))
+        Measurement.objects.create(
+            token=self.tokens[0],
+            location=Point(0, 0),
+            water=self.water,
+            time=timezone.now() - timedelta(days=1),
+        )
+        intervals, measurements = get_time_histogram(Measurement.objects.all())
+        self.assertTrue(intervals)
+        self.assertEqual(max(measurements), 100)
@@ -0,0 +1,103 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from django.conf import settings
+from django.contrib.admin import site
+from django.contrib.gis.geos import Point
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from gcampus.core.admin import MeasurementAdmin, hide
+from gcampus.core.http_cache import get_data_version
+from gcampus.core.models import Measurement
+from gcampus.core.tests.mixins import LoginTestMixin, TokenTestMixin, WaterTestMixin
+from gcampus.tasks.tests.utils import BaseMockTaskTest
+
+
+@override_settings(PUBLIC_CACHE_TIMEOUT=60)
+class PublicCacheTest(LoginTestMixin, TokenTestMixin, WaterTestMixin, BaseMockTaskTest):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.measurement = Measurement.objects.create(
+            token=self.tokens[0],
+            location=Point(8.684231, 49.411955),
+            water=self.water,
+            time=timezone.now(),
+            comment="First comment",
+        )
+        self.url = reverse(
+            "gcampuscore:measurement-detail", kwargs={"pk": self.measurement.pk}
+        )
+
+    def test_cached_response(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header("ETag"))
+        with self.assertNumQueries(0):
+            cached_response = self.client.get(self.url)
+        self.assertEqual(cached_response.status_code, 200)
+        self.assertEqual(cached_response["ETag"], response["ETag"])
+        self.assertContains(cached_response, "First comment")
+        # The CSRF token of the report form is not shared
+        self.assertContains(cached_response, 'name="csrfmiddlewaretoken"')
+        self.assertNotContains(cached_response, "__gcampus_csrf_token__")
+
+    def test_not_modified(self):
+        response = self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+
+    def test_invalidation(self):
+        self.client.get(self.url)
+        version = get_data_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.measurement.comment = "Second comment"
+            self.measurement.save()
+        self.assertGreater(get_data_version(), version)
+        response = self.client.get(self.url)
+        self.assertContains(response, "Second comment")
+
+    def test_timezone(self):
+        self.client.get(self.url)
+        self.client.cookies[settings.TIME_ZONE_COOKIE_NAME] = "America/New_York"
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(self.url)
+        # Local times are rendered for every time zone
+        self.assertGreater(len(context.captured_queries), 0)
+
+    def test_admin_hide(self):
+        self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            hide(
+                MeasurementAdmin(Measurement, site),
+                None,
+                Measurement.all_objects.filter(pk=self.measurement.pk),
+            )
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_authenticated(self):
+        self.client.get(self.url)
+        self.login(self.tokens[0])
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(len(context.captured_queries), 0)
+        self.assertFalse(response.has_header("ETag"))
@@ -0,0 +1,71 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import copy
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import CommandError, call_command
+from django.test import TransactionTestCase
+
+from gcampus.api.tests.test_osmfile import EXTRACT, write_extract
+from gcampus.core.http_cache import get_data_version
+from gcampus.core.models import Water
+from gcampus.core.models.water import FlowType
+
+
+class ImportWaterFileTest(TransactionTestCase):
+    # Batches are saved by worker threads using their own database
+    # connections. These are not part of a test case's transaction.
+
+    def import_file(self, data: dict = EXTRACT):
+        with tempfile.TemporaryDirectory() as directory:
+            call_command(
+                "importwater",
+                file=write_extract(directory, data),
+                batch_size=1,
+                workers=2,
+                stdout=StringIO(),
+            )
+
+    def test_import(self):
+        self.import_file()
+        self.assertQuerySetEqual(
+            Water.objects.order_by("osm_id"),
+            [(2, "node"), (10, "way"), (20, "relation")],
+            transform=lambda water: (water.osm_id, water.osm_element_type),
+        )
+        river = Water.objects.get(osm_id=20)
+        self.assertEqual(river.name, "River")
+        self.assertEqual(river.flow_type, FlowType.RUNNING)
+
+    def test_data_version(self):
+        # Cached public responses are invalidated after the import
+        version = get_data_version()
+        self.import_file()
+        self.assertNotEqual(get_data_version(), version)
+
+    def test_update(self):
+        self.import_file()
+        data = copy.deepcopy(EXTRACT)
+        data["elements"][2]["tags"]["name"] = "Pond"
+        self.import_file(data)
+        self.assertEqual(Water.objects.count(), 3)
+        self.assertEqual(Water.objects.get(osm_id=10).name, "Pond")
+
+    def test_missing_file(self):
+        with self.assertRaises(CommandError):
+            call_command("importwater", file=Path("missing.json"), stdout=StringIO())
@@ -0,0 +1,83 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from django.contrib.gis.geos import Point
+from django.test import override_settings
+from django.urls import reverse
+
+from gcampus.core.instrumentation import (
+    collect_metrics,
+    external_request,
+    get_request_metrics,
+)
+from gcampus.core.models import Measurement
+from gcampus.core.tests.mixins import TokenTestMixin, WaterTestMixin
+from gcampus.tasks.tests.utils import BaseMockTaskTest
+
+
+class InstrumentationTest(TokenTestMixin, WaterTestMixin, BaseMockTaskTest):
+    def setUp(self):
+        super().setUp()
+        for _ in range(3):
+            Measurement.objects.create(
+                token=self.tokens[0], location=Point(0, 0), water=self.water
+            )
+
+    def test_duplicate_queries(self):
+        self.assertIsNone(get_request_metrics())
+        with collect_metrics() as metrics:
+            for measurement in Measurement.objects.all():
+                # Query the water of every measurement (N+1 queries)
+                self.assertEqual(measurement.water.name, self.water.name)
+            with external_request():
+                pass
+        self.assertIsNone(get_request_metrics())
+        self.assertEqual(metrics.query_count, 4)
+        self.assertEqual(metrics.duplicate_queries, 2)
+        self.assertEqual(len(metrics.get_duplicates()), 1)
+        self.assertEqual(metrics.http_count, 1)
+
+    @override_settings(INSTRUMENTATION_SERVER_TIMING=True)
+    def test_server_timing_header(self):
+        response = self.client.get(reverse("gcampuscore:measurements"))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("db;dur=", response["Server-Timing"])
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_server_timing_header_hidden(self):
+        response = self.client.get(reverse("gcampuscore:measurements"))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("Server-Timing"))
+        response = self.client.get(
+            reverse("gcampuscore:measurements"),
+            headers={"Authorization": "Bearer secret"},
+        )
+        self.assertIn("db;dur=", response["Server-Timing"])
+
+    @override_settings(METRICS_TOKEN=None)
+    def test_metrics_disabled(self):
+        response = self.client.get(
+            reverse("gcampuscore:metrics"), headers={"Authorization": "Bearer "}
+        )
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_non_ascii_authorization(self):
+        headers = {"Authorization": "Bearer sécret"}
+        response = self.client.get(reverse("gcampuscore:measurements"), headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("Server-Timing"))
+        response = self.client.get(reverse("gcampuscore:metrics"), headers=headers)
+        self.assertEqual(response.status_code, 404)
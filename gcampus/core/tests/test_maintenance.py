@@ -18,12 +18,20 @@ from unittest import mock
 
 from celery import Task
 from django.conf import settings
+from django.core import mail
 from django.test import TestCase
 from django.utils import timezone
 
 from gcampus.auth.models import Course, AccessKey, CourseToken
+from gcampus.auth.receivers import update_access_key_documents
 from gcampus.core.models import Measurement, Parameter
-from gcampus.core.tasks import maintenance
+from gcampus.core.signals import suppress_receivers
+from gcampus.core.tasks import (
+    maintenance,
+    send_access_key_deactivation_email,
+    send_course_deletion_email,
+)
+from gcampus.documents.tasks import render_cached_document_view
 
 
 class MaintenanceTest(TestCase):
@@ -90,3 +98,23 @@ class MaintenanceTest(TestCase):
 
         self.assertTrue(AccessKey.objects.get(pk=1).deactivated)
         self.assertFalse(AccessKey.objects.get(pk=2).deactivated)
+
+    def test_suppress_receivers(self):
+        with mock.patch.object(render_cached_document_view, "apply_async") as task_mock:
+            with suppress_receivers(update_access_key_documents):
+                AccessKey.objects.get(pk=1).delete()
+            task_mock.assert_not_called()
+            # Receivers are only suppressed within the context
+            AccessKey.objects.get(pk=2).delete()
+            task_mock.assert_called_once()
+
+    def test_deprecated_email_tasks(self):
+        # Tasks enqueued before the update are still sent
+        with self.assertWarns(DeprecationWarning):
+            send_course_deletion_email("teacher@example.com", "Course", "School")
+        with self.assertWarns(DeprecationWarning):
+            send_access_key_deactivation_email(
+                "teacher@example.com", "Course", "School", ["abcdefgh"], "en"
+            )
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(mail.outbox[1].to, ["teacher@example.com"])
@@ -19,7 +19,7 @@ import unittest
 from django.contrib.gis.geos import GEOSGeometry, Point
 from django.utils import timezone
 
-from gcampus.core.models import Measurement, Water
+from gcampus.core.models import Measurement, Water, Parameter, ParameterType
 from gcampus.core.models.water import WaterType
 from gcampus.tasks.tests.utils import BaseMockTaskTest
 
@@ -77,3 +77,30 @@ class MeasurementModelTest(BaseMockTaskTest):
         filter_result_all = Measurement.all_objects.filter(pk=measurement.pk)
         self.assertFalse(filter_result)
         self.assertIn(measurement, filter_result_all)
+
+    def test_parameter_type_ids(self):
+        measurement = Measurement(
+            location=LOCATION_OCEAN, time=timezone.now(), water=self.water
+        )
+        measurement.save()
+        first_type = ParameterType.objects.create(name="First", unit="mg/l")
+        second_type = ParameterType.objects.create(name="Second", unit="mg/l")
+        Parameter.objects.create(
+            measurement=measurement, parameter_type=second_type, value=1.0
+        )
+        parameter = Parameter.objects.create(
+            measurement=measurement, parameter_type=first_type, value=2.0
+        )
+        measurement.refresh_from_db(fields=("parameter_type_ids",))
+        self.assertEqual(
+            measurement.parameter_type_ids, [first_type.pk, second_type.pk]
+        )
+        self.assertTrue(
+            Measurement.objects.filter(
+                parameter_type_ids__contains=[first_type.pk, second_type.pk]
+            ).exists()
+        )
+        parameter.hidden = True
+        parameter.save()
+        measurement.refresh_from_db(fields=("parameter_type_ids",))
+        self.assertEqual(measurement.parameter_type_ids, [second_type.pk])
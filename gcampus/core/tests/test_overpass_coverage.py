@@ -0,0 +1,59 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from gcampus.core.models import OverpassCoverage
+
+
+@override_settings(
+    OVERPASS_COVERAGE_CELL_SIZE=0.5, OVERPASS_COVERAGE_MAX_AGE=timedelta(days=1)
+)
+class OverpassCoverageTest(TestCase):
+    def test_get_cells(self):
+        cells = OverpassCoverage.get_cells((8.2, 49.9, 8.6, 50.1))
+        self.assertEqual(cells, [(16, 99), (16, 100), (17, 99), (17, 100)])
+
+    def test_get_cells_bbox(self):
+        bbox = OverpassCoverage.get_cells_bbox([(16, 99), (17, 100)])
+        self.assertEqual(bbox, (8.0, 49.5, 9.0, 50.5))
+
+    def test_stale_cells(self):
+        cells = [(16, 99), (16, 100)]
+        self.assertEqual(OverpassCoverage.get_stale_cells(cells), cells)
+        OverpassCoverage.mark_synced([(16, 99)])
+        self.assertEqual(OverpassCoverage.get_stale_cells(cells), [(16, 100)])
+
+    def test_stale_cells_expired(self):
+        OverpassCoverage.objects.create(
+            x=16, y=99, synced_at=timezone.now() - timedelta(days=2)
+        )
+        self.assertEqual(OverpassCoverage.get_stale_cells([(16, 99)]), [(16, 99)])
+        OverpassCoverage.mark_synced([(16, 99)])
+        self.assertEqual(OverpassCoverage.get_stale_cells([(16, 99)]), [])
+        self.assertEqual(OverpassCoverage.objects.count(), 1)
+
+    def test_group_cells(self):
+        self.assertEqual(
+            OverpassCoverage.group_cells([(16, 99), (40, 120)]),
+            [[(16, 99)], [(40, 120)]],
+        )
+        self.assertEqual(
+            OverpassCoverage.group_cells([(16, 99), (17, 99), (16, 100), (17, 100)]),
+            [[(16, 99), (16, 100), (17, 99), (17, 100)]],
+        )
@@ -0,0 +1,101 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from django.contrib.gis.geos import Point
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from gcampus.core.models import Measurement, Parameter, ParameterType
+from gcampus.core.tests.mixins import TokenTestMixin, WaterTestMixin
+from gcampus.tasks.tests.utils import BaseMockTaskTest
+
+
+class MeasurementQueryCountTest(TokenTestMixin, WaterTestMixin, BaseMockTaskTest):
+    """The number of queries must not depend on the number of
+    measurements or parameters displayed."""
+
+    def setUp(self):
+        super().setUp()
+        self.parameter_types = [
+            ParameterType.objects.create(
+                name=identifier, unit="mg/l", identifier=identifier, category=category
+            )
+            for identifier, category in [
+                ("no3", "chemical"),
+                ("nh4", "chemical"),
+                ("po4", "chemical"),
+                ("ph", "chemical"),
+                ("gammarus", "biological"),
+            ]
+        ]
+
+    def _create_measurement(self, parameter_count: int) -> Measurement:
+        measurement = Measurement.objects.create(
+            token=self.tokens[0],
+            location=Point(8.684231, 49.411955),
+            water=self.water,
+            time=timezone.now(),
+        )
+        for parameter_type in self.parameter_types[:parameter_count]:
+            Parameter.objects.create(
+                measurement=measurement, parameter_type=parameter_type, value=1.0
+            )
+        return measurement
+
+    def _count_queries(self, url: str) -> int:
+        # Cached values (e.g. the time histogram) would reduce the number
+        # of queries of subsequent requests.
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_list_query_count(self):
+        self._create_measurement(1)
+        url = reverse("gcampuscore:measurements")
+        query_count = self._count_queries(url)
+        for _ in range(5):
+            self._create_measurement(len(self.parameter_types))
+        self.assertEqual(self._count_queries(url), query_count)
+
+    def test_detail_query_count(self):
+        first = self._create_measurement(1)
+        second = self._create_measurement(len(self.parameter_types))
+        self.assertEqual(
+            self._count_queries(
+                reverse("gcampuscore:measurement-detail", kwargs={"pk": first.pk})
+            ),
+            self._count_queries(
+                reverse("gcampuscore:measurement-detail", kwargs={"pk": second.pk})
+            ),
+        )
+
+    def test_parameter_type_summary(self):
+        measurement = self._create_measurement(len(self.parameter_types))
+        measurement = Measurement.objects.prefetch_related(
+            "parameters__parameter_type"
+        ).get(pk=measurement.pk)
+        with self.assertNumQueries(0):
+            summary = measurement.parameter_type_summary
+        self.assertIn("no3", summary.identifiers)
+        self.assertEqual(summary.categories, {"chemical", "biological"})
+        # Without prefetching, a single query is used
+        measurement = Measurement.objects.get(pk=measurement.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(measurement.parameter_type_summary, summary)
@@ -0,0 +1,51 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from django.contrib.gis.geos import Point
+
+from gcampus.core.models import Measurement, Water
+from gcampus.core.search import search
+from gcampus.core.tests.mixins import TokenTestMixin, WaterTestMixin
+from gcampus.tasks.tests.utils import BaseMockTaskTest
+
+
+class SearchTest(TokenTestMixin, WaterTestMixin, BaseMockTaskTest):
+    def setUp(self):
+        super().setUp()
+        self.measurement = Measurement.objects.create(
+            token=self.tokens[0],
+            location=Point(0, 0),
+            water=self.water,
+            name="Bridge",
+        )
+
+    def test_prefix_search(self):
+        self.assertIn(self.measurement, search(Measurement.objects.all(), "Brid"))
+
+    def test_water_name_search(self):
+        self.assertIn(self.measurement, search(Measurement.objects.all(), "River"))
+        self.water.name = "The Great Test Lake"
+        self.water.save()
+        self.assertNotIn(self.measurement, search(Measurement.objects.all(), "River"))
+        self.assertIn(self.measurement, search(Measurement.objects.all(), "Lake"))
+
+    def test_excluded_words(self):
+        self.assertNotIn(
+            self.measurement, search(Measurement.objects.all(), "Bridge -River")
+        )
+
+    def test_trigram_search(self):
+        waters = search(Water.objects.all(), "Grate Tset Rivr", trigram_field="name")
+        self.assertIn(self.water, waters)
@@ -27,6 +27,7 @@ from gcampus.core.views.forms import (
     StructureIndexEditView,
 )
 from gcampus.core.views.lists import MeasurementListView, WaterListView
+from gcampus.core.views.metrics import metrics
 from gcampus.core.views.robots import robots_txt
 
 # uncomment to test 404 and 500 pages locally
@@ -39,6 +40,7 @@ from gcampus.core.views.robots import robots_txt
 
 urlpatterns = [
     path("robots.txt", robots_txt),
+    path("metrics", metrics, name="metrics"),
     # Index
     path("", MeasurementMapView.as_view(), name="mapview"),
     # Details
@@ -14,13 +14,16 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import datetime
+import hashlib
 import math
 import time
 from typing import List, Tuple, Optional, Union
 
+import numpy
 from django.conf import settings
 from django.contrib.gis.geos import Point
 from django.core.cache import cache
+from django.db.models import QuerySet, Count, Min
 from django.utils import timezone
 from geopy import Location
 from geopy.exc import GeocoderServiceError
@@ -37,6 +40,9 @@ field used for the ``location_name`` in
 """
 ADDRESS_OPTIONS = ("city", "village", "municipality", "county", "state", "country")
 
+HISTOGRAM_CACHE_KEY = f"{GCampusCoreAppConfig.label}:histogram"
+HISTOGRAM_VERSION_CACHE_KEY = f"{GCampusCoreAppConfig.label}:histogram:version"
+
 
 def get_location_name(
     location: Union[Tuple[float, float], Point, None]
@@ -177,6 +183,10 @@ def get_measurement_intervals(
     Returns a list of percentages (ints) representing how many
     measurements were conducted in this time interval (weeks, months or years).
 
+    This function counts measurement dates already loaded into Python.
+    Use :func:`get_measurement_histogram` to count the measurements in
+    the database instead.
+
     :param interval_list: List of intervals to create numbers of measurements in
     :param measurement_list: List of measurements
     :returns: List of percentages representing how many measurements
@@ -186,20 +196,94 @@ def get_measurement_intervals(
         return []
     if len(interval_list) <= 1:
         return []
-    measurements_per_interval = [0] * (len(interval_list) - 1)
-    for measurement_date in measurement_list:
-        for interval_index in range(len(interval_list) - 1):
-            if (
-                interval_list[interval_index]
-                <= measurement_date
-                <= interval_list[interval_index + 1]
-            ):
-                measurements_per_interval[interval_index] += 1
-                break
-    max_measurements = max(measurements_per_interval)
-    return list(
-        map(lambda m: int(m / max_measurements * 100), measurements_per_interval)
+    counts, _ = numpy.histogram(
+        [date.timestamp() for date in measurement_list],
+        bins=[date.timestamp() for date in interval_list],
+    )
+    return _as_percentages(counts.tolist())
+
+
+def get_measurement_histogram(
+    queryset: QuerySet, interval_list: List[datetime.datetime]
+) -> List[int]:
+    """Get Measurements per bins from the database
+
+    Same as :func:`get_measurement_intervals` but the measurements are
+    counted by the database using ``width_bucket``. Only a single row
+    per bin is returned, independent of the number of measurements.
+
+    :param queryset: Queryset of measurements.
+    :param interval_list: Sorted list of interval boundaries.
+    :returns: List of percentages representing how many measurements
+        were conducted in this interval (week, month or year)
+    """
+    # Avoid circular imports as the models depend on this module
+    from gcampus.core.models.functions import WidthBucket
+
+    if len(interval_list) <= 1:
+        return []
+    bins = len(interval_list) - 1
+    rows = (
+        queryset.order_by()
+        .filter(time__gte=interval_list[0], time__lte=interval_list[-1])
+        .annotate(bucket=WidthBucket("time", interval_list))
+        .values("bucket")
+        .annotate(count=Count("pk"))
+        .values_list("bucket", "count")
     )
+    counts = [0] * bins
+    for bucket, count in rows:
+        # Buckets start at 1. Measurements at the very end of the last
+        # interval are part of the last bin.
+        counts[min(bucket, bins) - 1] += count
+    if not any(counts):
+        return []
+    return _as_percentages(counts)
+
+
+def get_time_histogram(
+    queryset: QuerySet,
+) -> Tuple[List[datetime.datetime], List[int]]:
+    """Get the time histogram of measurements (with caching)
+
+    The interval boundaries and measurements per interval are cached
+    for every query. The cache is invalidated on every change to a
+    measurement (see :func:`invalidate_time_histogram`).
+
+    :param queryset: Queryset of measurements.
+    :returns: Tuple of the interval boundaries and the percentages of
+        measurements per interval. Both are empty if there are no
+        measurements.
+    """
+    version = cache.get_or_set(HISTOGRAM_VERSION_CACHE_KEY, time.time_ns(), None)
+    query_hash = hashlib.sha1(str(queryset.query).encode("utf-8")).hexdigest()
+    cache_key = f"{HISTOGRAM_CACHE_KEY}:{version}:{query_hash}"
+    result = cache.get(cache_key, default=None)
+    if result is not None:
+        return result
+    earliest_date: Optional[datetime.datetime] = queryset.order_by().aggregate(
+        earliest=Min("time")
+    )["earliest"]
+    if earliest_date is None:
+        result = ([], [])
+    else:
+        interval_list = get_intervals_from_today(earliest_date)
+        result = (interval_list, get_measurement_histogram(queryset, interval_list))
+    timeout = getattr(settings, "HISTOGRAM_CACHE_TIMEOUT", 60 * 60)
+    cache.set(cache_key, result, timeout)
+    return result
+
+
+def invalidate_time_histogram():
+    """Invalidate all cached time histograms"""
+    cache.set(HISTOGRAM_VERSION_CACHE_KEY, time.time_ns(), None)
+
+
+def _as_percentages(counts: List[int]) -> List[int]:
+    max_measurements = max(counts)
+    if max_measurements == 0:
+        return [0] * len(counts)
+    return [int(count / max_measurements * 100) for count in counts]
 
 
 def convert_dates_to_js_milliseconds(dates: List[datetime.datetime]) -> List[int]:
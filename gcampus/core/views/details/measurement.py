@@ -30,6 +30,7 @@ from gcampus.auth.models import BaseToken
 from gcampus.auth.models.email import check_email
 from gcampus.auth.session import is_authenticated
 from gcampus.core.forms.measurement import ReportForm
+from gcampus.core.http_cache import public_cache
 from gcampus.core.models import Measurement
 from gcampus.core.views.base import TitleMixin
 from gcampus.core.views.forms import MeasurementDeleteView
@@ -37,10 +38,11 @@ from gcampus.core.views.forms import MeasurementDeleteView
 logger = logging.getLogger("gcampus.core.views.details.measurement")
 
 
+@method_decorator(public_cache, name="get")
 class MeasurementDetailView(FormMixin, TitleMixin, DetailView):
     model = Measurement
     queryset = Measurement.objects.select_related("water", "token").prefetch_related(
-        "parameters"
+        "parameters__parameter_type"
     )
     template_name = "gcampuscore/sites/detail/measurement_detail.html"
     description = gettext_lazy(
@@ -15,20 +15,23 @@
 
 __all__ = ["WaterDetailView"]
 
+from django.utils.decorators import method_decorator
 from django.utils.translation import gettext
 from django.views.generic import DetailView
 
+from gcampus.core.http_cache import public_cache
 from gcampus.core.models import Water
 from gcampus.core.views.base import TitleMixin
 
 
+@method_decorator(public_cache, name="get")
 class WaterDetailView(TitleMixin, DetailView):
     model = Water
     queryset = (
         Water.objects.filter(measurements__isnull=False)
         .distinct()
         .prefetch_related("measurements")
-        .defer("geometry")
+        .defer(*Water.geometry_fields)
     )
     template_name = "gcampuscore/sites/detail/water_detail.html"
 
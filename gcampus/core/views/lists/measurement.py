@@ -18,14 +18,17 @@ __all__ = [
 ]
 
 from django.utils import timezone
+from django.utils.decorators import method_decorator
 from django.utils.translation import gettext_lazy
 from django.views.generic import ListView
 
 from gcampus.core.filters import MeasurementFilterSet
-from gcampus.core.models import Measurement
+from gcampus.core.http_cache import public_cache
+from gcampus.core.models import Measurement, Water
 from gcampus.core.views.base import TitleMixin
 
 
+@method_decorator(public_cache, name="get")
 class MeasurementListView(TitleMixin, ListView):
     template_name = "gcampuscore/sites/list/measurement_list.html"
     model = Measurement
@@ -38,7 +41,7 @@ class MeasurementListView(TitleMixin, ListView):
             "trophic_index",
         )
         .select_related("water")
-        .defer("water__geometry")
+        .defer(*(f"water__{field}" for field in Water.geometry_fields))
         .order_by("-time")
         .all()
     )
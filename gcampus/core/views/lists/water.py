@@ -18,14 +18,17 @@ __all__ = [
 ]
 
 from django.db.models import Count
+from django.utils.decorators import method_decorator
 from django.utils.translation import gettext_lazy
 from django.views.generic import ListView
 
 from gcampus.core.filters import WaterFilterSet
+from gcampus.core.http_cache import public_cache
 from gcampus.core.models import Water
 from gcampus.core.views.base import TitleMixin
 
 
+@method_decorator(public_cache, name="get")
 class WaterListView(TitleMixin, ListView):
     template_name = "gcampuscore/sites/list/water_list.html"
     model = Water
@@ -33,7 +36,7 @@ class WaterListView(TitleMixin, ListView):
         Water.objects.filter(measurements__isnull=False, measurements__hidden=False)
         .distinct()
         .annotate(measurement_count=Count("measurements"))
-        .defer("geometry")
+        .defer(*Water.geometry_fields)
         .order_by("-measurement_count", "name")
     )
     title = gettext_lazy("All waters")
@@ -0,0 +1,36 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from django.http import HttpResponse, Http404
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_GET
+
+from gcampus.core.instrumentation import has_metrics_token, render_metrics
+
+
+@require_GET
+@never_cache
+def metrics(request):
+    """Return request metrics in the Prometheus text format.
+
+    The endpoint is only available if ``METRICS_TOKEN`` is set. The
+    token has to be provided as a bearer token in the ``Authorization``
+    header. Otherwise, the endpoint is not found.
+    """
+    if not has_metrics_token(request):
+        raise Http404()
+    return HttpResponse(
+        render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -31,5 +31,6 @@ def robots_txt(request):
         "Disallow: /map/",
         "Disallow: /export/",
         "Disallow: /admin/",
+        "Disallow: /metrics",
     ]
     return HttpResponse("\n".join(lines), content_type="text/plain")
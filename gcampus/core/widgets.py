@@ -25,11 +25,7 @@ from django.utils.translation import pgettext
 from django_filters.widgets import RangeWidget
 
 from gcampus.core.models import Measurement
-from gcampus.core.util import (
-    get_intervals_from_today,
-    convert_dates_to_js_milliseconds,
-    get_measurement_intervals,
-)
+from gcampus.core.util import convert_dates_to_js_milliseconds, get_time_histogram
 
 
 class SplitTimeWidget(MultiWidget):
@@ -153,20 +149,10 @@ class TimeRangeSlider(RangeWidget):
 
     def get_context(self, name, value, attrs):
         context = super().get_context(name, value, attrs)
-        try:
-            earliest_date: datetime = Measurement.objects.values_list(
-                "time", flat=True
-            ).earliest("time")
-            interval_list = get_intervals_from_today(earliest_date)
-
-            all_dates = list(
-                Measurement.objects.values_list("time", flat=True).filter(hidden=False)
-            )
-
-            measurements_per_interval = get_measurement_intervals(
-                interval_list, all_dates
-            )
-        except Measurement.DoesNotExist:
+        interval_list, measurements_per_interval = get_time_histogram(
+            Measurement.objects.all()
+        )
+        if not interval_list:
             # Create a list with todays date twice and no measurement entries
             interval_list = [timezone.now(), timezone.now()]
             measurements_per_interval = [0]
@@ -15,59 +15,146 @@
 
 __all__ = [
     "render_document_from_html",
+    "get_static_resource",
+    "warm_static_resources",
     "render_document",
+    "get_fingerprint",
     "as_bytes_io",
     "as_file",
 ]
 
+import hashlib
+import json
+import logging
 import mimetypes
 import os
 import pathlib
 import posixpath
+import re
+from functools import lru_cache
 from io import BytesIO
-from typing import Optional, List, Union
+from typing import Optional, List, Union, Tuple
 from urllib.parse import urlsplit
 
 from django.conf import settings
 from django.contrib.staticfiles import finders
 from django.contrib.staticfiles.storage import staticfiles_storage
 from django.template.loader import render_to_string
+from django.utils import translation
 from weasyprint import HTML, Document
 from weasyprint.urls import URLFetcher, URLFetcherResponse
 
 from gcampus.core import get_base_url
 
 DOCUMENT_TEMPLATE_ENGINE: str = "document"
+DOCUMENT_TEMPLATE_DIR: pathlib.Path = (
+    pathlib.Path(__file__).resolve().parent / "templates" / "gcampusdocuments"
+)
+# Maximum number of static resources (fonts, stylesheets and images)
+# kept in memory by every process
+STATIC_RESOURCE_CACHE_SIZE: int = 128
+STATIC_TAG_PATTERN = re.compile(r"""{%\s*static\s+['"]([^'"]+)['"]\s*%}""")
+
+logger = logging.getLogger("gcampus.documents.document")
+
+
+def is_static_url(url: str) -> bool:
+    try:
+        o = urlsplit(url)
+    except ValueError:
+        return False
+    return o.netloc == settings.PRIMARY_HOST and o.path.startswith(settings.STATIC_URL)
 
 
 class GCampusURLFetcher(URLFetcher):
     def fetch(self, url, headers=None):
-        try:
-            o = urlsplit(url)
-        except ValueError:
-            return super().fetch(url, headers)
-        if o.netloc == settings.PRIMARY_HOST and o.path.startswith(settings.STATIC_URL):
-            path = os.path.relpath(o.path, settings.STATIC_URL)
+        if is_static_url(url):
+            path = os.path.relpath(urlsplit(url).path, settings.STATIC_URL)
             normalized_path = posixpath.normpath(path).lstrip("/")
-            mime_type, encoding = mimetypes.guess_type(path, strict=True)
-            absolute_path = finders.find(normalized_path)
-            try:
-                if not absolute_path:
-                    raise FileNotFoundError()
-                if not os.path.isfile(absolute_path) or not os.path.exists(absolute_path):
-                    raise FileNotFoundError(
-                        f"File '{url}' (resolved to '{absolute_path}') not found!"
-                    )
-                file_obj = open(absolute_path, "rb")
-            except FileNotFoundError:
-                file_obj = staticfiles_storage.open(normalized_path, mode="rb")
-            content_type = mime_type or "application/octet-stream"
-            if encoding:
-                content_type = f"{content_type}; charset={encoding}"
-            return URLFetcherResponse(url, file_obj.read(), {"Content-Type": content_type})
+            content, content_type = get_static_resource(normalized_path)
+            return URLFetcherResponse(url, content, {"Content-Type": content_type})
         return super().fetch(url, headers)
 
 
+class StaticImageCache(dict):
+    """Image cache passed to WeasyPrint
+
+    Passing the same cache to every render allows WeasyPrint to reuse
+    decoded images (e.g. logos and the QR code) across documents. Only
+    static images are kept, other images like the measurement maps
+    differ for every document.
+    """
+
+    def __setitem__(self, url, image):
+        if is_static_url(url):
+            super().__setitem__(url, image)
+
+
+_image_cache = StaticImageCache()
+
+
+def get_static_resource(path: str) -> Tuple[bytes, str]:
+    """Get a static resource for the document renderer
+
+    Resources are kept in a bounded LRU cache shared by all renders of
+    a process. Static files do not change without a new release, the
+    cache is thereby keyed by ``settings.GCAMPUS_VERSION`` and repeated
+    lookups do not touch the file system. The cache is bypassed if
+    ``settings.DEBUG`` is enabled.
+
+    :param path: Normalized path relative to ``settings.STATIC_URL``.
+    :returns: Tuple of the content and the content type.
+    """
+    if settings.DEBUG:
+        return _load_static_resource.__wrapped__(path, settings.GCAMPUS_VERSION)
+    return _load_static_resource(path, settings.GCAMPUS_VERSION)
+
+
+@lru_cache(maxsize=STATIC_RESOURCE_CACHE_SIZE)
+def _load_static_resource(path: str, version: str) -> Tuple[bytes, str]:
+    # The 'version' argument is only used as part of the cache key
+    absolute_path: Optional[str] = finders.find(path)
+    if absolute_path and os.path.isfile(absolute_path):
+        with open(absolute_path, "rb") as f:
+            content = f.read()
+    else:
+        with staticfiles_storage.open(path, mode="rb") as f:
+            content = f.read()
+    mime_type, encoding = mimetypes.guess_type(path, strict=True)
+    content_type = mime_type or "application/octet-stream"
+    if encoding:
+        content_type = f"{content_type}; charset={encoding}"
+    return content, content_type
+
+
+def get_document_assets() -> List[str]:
+    """Get the static files referenced by the document templates
+
+    The asset manifest is built by searching all document templates for
+    the ``{% static %}`` template tag.
+    """
+    assets = set()
+    for template in DOCUMENT_TEMPLATE_DIR.rglob("*.html"):
+        assets.update(STATIC_TAG_PATTERN.findall(template.read_text("utf-8")))
+    return sorted(assets)
+
+
+def warm_static_resources() -> int:
+    """Load all assets of the document templates into the cache
+
+    :returns: Number of assets that have been loaded.
+    """
+    count = 0
+    for path in get_document_assets():
+        try:
+            get_static_resource(path)
+        except OSError:
+            logger.warning("Unable to load document asset '%s'", path)
+            continue
+        count += 1
+    return count
+
+
 def render_document(
     template: Union[str, List[str]],
     context: Optional[dict] = None,
@@ -87,7 +174,36 @@ def render_document_from_html(html: str) -> Document:
         :func:`django.template.loader.render_to_string`.
     :returns: A rendered :class:`weasyprint.Document` instance.
     """
-    return HTML(string=html, url_fetcher=GCampusURLFetcher(), base_url=get_base_url()).render()
+    return HTML(
+        string=html, url_fetcher=GCampusURLFetcher(), base_url=get_base_url()
+    ).render(cache=_image_cache)
+
+
+def get_fingerprint(data) -> str:
+    """Get the fingerprint of a document's inputs
+
+    The fingerprint is a SHA-256 hash of the provided data alongside the
+    version of the templates, the active language and the default time
+    zone. Documents are always rendered in the default time zone, thus
+    the fingerprint does not depend on the time zone of a request.
+    Documents with the same fingerprint do not have to be rendered
+    again.
+
+    :param data: JSON serializable inputs of the document. Values that
+        are not serializable are converted to a string.
+    """
+    payload = json.dumps(
+        [
+            settings.GCAMPUS_VERSION,
+            getattr(settings, "ENVIRONMENT", None),
+            translation.get_language(),
+            settings.TIME_ZONE,
+            data,
+        ],
+        default=str,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
 
 def as_bytes_io(document: Document, **kwargs) -> BytesIO:
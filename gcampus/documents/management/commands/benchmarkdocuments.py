@@ -0,0 +1,107 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+__all__ = ["Command"]
+
+import statistics
+import time
+from typing import List, Type
+
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.utils import translation
+from django.utils.module_loading import import_string
+from django_rich.management import RichCommand
+from rich.table import Table
+
+from gcampus.documents.document import as_bytes_io, render_document_from_html
+from gcampus.documents.views.generic import CachedDocumentView
+
+DOCUMENT_VIEWS = {
+    "measurement": "gcampus.documents.views.MeasurementDetailPDF",
+    "course": "gcampus.documents.views.CourseOverviewPDF",
+}
+
+
+class Command(RichCommand):
+    help = (
+        "Measure the per-document latency of rendering cached documents. The "
+        "first render of every document is reported separately as it runs "
+        "with cold caches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--measurement",
+            type=int,
+            action="append",
+            default=[],
+            help="Primary key of a measurement (can be passed multiple times)",
+        )
+        parser.add_argument(
+            "--course",
+            type=int,
+            action="append",
+            default=[],
+            help="Primary key of a course (can be passed multiple times)",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Number of renders per document (default: 5)",
+        )
+
+    def handle(self, measurement, course, repeat, **kwargs):
+        table = Table("Document", "Instance", "Cold (ms)", "Median (ms)", "Mean (ms)")
+        for name, pks in (("measurement", measurement), ("course", course)):
+            view: Type[CachedDocumentView] = import_string(DOCUMENT_VIEWS[name])
+            for pk in pks:
+                timings = self.benchmark(view, pk, max(repeat, 1))
+                warm = timings[1:] or timings
+                table.add_row(
+                    view.__name__,
+                    str(pk),
+                    f"{timings[0]:.1f}",
+                    f"{statistics.median(warm):.1f}",
+                    f"{statistics.mean(warm):.1f}",
+                )
+        self.console.print(table)
+
+    @staticmethod
+    def benchmark(view: Type[CachedDocumentView], pk: int, repeat: int) -> List[float]:
+        """Render the document of a given view and instance
+
+        Only the WeasyPrint render and PDF export are measured. The
+        HTML template (including e.g. the static map) is rendered once
+        beforehand.
+
+        :returns: List of latencies in milliseconds.
+        """
+        view_instance = view.mock_view(pk)
+        with translation.override(settings.LANGUAGE_CODE):
+            html = render_to_string(
+                view_instance.get_template_names(),
+                context=view_instance.get_context_data(),
+                using=view_instance.template_engine,
+            )
+        timings: List[float] = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            document = render_document_from_html(html)
+            with as_bytes_io(document):
+                pass
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings
@@ -23,10 +23,29 @@ from gcampus.documents.tasks import document_cleanup
 class Command(RichCommand):
     help = "Cleanup documents and remove orphaned files from the media backend."
 
-    def handle(self, **kwargs):
-        references, files = document_cleanup()
-        self.console.print(
-            f"Removed {references:d} database references to non-existent files "
-            f"and {files:d} orphaned files that are not referenced."
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            default=False,
+            help="Only report references and files without removing them",
         )
+
+    def handle(self, dry_run: bool = False, **kwargs):
+        with self.console.status("Cleaning up documents...") as status:
+
+            def progress(step: str, count: int):
+                status.update(f"{step}: {count:d}")
+
+            references, files = document_cleanup(dry_run=dry_run, progress=progress)
+        if dry_run:
+            self.console.print(
+                f"Found {references:d} database references to non-existent files "
+                f"and {files:d} orphaned files that are not referenced."
+            )
+        else:
+            self.console.print(
+                f"Removed {references:d} database references to non-existent files "
+                f"and {files:d} orphaned files that are not referenced."
+            )
         self.console.print("Done!")
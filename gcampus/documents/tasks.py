@@ -15,35 +15,62 @@
 
 __all__ = [
     "render_cached_document_view",
+    "schedule_document_render",
+    "render_due_documents",
     "render_document_to_model",
+    "use_existing_document",
     "document_cleanup",
 ]
 
 import logging
+import math
 import time
 from io import BytesIO
-from typing import Type, Union, Tuple
+from typing import Type, Union, Tuple, Optional, Callable
 
 from celery import shared_task
+from celery.signals import worker_init
 from django.conf import settings
 from django.contrib.staticfiles.utils import get_files
+from django.core.exceptions import ObjectDoesNotExist
 from django.core.files import File
 from django.core.files.storage import default_storage, Storage
-from django.db.models import Model, Q, Manager
-from django.db.models.fields.files import FieldFile
+from django.db.models import Model, Q, Manager, FileField
 from django.template.loader import render_to_string
-from django.utils import translation
+from django.utils import timezone, translation
 from django.utils.module_loading import import_string
 from django.views import View
 
 from gcampus.auth.models import Course
 from gcampus.core.files import file_exists
 from gcampus.core.models import Measurement
-from gcampus.documents.document import as_bytes_io, render_document_from_html
+from gcampus.documents.document import (
+    as_bytes_io,
+    render_document_from_html,
+    warm_static_resources,
+)
 from gcampus.tasks.lock import redis_lock
+from gcampus.tasks.redis import get_redis_instance
 
 logger = logging.getLogger("gcampus.documents.tasks")
 
+#: Redis sorted set of pending document renders. Members are formatted
+#: as ``<view>:<pk>:<language>`` and scored by the time they are due.
+DEBOUNCE_KEY = f"{settings.REDIS_KEY_PREFIX}:documents:debounce"
+#: Set while a :func:`render_due_documents` task is scheduled.
+DEBOUNCE_SCHEDULED_KEY = f"{settings.REDIS_KEY_PREFIX}:documents:debounce:scheduled"
+
+
+@worker_init.connect
+def warm_document_caches(**kwargs):
+    """Load the static resources used by documents on worker startup
+
+    The main worker process loads the resources before the pool is
+    started. Forked pool processes thereby inherit the cache.
+    """
+    count = warm_static_resources()
+    logger.info("Loaded %d static resources for document rendering", count)
+
 
 def get_document_lock_name(model: type[Model] | str, pk) -> str:
     """Get the lock name for building or modifying the document of a
@@ -105,13 +132,37 @@ def render_cached_document_view(
     lock_name = get_document_lock_name(model, instance.pk)
     # A lock is used to prevent multiple workers from creating the same
     # document. Not that the check for ``force`` and the existence of
-    # this document is done when the lock has been acquired.
-    with redis_lock(lock_name):
-        instance.refresh_from_db(fields=(view_instance.model_file_field,))
+    # this document is done when the lock has been acquired. Documents
+    # are rendered in the default time zone (see 'get_fingerprint').
+    with redis_lock(lock_name), timezone.override(settings.TIME_ZONE):
+        model_fingerprint_field = view_instance.model_fingerprint_field
+        refresh_fields = [view_instance.model_file_field]
+        if model_fingerprint_field:
+            refresh_fields.append(model_fingerprint_field)
+        instance.refresh_from_db(fields=refresh_fields)
         file: File = getattr(instance, view_instance.model_file_field)
+        with translation.override(language):
+            fingerprint = view_instance.get_fingerprint()
         if not force and file_exists(file):
-            # The file is already cached and does not have to be rebuilt
-            logger.debug("Skip file render as 'force' is set to 'False'.")
+            if fingerprint is None:
+                # The file is already cached and does not have to be
+                # rebuilt
+                logger.debug("Skip file render as 'force' is set to 'False'.")
+                return
+            if fingerprint == getattr(instance, model_fingerprint_field):
+                logger.debug("Skip file render as the fingerprint is unchanged.")
+                return
+        filename = view_instance.get_document_filename(fingerprint)
+        # A forced render must not reuse the stored file, e.g. if the
+        # file is corrupt or the templates have changed.
+        if not force and use_existing_document(
+            instance,
+            view_instance.model_file_field,
+            filename,
+            model_fingerprint_field=model_fingerprint_field,
+            fingerprint=fingerprint,
+        ):
+            logger.debug("Reuse existing document with an equal fingerprint.")
             return
         with translation.override(language):
             document_template = render_to_string(
@@ -123,13 +174,113 @@ def render_cached_document_view(
             )
         render_document_to_model(
             document_template,
-            view_instance.get_internal_filename(),
+            filename,
             view_instance.model,
             view_instance.model_file_field,
             instance,
+            model_fingerprint_field=model_fingerprint_field,
+            fingerprint=fingerprint,
         )
 
 
+def use_existing_document(
+    instance: Model,
+    model_file_field: str,
+    filename: str,
+    model_fingerprint_field: Optional[str] = None,
+    fingerprint: Optional[str] = None,
+) -> bool:
+    """Use an already stored document with the same fingerprint
+
+    Documents with a fingerprint are stored by their fingerprint. If a
+    file with the same name is found in the storage backend, it is
+    assigned to the instance instead of rendering the document again.
+
+    :param instance: Model instance of the document.
+    :param model_file_field: String name of the field which holds the
+        file.
+    :param filename: File name used in the model's file field.
+    :param model_fingerprint_field: String name of the field which
+        holds the fingerprint.
+    :param fingerprint: Fingerprint of the document.
+    :returns: ``True`` if an existing document has been assigned.
+    """
+    if not fingerprint or not model_fingerprint_field:
+        return False
+    field: FileField = instance._meta.get_field(model_file_field)
+    name = field.generate_filename(instance, filename)
+    if not field.storage.exists(name):
+        return False
+    setattr(instance, model_file_field, name)
+    setattr(instance, model_fingerprint_field, fingerprint)
+    instance.save(update_fields=(model_file_field, model_fingerprint_field))
+    return True
+
+
+def schedule_document_render(view: str, pk: int, language: str):
+    """Schedule a debounced render of a cached document
+
+    Requests for the same view, instance and language within
+    ``settings.DOCUMENT_RENDER_DEBOUNCE`` are coalesced. The document is
+    rendered once by :func:`render_due_documents` after no further
+    request has been made during that window. If no window is
+    configured, the render task is enqueued immediately.
+
+    :param view: Import path of a :class:`CachedDocumentView`.
+    :param pk: Primary key of the document's instance.
+    :param language: Language passed to
+        :func:`render_cached_document_view`.
+    """
+    debounce = settings.DOCUMENT_RENDER_DEBOUNCE
+    if not debounce:
+        render_cached_document_view.apply_async(
+            args=(view, pk, language), kwargs={"force": False}
+        )
+        return
+    delay: float = debounce.total_seconds()
+    redis = get_redis_instance()
+    # Every request moves the due time of the document further back
+    redis.zadd(DEBOUNCE_KEY, {f"{view}:{pk}:{language}": time.time() + delay})
+    _schedule_due_documents(delay)
+
+
+def _schedule_due_documents(countdown: float):
+    redis = get_redis_instance()
+    # Only a single task is scheduled at a time. The flag expires in
+    # case the task is lost.
+    if redis.set(DEBOUNCE_SCHEDULED_KEY, 1, nx=True, ex=math.ceil(countdown) + 60):
+        render_due_documents.apply_async(countdown=countdown)
+
+
+@shared_task
+def render_due_documents():
+    """Render all documents scheduled by :func:`schedule_document_render`
+
+    Renders all documents that are due and schedules itself again for
+    the documents that are not due yet.
+    """
+    redis = get_redis_instance()
+    # Requests made from now on have to schedule a new task
+    redis.delete(DEBOUNCE_SCHEDULED_KEY)
+    for member in redis.zrangebyscore(DEBOUNCE_KEY, "-inf", time.time()):
+        if not redis.zrem(DEBOUNCE_KEY, member):
+            # The document has been claimed by another worker
+            continue
+        view, pk, language = member.decode("utf-8").rsplit(":", 2)
+        try:
+            render_cached_document_view(view, int(pk), language, force=False)
+        except ObjectDoesNotExist:
+            logger.warning(
+                "Skip render of '%s' as the instance does not exist.", member
+            )
+        except Exception:  # noqa
+            logger.exception("Unable to render document '%s'", member)
+    pending = redis.zrange(DEBOUNCE_KEY, 0, 0, withscores=True)
+    if pending:
+        _, due = pending[0]
+        _schedule_due_documents(max(due - time.time(), 0))
+
+
 @shared_task
 def render_document_to_model(
     template: str,
@@ -137,6 +288,8 @@ def render_document_to_model(
     model: Union[str, Type[Model]],
     model_file_field: str,
     instance: Union[Model, int],
+    model_fingerprint_field: Optional[str] = None,
+    fingerprint: Optional[str] = None,
 ):
     """Render a document to model instance
 
@@ -150,15 +303,23 @@ def render_document_to_model(
         file.
     :param instance: Either a primary key or an acutal instance of the
         model.
+    :param model_fingerprint_field: Optional name of the field which
+        holds the fingerprint of the document.
+    :param fingerprint: Fingerprint of the document, stored alongside
+        the file.
     """
     model, instance = get_instance_retry(model, instance)
     document = render_document_from_html(template)
+    update_fields = [model_file_field]
+    if model_fingerprint_field:
+        setattr(instance, model_fingerprint_field, fingerprint)
+        update_fields.append(model_fingerprint_field)
     filelike_obj: BytesIO
     with as_bytes_io(document) as filelike_obj:
         # Makes sure the memory (buffer) is released after saving the
         # file.
         setattr(instance, model_file_field, File(filelike_obj, name=filename))
-        instance.save(update_fields=(model_file_field,))
+        instance.save(update_fields=update_fields)
 
 
 def get_instance_retry(
@@ -189,8 +350,14 @@ def get_instance_retry(
     raise model.DoesNotExist(f"Unable to find {model} with 'pk={instance}'")
 
 
+#: Number of database rows or files processed at once during cleanup
+CLEANUP_BATCH_SIZE: int = 2000
+
+
 @shared_task
-def document_cleanup() -> tuple[int, int]:
+def document_cleanup(
+    dry_run: bool = False, progress: Optional[Callable[[str, int], None]] = None
+) -> tuple[int, int]:
     """Document cleanup and maintenance task.
 
     This task will check for broken links between the database and the
@@ -202,9 +369,15 @@ def document_cleanup() -> tuple[int, int]:
     is not found in the storage backend, the reference is removed from
     the database.
 
-    Note: Only :class:`django.core.files.storage.FileSystemStorage` is
-    supported for orphaned files.
+    The storage backend is listed once and all references are loaded
+    with a single query per table. Both sets are compared in memory,
+    such that the number of queries does not depend on the number of
+    files.
 
+    :param dry_run: Only count the references and files without
+        modifying the database or the storage backend.
+    :param progress: Optional callback called with a description of
+        the current step and the number of processed items.
     :returns: A tuple ``(references, files)`` with the number of
         references and files that were removed successfully.
     """
@@ -212,77 +385,129 @@ def document_cleanup() -> tuple[int, int]:
         (Measurement.all_objects, "document"),
         (Course.objects, "overview_document"),
     ]
+    # The storage has to be listed before loading the references.
+    # Otherwise, documents created in between might be deleted.
+    stored_files: set[str] = _list_files(default_storage, progress=progress)
+    referenced_files: set[str] = set()
     references: int = 0
     for manager, file_field in table_columns:
-        references += _cleanup_database_reference(manager, file_field)
-    files: int = _cleanup_orphaned_files(table_columns)
+        table_files = _get_referenced_files(manager, file_field)
+        referenced_files |= table_files
+        references += _cleanup_database_reference(
+            manager,
+            file_field,
+            table_files - stored_files,
+            dry_run=dry_run,
+            progress=progress,
+        )
+    files: int = _cleanup_orphaned_files(
+        stored_files - referenced_files, dry_run=dry_run, progress=progress
+    )
     return references, files
 
 
+def _list_files(
+    storage: Storage = default_storage,
+    progress: Optional[Callable[[str, int], None]] = None,
+) -> set[str]:
+    """List all files in the storage backend
+
+    :param storage: Optional storage backend.
+    :param progress: Optional progress callback.
+    :returns: Set of all file names.
+    """
+    files: set[str] = set()
+    for file in get_files(storage):
+        files.add(file)
+        if progress and len(files) % CLEANUP_BATCH_SIZE == 0:
+            progress("Listing files", len(files))
+    if progress:
+        progress("Listing files", len(files))
+    return files
+
+
+def _get_referenced_files(manager: Manager, field: str) -> set[str]:
+    """Get all files referenced by a file field
+
+    :param manager: Django model manager for the table.
+    :param field: Column name of the file field.
+    :returns: Set of all file names referenced in the table.
+    """
+    # Query for rows where the file field is not set
+    empty_file_query: Q = Q(**{f"{field}__isnull": True}) | Q(**{field: ""})
+    return set(
+        manager.exclude(empty_file_query)
+        .values_list(field, flat=True)
+        .iterator(chunk_size=CLEANUP_BATCH_SIZE)
+    )
+
+
 def _cleanup_orphaned_files(
-    table_columns: list[tuple[Manager, str]], storage: Storage = default_storage
+    orphaned_files: set[str],
+    storage: Storage = default_storage,
+    dry_run: bool = False,
+    progress: Optional[Callable[[str, int], None]] = None,
 ) -> int:
     """Cleanup orphaned files.
 
-    Iterate over all files in the file storage backend and check all
-    provided managers with their respective file field for references
-    to the current file.
-
-    If a file is not referenced by any of the database tables, it is
-    being deleted.
+    Delete all files that are not referenced by any of the database
+    tables from the storage backend.
 
     This function only uses I/O functions provided by the file storage
     backend and can thus be used with any storage backend.
 
-    Example usage:
-
-        # Find files that are not referenced by 'Person.picture'
-        # where 'Person' is a model and 'picture' is the associated
-        # file field.
-        _cleanup_orphaned_files([(Person.objects, "picture")]
-
-    :param table_columns: List of tuples with a
-        :class:`django.db.models.Manager` and its associated file field.
+    :param orphaned_files: Names of the files that are not referenced.
     :param storage: Optional storage backend.
+    :param dry_run: Do not delete any files.
+    :param progress: Optional progress callback.
     :returns: Number of files that have been deleted.
     """
     file_counter: int = 0
-    for file in get_files(storage):
-        if any(
-            manager.only(file_field).filter(**{file_field: file}).exists()
-            for manager, file_field in table_columns
-        ):
-            # The file is referenced by at least one database file
-            # field, do not delete the file.
-            continue
-        else:
+    for file in sorted(orphaned_files):
+        if not dry_run:
             storage.delete(file)
-            file_counter += 1
+        file_counter += 1
+        if progress and file_counter % CLEANUP_BATCH_SIZE == 0:
+            progress("Deleting orphaned files", file_counter)
+    if progress:
+        progress("Deleting orphaned files", file_counter)
     return file_counter
 
 
-def _cleanup_database_reference(manager: Manager, field: str) -> int:
+def _cleanup_database_reference(
+    manager: Manager,
+    field: str,
+    missing_files: set[str],
+    storage: Storage = default_storage,
+    dry_run: bool = False,
+    progress: Optional[Callable[[str, int], None]] = None,
+) -> int:
     """Cleanup database references to deleted files.
 
-    For a given manager (e.g. ``Model.objects``), find all instances
-    that have a file set in their ``field`` column. If the file does
-    not exist, the reference is removed at a final step with a single
-    ``update`` call.
+    For a given manager (e.g. ``Model.objects``), remove all references
+    to the provided missing files in batches of ``update`` calls.
 
     :param manager: Django model manager for the table.
     :param field: Column name of the file field.
+    :param missing_files: Names of referenced files that have not been
+        found in the storage backend.
+    :param storage: Optional storage backend.
+    :param dry_run: Only count the references.
+    :param progress: Optional progress callback.
     :returns: Number of references that have been removed.
     """
-    # Query for rows where the file field is not set
-    empty_file_query: Q = Q(**{f"{field}__isnull": True}) | Q(**{field: ""})
-    # List of primary keys that should be reset
-    reset_pks: list = []
-    # Get all rows that have the file field column set
-    for instance in manager.only("pk", field).exclude(empty_file_query):
-        file: FieldFile | None = getattr(instance, field, None)
-        if not file_exists(file):
-            reset_pks.append(instance.pk)
-    if reset_pks:
-        return manager.filter(pk__in=reset_pks).update(**{field: None})
-    else:
-        return 0
+    # The storage has been listed before the references were loaded.
+    # Files created in the meantime are checked again.
+    missing_files = sorted(file for file in missing_files if not storage.exists(file))
+    reference_counter: int = 0
+    for i in range(0, len(missing_files), CLEANUP_BATCH_SIZE):
+        qs = manager.filter(
+            **{f"{field}__in": missing_files[i : i + CLEANUP_BATCH_SIZE]}
+        )
+        if dry_run:
+            reference_counter += qs.count()
+        else:
+            reference_counter += qs.update(**{field: None})
+        if progress:
+            progress("Removing references", reference_counter)
+    return reference_counter
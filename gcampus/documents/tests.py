@@ -12,20 +12,34 @@
 #
 #  You should have received a copy of the GNU Affero General Public License
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
-from unittest import SkipTest
+from datetime import timedelta
+from unittest import SkipTest, mock
 
 import httpx
+from django.conf import settings
 from django.contrib.gis.geos import Point
 from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage
+from django.test import SimpleTestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone, translation
 from django.utils.timezone import now
 
 from gcampus.auth.models import Course
 from gcampus.core.files import file_exists
 from gcampus.core.models import Measurement
 from gcampus.core.tests.mixins import TokenTestMixin, WaterTestMixin, LoginTestMixin
-from gcampus.documents.tasks import document_cleanup
+from gcampus.documents.document import get_document_assets
+from gcampus.documents.tasks import (
+    document_cleanup,
+    schedule_document_render,
+    render_due_documents,
+    render_cached_document_view,
+    DEBOUNCE_KEY,
+    DEBOUNCE_SCHEDULED_KEY,
+)
+from gcampus.documents.views import MeasurementDetailPDF
+from gcampus.tasks.redis import get_redis_instance
 from gcampus.tasks.tests.utils import BaseMockTaskTest
 
 
@@ -73,6 +87,77 @@ class TestDocumentViews(
                 raise SkipTest("Mapbox authentication failed")
         self.assertEqual(response.status_code, 200)
 
+    def test_measurement_document_fingerprint(self):
+        measurement = Measurement(
+            token=self.tokens[0], location=Point(0, 0), water=self.water, time=now()
+        )
+        measurement.save()
+        fingerprint = MeasurementDetailPDF.mock_view(measurement).get_fingerprint()
+        self.assertEqual(len(fingerprint), 64)
+        measurement.refresh_from_db()
+        self.assertEqual(
+            MeasurementDetailPDF.mock_view(measurement).get_fingerprint(), fingerprint
+        )
+        measurement.comment = "Changed comment"
+        measurement.save()
+        self.assertNotEqual(
+            MeasurementDetailPDF.mock_view(measurement).get_fingerprint(), fingerprint
+        )
+
+    def test_measurement_document_fingerprint_timezone(self):
+        measurement = Measurement(
+            token=self.tokens[0], location=Point(0, 0), water=self.water, time=now()
+        )
+        measurement.save()
+        fingerprint = MeasurementDetailPDF.mock_view(measurement).get_fingerprint()
+        with timezone.override("America/New_York"):
+            self.assertEqual(
+                MeasurementDetailPDF.mock_view(measurement).get_fingerprint(),
+                fingerprint,
+            )
+
+    @mock.patch("gcampus.documents.tasks.render_document_to_model")
+    @mock.patch(
+        "gcampus.documents.views.print.get_static_map", return_value=(b"", None)
+    )
+    def test_force_render(self, static_map_mock, render_mock):
+        measurement = Measurement(
+            token=self.tokens[0], location=Point(0, 0), water=self.water, time=now()
+        )
+        measurement.save()
+        view = MeasurementDetailPDF.mock_view(measurement)
+        with translation.override(settings.LANGUAGE_CODE):
+            fingerprint = view.get_fingerprint()
+        field = Measurement._meta.get_field("document")
+        field.storage.save(
+            field.generate_filename(
+                measurement, view.get_document_filename(fingerprint)
+            ),
+            ContentFile(b""),
+        )
+        view_name = "gcampus.documents.views.MeasurementDetailPDF"
+        # The stored document with the same fingerprint is reused
+        render_cached_document_view(view_name, measurement.pk, "de", force=False)
+        render_mock.assert_not_called()
+        render_cached_document_view(view_name, measurement.pk, "de", force=True)
+        render_mock.assert_called_once()
+
+    def test_measurement_document_status(self):
+        measurement = Measurement(
+            token=self.tokens[0], location=Point(0, 0), water=self.water, time=now()
+        )
+        measurement.save()
+        url = reverse(
+            "gcampusdocuments:measurement-detail-status", args=(measurement.pk,)
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.json()["cached"])
+        response = self.client.get(
+            reverse("gcampusdocuments:measurement-detail-status", args=(0,))
+        )
+        self.assertEqual(response.status_code, 404)
+
 
 class TestDocumentCleanup(TokenTestMixin, WaterTestMixin, BaseMockTaskTest):
     def test_non_removal(self):
@@ -114,3 +199,57 @@ class TestDocumentCleanup(TokenTestMixin, WaterTestMixin, BaseMockTaskTest):
         document_cleanup()
         course.refresh_from_db(fields=("overview_document",))
         self.assertFalse(bool(course.overview_document))
+
+    def test_dry_run(self):
+        # Remove files left in the storage by other tests
+        document_cleanup()
+        file = ContentFile(b"", name="test.pdf")
+        course = Course(teacher_email="test@localhost", overview_document=file)
+        course.save()
+        file_name = course.overview_document.name
+        course.overview_document = None
+        course.save()
+        self.assertEqual(document_cleanup(dry_run=True), (0, 1))
+        # Nothing has been removed
+        self.assertTrue(default_storage.exists(file_name))
+        self.assertEqual(document_cleanup(dry_run=True), (0, 1))
+
+
+@override_settings(DOCUMENT_RENDER_DEBOUNCE=timedelta(seconds=10))
+class TestDocumentDebounce(SimpleTestCase):
+    view = "gcampus.documents.views.MeasurementDetailPDF"
+
+    def setUp(self):
+        self.redis = get_redis_instance()
+        self.redis.delete(DEBOUNCE_KEY, DEBOUNCE_SCHEDULED_KEY)
+
+    def tearDown(self):
+        self.redis.delete(DEBOUNCE_KEY, DEBOUNCE_SCHEDULED_KEY)
+
+    def test_coalesce_renders(self):
+        with mock.patch.object(render_due_documents, "apply_async") as task_mock:
+            for _ in range(10):
+                schedule_document_render(self.view, 1, "de")
+            schedule_document_render(self.view, 2, "de")
+            task_mock.assert_called_once()
+        self.assertEqual(self.redis.zcard(DEBOUNCE_KEY), 2)
+
+    @override_settings(DOCUMENT_RENDER_DEBOUNCE=timedelta(microseconds=1))
+    def test_render_language(self):
+        with mock.patch.object(render_due_documents, "apply_async"):
+            for _ in range(3):
+                schedule_document_render(self.view, 1, "en")
+        with mock.patch(
+            "gcampus.documents.tasks.render_cached_document_view"
+        ) as render_mock:
+            render_due_documents()
+        render_mock.assert_called_once_with(self.view, 1, "en", force=False)
+        self.assertEqual(self.redis.zcard(DEBOUNCE_KEY), 0)
+
+
+class TestDocumentAssets(SimpleTestCase):
+    def test_document_assets(self):
+        assets = get_document_assets()
+        self.assertIn("gcampusdocuments/styles/gcampus.css", assets)
+        self.assertIn("gcampuscore/fonts/Carlito-Regular.ttf", assets)
+        self.assertEqual(len(assets), len(set(assets)))
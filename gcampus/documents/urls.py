@@ -22,6 +22,7 @@ from gcampus.documents.views.print import (
     MeasurementDetailPDF,
     MeasurementListPDF,
 )
+from gcampus.documents.views.status import measurement_document_status
 
 urlpatterns = [
     path("documents/course", CourseOverviewPDF.as_view(), name="course"),
@@ -35,6 +36,11 @@ urlpatterns = [
         MeasurementDetailPDF.as_view(),
         name="measurement-detail",
     ),
+    path(
+        "documents/measurement/<int:pk>/status",
+        measurement_document_status,
+        name="measurement-detail-status",
+    ),
     path(
         "documents/measurements/pdf",
         MeasurementListPDF.as_view(),
@@ -18,6 +18,7 @@ __all__ = [
     "AccessKeyCombinedPDF",
     "MeasurementDetailPDF",
     "MeasurementListPDF",
+    "measurement_document_status",
 ]
 
 from gcampus.documents.views.print import (
@@ -26,3 +27,4 @@ from gcampus.documents.views.print import (
     MeasurementDetailPDF,
     MeasurementListPDF,
 )
+from gcampus.documents.views.status import measurement_document_status
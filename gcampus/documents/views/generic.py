@@ -23,15 +23,17 @@ __all__ = [
 
 from typing import Optional, Type, Union
 
+from django.conf import settings
 from django.db.models import Model, QuerySet
 from django.http import Http404
+from django.utils import timezone
 from django.utils.text import get_valid_filename
 from django.utils.translation import gettext
 from django.views.generic import TemplateView
 from django.views.generic.detail import SingleObjectMixin
 from django.views.generic.list import MultipleObjectMixin
 
-from gcampus.documents.document import DOCUMENT_TEMPLATE_ENGINE
+from gcampus.documents.document import DOCUMENT_TEMPLATE_ENGINE, get_fingerprint
 from gcampus.documents.views.response import CachedDocumentResponse, DocumentResponse
 
 
@@ -104,6 +106,9 @@ class ListDocumentView(MultipleObjectMixin, DocumentView):
 
 class CachedDocumentView(SingleObjectDocumentView):
     model_file_field: Optional[str] = None
+    #: Optional field storing the fingerprint of the cached document.
+    #: See :meth:`.get_fingerprint_data`.
+    model_fingerprint_field: Optional[str] = None
     internal_filename_property: Optional[str] = None
     response_class = CachedDocumentResponse
 
@@ -120,19 +125,46 @@ class CachedDocumentView(SingleObjectDocumentView):
     def render_to_response(self, context, **response_kwargs):
         response_kwargs.setdefault("content_type", self.content_type)
         rebuild = bool(self.request.GET.get("rebuild", False))
-        return self.response_class(
-            self.request,
-            self.get_template_names(),
-            str(get_valid_filename(self.get_filename())),
-            self.object,
-            self.model,
-            self.model_file_field,
-            self.get_internal_filename(),
-            context=context,
-            rebuild=rebuild,
-            using=self.template_engine,
-            **response_kwargs,
-        )
+        # Cached documents are shared by all users. They are rendered
+        # in the default time zone, the same as in Celery tasks (see
+        # 'render_cached_document_view'). Otherwise, the time zone of
+        # the request would change the fingerprint.
+        with timezone.override(settings.TIME_ZONE):
+            fingerprint = self.get_fingerprint()
+            return self.response_class(
+                self.request,
+                self.get_template_names(),
+                str(get_valid_filename(self.get_filename())),
+                self.object,
+                self.model,
+                self.model_file_field,
+                self.get_document_filename(fingerprint),
+                context=context,
+                rebuild=rebuild,
+                using=self.template_engine,
+                fingerprint=fingerprint,
+                model_fingerprint_field=self.model_fingerprint_field,
+                **response_kwargs,
+            )
+
+    def get_fingerprint_data(self) -> Optional[list]:
+        """Get all inputs of the document
+
+        The inputs are hashed to a fingerprint (see
+        :func:`gcampus.documents.document.get_fingerprint`). The cached
+        document is only rebuilt if its fingerprint changed. Returns
+        ``None`` by default, i.e. the document is only built if it does
+        not exist.
+        """
+        return None
+
+    def get_fingerprint(self) -> Optional[str]:
+        if not self.model_fingerprint_field:
+            return None
+        data = self.get_fingerprint_data()
+        if data is None:
+            return None
+        return get_fingerprint(data)
 
     def get_internal_filename(self) -> str:
         internal_filename: Optional[str] = None
@@ -146,3 +178,14 @@ class CachedDocumentView(SingleObjectDocumentView):
             # property returned 'None'.
             internal_filename = f"{self.object.pk}.pdf"
         return internal_filename
+
+    def get_document_filename(self, fingerprint: Optional[str]) -> str:
+        """Get the filename used to store the document
+
+        Documents with a fingerprint are stored by their fingerprint.
+        An existing file with the same fingerprint is reused instead of
+        rendering the document again.
+        """
+        if fingerprint:
+            return f"{fingerprint}.pdf"
+        return self.get_internal_filename()
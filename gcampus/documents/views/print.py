@@ -21,6 +21,7 @@ __all__ = [
 ]
 
 import base64
+import datetime
 from typing import Tuple, List
 
 from django.contrib.gis.db.models import Extent
@@ -92,8 +93,29 @@ class MeasurementDetailPDF(CachedDocumentView):
     context_object_name = "measurement"
     model = Measurement
     model_file_field = "document"
+    model_fingerprint_field = "document_fingerprint"
     object: Measurement
 
+    def get_fingerprint_data(self) -> list:
+        measurement: Measurement = self.object
+        parameters = measurement.parameters.order_by("pk").values_list(
+            "parameter_type__name",
+            "parameter_type__unit",
+            "value",
+            "comment",
+        )
+        return [
+            str(measurement),
+            measurement.name,
+            # The fingerprint must not depend on the active time zone
+            measurement.time.astimezone(datetime.timezone.utc),
+            measurement.location_name,
+            measurement.location.wkt if measurement.location else None,
+            measurement.comment,
+            measurement.water_name,
+            [list(parameter) for parameter in parameters],
+        ]
+
     def get_context_data(self, **kwargs):
         map_bytes: bytes
         map_bytes, _ = get_static_map(
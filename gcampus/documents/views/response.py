@@ -14,7 +14,7 @@
 #  along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 from io import BytesIO
-from typing import Type
+from typing import Type, Optional
 
 from django.db.models import Model
 from django.db.models.fields.files import FieldFile
@@ -23,7 +23,7 @@ from django.template.loader import render_to_string
 
 from gcampus.core.files import file_exists
 from gcampus.documents.document import render_document, as_bytes_io
-from gcampus.documents.tasks import render_document_to_model
+from gcampus.documents.tasks import render_document_to_model, use_existing_document
 
 
 class DocumentResponse(StreamingHttpResponse):
@@ -69,6 +69,8 @@ class CachedDocumentResponse(FileResponse):
         content_type=None,
         using=None,
         rebuild: bool = False,
+        fingerprint: Optional[str] = None,
+        model_fingerprint_field: Optional[str] = None,
         **kwargs,
     ):
         if not hasattr(instance, model_file_field):
@@ -77,22 +79,36 @@ class CachedDocumentResponse(FileResponse):
             )
 
         file: FieldFile = getattr(instance, model_file_field)
-        if rebuild or not file_exists(file):
-            # File does not exist yet. Start rendering the file
-            document_template = render_to_string(
-                template,
-                context=context,
-                using=using
-                # The request is not provided to not leak any request
-                # related information inside the document.
-            )
-            render_document_to_model(
-                document_template,
-                internal_filename,
-                model,
-                model_file_field,
+        outdated = fingerprint is not None and fingerprint != getattr(
+            instance, model_fingerprint_field
+        )
+        if rebuild or outdated or not file_exists(file):
+            # File does not exist yet or is outdated. A document with
+            # the same fingerprint might have already been stored.
+            if rebuild or not use_existing_document(
                 instance,
-            )
+                model_file_field,
+                internal_filename,
+                model_fingerprint_field=model_fingerprint_field,
+                fingerprint=fingerprint,
+            ):
+                # Start rendering the file
+                document_template = render_to_string(
+                    template,
+                    context=context,
+                    using=using
+                    # The request is not provided to not leak any
+                    # request related information inside the document.
+                )
+                render_document_to_model(
+                    document_template,
+                    internal_filename,
+                    model,
+                    model_file_field,
+                    instance,
+                    model_fingerprint_field=model_fingerprint_field,
+                    fingerprint=fingerprint,
+                )
             instance.refresh_from_db(fields=(model_file_field,))
             file: FieldFile = getattr(instance, model_file_field)
         super().__init__(file, as_attachment=True, filename=filename, **kwargs)
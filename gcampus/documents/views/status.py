@@ -0,0 +1,51 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+__all__ = ["measurement_document_status"]
+
+from asgiref.sync import sync_to_async
+from django.http import HttpRequest, JsonResponse, Http404
+from django.urls import reverse
+from django.views.decorators.http import require_GET
+
+from gcampus.core.files import file_exists
+from gcampus.core.models import Measurement
+
+
+@require_GET
+async def measurement_document_status(request: HttpRequest, pk: int) -> JsonResponse:
+    """Report whether the cached document of a measurement is available.
+
+    Clients may poll this endpoint instead of requesting
+    :class:`gcampus.documents.views.MeasurementDetailPDF` directly,
+    which would block until the document has been rendered.
+    """
+    try:
+        measurement: Measurement = await Measurement.objects.only(
+            "id", "document"
+        ).aget(pk=pk)
+    except Measurement.DoesNotExist:
+        raise Http404()
+    # Checking the storage backend is blocking I/O
+    cached: bool = await sync_to_async(file_exists, thread_sensitive=False)(
+        measurement.document
+    )
+    return JsonResponse(
+        {
+            "id": measurement.pk,
+            "cached": cached,
+            "url": reverse("gcampusdocuments:measurement-detail", args=(pk,)),
+        }
+    )
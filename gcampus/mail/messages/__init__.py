@@ -16,7 +16,9 @@
 import typing as t
 from abc import ABC
 from collections.abc import Iterable
+from functools import lru_cache
 
+from django.conf import settings
 from django.contrib.staticfiles.storage import staticfiles_storage
 from django.core.mail import EmailMessage, EmailMultiAlternatives
 from django.template.loader import render_to_string
@@ -52,8 +54,9 @@ class EmailTemplate(ABC):
         return context
 
     def get_stylesheet(self) -> str:
-        with staticfiles_storage.open(self.stylesheet, mode="rb") as f:
-            return f.read().decode("utf-8")
+        if settings.DEBUG:
+            return _read_stylesheet.__wrapped__(self.stylesheet)
+        return _read_stylesheet(self.stylesheet)
 
     def render(self, using=None) -> t.Tuple[str, str]:
         """Render email templates
@@ -98,6 +101,15 @@ class EmailTemplate(ABC):
         return message
 
 
+@lru_cache(maxsize=8)
+def _read_stylesheet(path: str) -> str:
+    # Static files do not change while the process is running. Reading
+    # the stylesheet once avoids opening the file for every email of a
+    # batch.
+    with staticfiles_storage.open(path, mode="rb") as f:
+        return f.read().decode("utf-8")
+
+
 def _to_raw_text(html: str) -> str:
     root = lxml_html.fromstring(html)
     contents = root.xpath("//div[@class='content']")
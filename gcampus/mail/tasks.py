@@ -0,0 +1,101 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+__all__ = [
+    "prepare_template_email",
+    "send_template_emails",
+    "enqueue_template_emails",
+]
+
+import logging
+from itertools import groupby
+from typing import List, Optional, Iterable
+
+from celery import shared_task
+from django.conf import settings
+from django.core.mail import get_connection
+from django.utils import translation
+from django.utils.module_loading import import_string
+
+from gcampus.mail.messages import EmailTemplate
+
+logger = logging.getLogger("gcampus.mail.tasks")
+
+
+def prepare_template_email(
+    template: str, to: List[str], language: Optional[str] = None, **kwargs
+) -> dict:
+    """Prepare a serializable email for :func:`send_template_emails`
+
+    :param template: Import path of an :class:`EmailTemplate` subclass.
+    :param to: List of recipients.
+    :param language: Language the email is rendered in. Defaults to
+        ``settings.LANGUAGE_CODE``.
+    :param kwargs: Keyword arguments passed to the template.
+    """
+    return {
+        "template": template,
+        "to": list(to),
+        "language": language or settings.LANGUAGE_CODE,
+        "kwargs": kwargs,
+    }
+
+
+def _get_language(message: dict) -> str:
+    return message.get("language") or settings.LANGUAGE_CODE
+
+
+@shared_task
+def send_template_emails(messages: List[dict]) -> int:
+    """Send a batch of template emails
+
+    The messages are grouped by language and rendered with the
+    respective language activated. All messages are sent over a single
+    email backend connection instead of opening a new connection for
+    every message.
+
+    :param messages: List of prepared messages, see
+        :func:`prepare_template_email`.
+    :returns: Number of messages sent.
+    """
+    email_messages = []
+    messages = sorted(messages, key=_get_language)
+    for language, language_messages in groupby(messages, key=_get_language):
+        with translation.override(language):
+            for message in language_messages:
+                template_class: type[EmailTemplate] = import_string(message["template"])
+                email_template = template_class(**message.get("kwargs", {}))
+                email_messages.append(email_template.as_message(message["to"]))
+    if not email_messages:
+        return 0
+    with get_connection() as connection:
+        sent = connection.send_messages(email_messages)
+    logger.info("Sent %d out of %d emails", sent or 0, len(email_messages))
+    return sent or 0
+
+
+def enqueue_template_emails(messages: Iterable[dict]) -> int:
+    """Enqueue prepared messages in batches of ``settings.EMAIL_BATCH_SIZE``
+
+    :param messages: Prepared messages, see :func:`prepare_template_email`.
+    :returns: Number of enqueued tasks.
+    """
+    batch_size = settings.EMAIL_BATCH_SIZE
+    messages = list(messages)
+    task_count = 0
+    for i in range(0, len(messages), batch_size):
+        send_template_emails.apply_async(args=(messages[i : i + batch_size],))
+        task_count += 1
+    return task_count
@@ -0,0 +1,98 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+from typing import Optional
+from unittest import mock
+
+from django.conf import settings
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.utils import translation
+
+from gcampus.documents.tasks import render_cached_document_view
+from gcampus.mail import tasks
+from gcampus.mail.tasks import (
+    enqueue_template_emails,
+    prepare_template_email,
+    send_template_emails,
+)
+from gcampus.tasks.celery import app
+
+COURSE_DELETION_TEMPLATE = "gcampus.mail.messages.maintenance.MaintenanceCourseDeletion"
+
+
+def prepare_course_deletion(email: str, language: Optional[str] = None) -> dict:
+    return prepare_template_email(
+        COURSE_DELETION_TEMPLATE,
+        [email],
+        language=language,
+        course_name="Test Course",
+        course_school="Test School",
+    )
+
+
+class TemplateEmailTest(TestCase):
+    def test_send_languages(self):
+        messages = [
+            prepare_course_deletion("en@example.com", language="en"),
+            prepare_course_deletion("de@example.com", language="de"),
+            prepare_course_deletion("default@example.com"),
+        ]
+        with translation.override("en"), mock.patch.object(
+            tasks, "get_connection", wraps=tasks.get_connection
+        ) as connection_mock:
+            self.assertEqual(send_template_emails(messages), 3)
+            # The active language is restored after rendering
+            self.assertEqual(translation.get_language(), "en")
+        connection_mock.assert_called_once()
+        subjects = {message.to[0]: message.subject for message in mail.outbox}
+        self.assertEqual(
+            subjects,
+            {
+                "en@example.com": "Your course has been deleted",
+                "de@example.com": "Dein Kurs wurde gelöscht",
+                # Defaults to 'settings.LANGUAGE_CODE'
+                "default@example.com": "Dein Kurs wurde gelöscht",
+            },
+        )
+        for message in mail.outbox:
+            self.assertIn("Test Course", message.body)
+
+    def test_send_empty(self):
+        self.assertEqual(send_template_emails([]), 0)
+        self.assertEqual(len(mail.outbox), 0)
+
+    @override_settings(EMAIL_BATCH_SIZE=2)
+    def test_enqueue_batches(self):
+        messages = [prepare_course_deletion(f"{i}@example.com") for i in range(5)]
+        with mock.patch.object(send_template_emails, "apply_async") as task_mock:
+            self.assertEqual(enqueue_template_emails(iter(messages)), 3)
+        batches = [call.kwargs["args"][0] for call in task_mock.call_args_list]
+        self.assertEqual([len(batch) for batch in batches], [2, 2, 1])
+        self.assertEqual(sum(batches, []), messages)
+        # Nothing is sent before the tasks are executed
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_queue_routing(self):
+        # Emails must not wait for documents rendered by an optional
+        # dedicated worker pool
+        router = app.amqp.router
+        route = router.route({}, send_template_emails.name)
+        self.assertEqual(route["queue"].name, app.conf.task_default_queue)
+        route = router.route({}, render_cached_document_view.name)
+        self.assertEqual(
+            route["queue"].name,
+            settings.DOCUMENT_TASK_QUEUE or app.conf.task_default_queue,
+        )
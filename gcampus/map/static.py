@@ -25,6 +25,7 @@ from django.core.cache import cache
 from django.urls import reverse
 
 from gcampus.core import get_base_url
+from gcampus.core.instrumentation import external_request
 from gcampus.map.clustering import mean_shift_clustering
 
 logger = logging.getLogger("gcampus.map.static")
@@ -179,12 +180,13 @@ def get_static_map(
         _client = client
     try:
         logger.debug("Requesting map from Mapbox...")
-        response: httpx.Response = _client.get(
-            url,
-            params=params,
-            headers={"User-Agent": user_agent},
-            timeout=timeout,
-        )
+        with external_request():
+            response: httpx.Response = _client.get(
+                url,
+                params=params,
+                headers={"User-Agent": user_agent},
+                timeout=timeout,
+            )
     except httpx.TimeoutException as e:
         raise TimeoutError from e
     finally:
@@ -96,6 +96,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
+    "gcampus.core.middleware.InstrumentationMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -172,6 +173,8 @@ SECURE_REFERRER_POLICY = "strict-origin-when-cross-origin"
 MANAGERS = get_email_tuple_list(os.environ.get("GCAMPUS_MANAGERS", ""))
 ADMINS = get_email_tuple_list(os.environ.get("GCAMPUS_ADMINS", ""))
 EMAIL_SUBJECT_PREFIX = "[GewässerCampus] "
+# Maximum number of emails sent by a single batch mailer task
+EMAIL_BATCH_SIZE = 100
 
 CONFIRMATION_TIMEOUT_DAYS = os.environ.get("GCAMPUS_CONFIRMATION_TIMEOUT", 5)
 CONFIRMATION_TIMEOUT = datetime.timedelta(days=CONFIRMATION_TIMEOUT_DAYS)
@@ -228,7 +231,9 @@ REST_FRAMEWORK = {
     ],
     "PAGE_SIZE": 100,
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
+    "DEFAULT_THROTTLE_CLASSES": ["gcampus.auth.throttling.RedisAnonRateThrottle"],
     "DEFAULT_THROTTLE_RATES": {
+        "anon": "600/min",
         "frontend_anon": "10/min",
         "measurement_report": "10/min",
         "course_update": "20/min",
@@ -241,6 +246,14 @@ REST_FRAMEWORK = {
     },
 }
 
+# Changes of the last seconds are not yet returned by the 'changes' API
+# endpoints, as concurrent transactions might not have been committed.
+CHANGES_FEED_DELAY = datetime.timedelta(seconds=5)
+CHANGES_MAX_PAGE_SIZE = 1000
+
+# Maximum number of results returned by the 'nearby' API endpoints
+NEARBY_MAX_RESULTS = 50
+
 # Measurement settings
 MEASUREMENT_MIN_TIME = datetime.datetime(
     1900, month=1, day=1, tzinfo=datetime.timezone.utc
@@ -260,6 +273,11 @@ OVERPASS_SERVER = get_env_read_file(
 OVERPASS_CACHE = 60 * 60 * 24 * 2
 OVERPASS_TIMEOUT = 20  # Timeout in seconds
 REQUEST_TIMEOUT = 5  # Short timeout for simple requests
+# Size (in degrees) of the grid cells used to keep track of the areas
+# that have been synchronized with Overpass and the time after which a
+# synchronized cell is considered stale.
+OVERPASS_COVERAGE_CELL_SIZE = 0.01
+OVERPASS_COVERAGE_MAX_AGE = datetime.timedelta(days=30)
 REQUEST_USER_AGENT = f"GewaesserCampus ({GCAMPUS_HOMEPAGE})"
 
 MAP_SETTINGS = {
@@ -292,39 +310,80 @@ X_FRAME_OPTIONS = "SAMEORIGIN"
 
 # Session expires when Browser is closed
 SESSION_EXPIRE_AT_BROWSER_CLOSE = True
-SESSION_SAVE_EVERY_REQUEST = True
+# Sessions are stored in the cache. Instead of saving the session on
+# every request, the expiry is only refreshed once a day.
+SESSION_ENGINE = "gcampus.auth.session_backend"
+SESSION_REFRESH_THRESHOLD = 60 * 60 * 24
 
 # Tokens
 ALLOWED_TOKEN_CHARS = list("ABCDEFGHJKLMNPQRSTWXYZ123456789")  # noqa
 ACCESS_KEY_LENGTH = 8
 COURSE_TOKEN_LENGTH = 12
+# Time in seconds a resolved token (including course and permissions)
+# is cached. Tokens are invalidated on changes, this is only an upper
+# bound.
+TOKEN_CACHE_TIMEOUT = 60 * 60
 # Maximum number of tokens that one can request
 REGISTER_MAX_ACCESS_KEY_NUMBER = 30
 # Minimum time in seconds to pass between GET and POST request
 # to prevent spam.
 REGISTER_MIN_FORM_DELAY = 12
 
+# Instrumentation
+# Sums up database, cache and external HTTP metrics per view in Redis.
+INSTRUMENTATION_ENABLED = True
+INSTRUMENTATION_EXPORT_METRICS = True
+# Add a 'Server-Timing' header to all responses. Otherwise, the header
+# is only added for staff users and requests providing the
+# 'METRICS_TOKEN'.
+INSTRUMENTATION_SERVER_TIMING = False
+# Log views repeating at least this many queries (N+1 queries)
+INSTRUMENTATION_DUPLICATE_QUERY_THRESHOLD = 10
+# Bearer token required to access the '/metrics' endpoint. The endpoint
+# is disabled if no token is set.
+METRICS_TOKEN = get_env_read_file("GCAMPUS_METRICS_TOKEN", None)
+
+# Public response cache
+# Pages and API responses of anonymous users are cached until the data
+# changes (see 'gcampus.core.http_cache'). Set to 'None' to disable.
+PUBLIC_CACHE_TIMEOUT = 60 * 60
+# Streaming responses (e.g. GeoJSON) larger than this are not cached
+PUBLIC_CACHE_MAX_SIZE = 16 * 1024 * 1024  # 16 MiB
+
 # Redis settings
 REDIS_HOST = get_env_read_file("GCAMPUS_REDIS_HOST", "localhost")
 REDIS_URL = f"redis://{REDIS_HOST}:6379"
 
 CACHES = {
     "default": {
-        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "BACKEND": "gcampus.core.cache.InstrumentedRedisCache",
         "LOCATION": REDIS_URL,
     }
 }
 
 # Celery Tasks
+# Optional queue for rendering documents with a dedicated worker pool.
+# Documents are rendered by the default queue if not set.
+DOCUMENT_TASK_QUEUE = get_env_read_file("GCAMPUS_DOCUMENT_QUEUE", None)
+# Window in which re-renders of the same document are coalesced
+DOCUMENT_RENDER_DEBOUNCE = datetime.timedelta(seconds=10)
+# Prefix of all keys stored in Redis by Celery and the tasks. Allows
+# multiple deployments to share a single Redis instance.
+REDIS_KEY_PREFIX = get_env_read_file("GCAMPUS_CELERY_PREFIX", "gcampus")
 CELERY_CONFIG = {
     "result_backend": "django-db",
     "broker_url": REDIS_URL,
     "task_publish_retry": False,
     "broker_transport_options": {
         "max_retries": 1,
-        "global_keyprefix": get_env_read_file("GCAMPUS_CELERY_PREFIX", "gcampus"),
+        "global_keyprefix": REDIS_KEY_PREFIX,
     },
+    "task_routes": {},
 }
+if DOCUMENT_TASK_QUEUE:
+    CELERY_CONFIG["task_routes"]["gcampus.documents.tasks.render_*"] = {
+        "queue": DOCUMENT_TASK_QUEUE
+    }
 
 # Maintenance schedule
 MEASUREMENT_RETENTION_TIME = datetime.timedelta(days=180)
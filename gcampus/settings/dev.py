@@ -36,6 +36,7 @@ DATABASES = {
     },
 }
 SESSION_EXPIRE_AT_BROWSER_CLOSE = False
+INSTRUMENTATION_SERVER_TIMING = True
 
 
 if find_spec("debug_toolbar"):
@@ -32,4 +32,14 @@ DATABASES = {
 }
 
 CELERY_CONFIG.update({"task_always_eager": True})
+# Tasks are run eagerly, render documents without debouncing
+DOCUMENT_RENDER_DEBOUNCE = None
 STORAGES.update({"default": {"BACKEND": "django.core.files.storage.InMemoryStorage"}})
+# Use a local cache to avoid sharing cached tokens between test runs
+CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+# Metrics are collected, but not exported to Redis
+INSTRUMENTATION_EXPORT_METRICS = False
+# Return all changes immediately
+CHANGES_FEED_DELAY = None
+# Responses are not shared between tests
+PUBLIC_CACHE_TIMEOUT = None
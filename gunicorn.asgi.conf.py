@@ -0,0 +1,31 @@
+#  Copyright (C) 2021-2022 desklab gUG (haftungsbeschränkt)
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Affero General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License
+#  along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# ASGI profile: Serve gcampus with uvicorn workers instead of gevent.
+# Asynchronous views (e.g. the Overpass lookup in
+# 'gcampus.api.views.asynchronous') run natively on the event loop of
+# each worker. Use with 'gunicorn --config gunicorn.asgi.conf.py'.
+
+wsgi_app = "gcampus.asgi:application"
+capture_output = True  # Capture log output from Django
+errorlog = "-"  # log to stderr
+loglevel = "info"
+bind = "0.0.0.0:8000"
+worker_class = "uvicorn_worker.UvicornWorker"
+# Each worker runs its own event loop. Synchronous views are executed
+# in a thread pool, so only a few workers are required.
+workers = 2
+max_requests = 2000
+max_requests_jitter = 20